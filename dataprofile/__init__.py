@@ -1,13 +1,45 @@
 """print or save a report of overall statistics and detailed statistics for a given dataset."""
 
-from ._profiling import get_var_summary, get_df_profile
-from .batch_cli_reports import render_reports_for_all
-from .reporting import render_report, ProfileReport
+import importlib
+from typing import Any
 
 __all__ = [
     'render_report',
     'ProfileReport',
     'get_var_summary',
     'get_df_profile',
-    'render_reports_for_all'
+    'render_reports_for_all',
+    'profile_async',
+    'export_profile',
+    'compare_profiles',
+    'ProfileConfig',
+    'profile_sql'
 ]
+
+# public objects are imported on first access, so the CLIs start without loading pandas or scikit-learn
+_LAZY_ATTRS = {
+    'render_report': '.reporting',
+    'ProfileReport': '._estimator',
+    'get_var_summary': '._profiling',
+    'get_df_profile': '._profiling',
+    'render_reports_for_all': '.batch_cli_reports',
+    'profile_async': '.service',
+    'export_profile': '.exporting',
+    'compare_profiles': '._drift',
+    'ProfileConfig': '._profile_config',
+    'profile_sql': '._sql',
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public object on first access."""
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    """List the public objects next to the module attributes."""
+    return sorted(set(globals()) | set(__all__))
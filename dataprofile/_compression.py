@@ -0,0 +1,223 @@
+"""Read compressed CSV files as a stream, decompressing on a background thread.
+
+Only the standard library is imported here, so that the CLIs can list compressed files without loading pandas.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from ._config import DECOMPRESS_BLOCK_BYTES, DECOMPRESS_QUEUE_BLOCKS
+
+COMPRESSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+# compressed bytes to decompress to estimate the compression ratio of formats without a size field
+_SIZE_SAMPLE_BYTES = 2 ** 20
+
+
+def compression_of(file: Union[str, Path]) -> Optional[str]:
+    """Find the compression of a file from its suffix.
+
+    :param file: the file
+    :return: 'gzip', 'bz2', 'xz' or 'zstd', or None for a plain file
+    """
+    return COMPRESSIONS.get(Path(file).suffix.lower())
+
+
+def strip_compression(file: Union[str, Path]) -> str:
+    """Drop the compression suffix of a file name, e.g. 'train.csv.gz' -> 'train.csv'.
+
+    :param file: the file
+    :return: the name of the file once decompressed
+    """
+    return str(file)[:-len(Path(file).suffix)] if compression_of(file) else str(file)
+
+
+def is_csv(file: Union[str, Path], suffix: str = '.csv') -> bool:
+    """Check whether a file is a CSV file, plain or compressed.
+
+    :param file: the file
+    :param suffix: suffix of the plain files
+    :return: whether the file ends with the suffix, optionally followed by a compression suffix
+    """
+    return strip_compression(file).lower().endswith(suffix)
+
+
+def _open_compressed(file: Path, compression: str) -> BinaryIO:
+    """Open a decompressing binary stream over a file.
+
+    :param file: the file
+    :param compression: 'gzip', 'bz2', 'xz' or 'zstd'
+    :return: the decompressed stream
+    """
+    if compression == 'gzip':
+        return gzip.open(file, 'rb')
+    if compression == 'bz2':
+        return bz2.open(file, 'rb')
+    if compression == 'xz':
+        return lzma.open(file, 'rb')
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("reading .zst files requires zstandard: pip install dataprofile[zstd]") from None
+    return zstandard.ZstdDecompressor().stream_reader(open(file, 'rb'), read_across_frames=True, closefd=True)
+
+
+class ThreadedReader(io.RawIOBase):
+    """Read a stream on a background thread, a few blocks ahead of the consumer.
+
+    The gzip, bz2, lzma and zstandard decompressors release the GIL, so decompression overlaps the parsing of the
+    blocks already read.
+    """
+
+    def __init__(self, stream: BinaryIO, block_size: int = DECOMPRESS_BLOCK_BYTES,
+                 n_blocks: int = DECOMPRESS_QUEUE_BLOCKS) -> None:
+        """Start reading ahead.
+
+        :param stream: the stream to read, closed with the reader
+        :param block_size: bytes per block
+        :param n_blocks: max blocks read ahead
+        """
+        super().__init__()
+        self.stream = stream
+        self.block_size = block_size
+        self.blocks: queue.Queue = queue.Queue(n_blocks)
+        self.buffer = memoryview(b'')
+        self.exhausted = False
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._read_ahead, daemon=True)
+        self.thread.start()
+
+    def _read_ahead(self) -> None:
+        """Queue the blocks of the stream until it ends, an error occurs or the reader is closed."""
+        try:
+            while not self.stopping.is_set():
+                block = self.stream.read(self.block_size)
+                self.blocks.put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self.blocks.put(e)
+
+    def readable(self) -> bool:
+        """Tell io the reader can be read."""
+        return True
+
+    def readinto(self, b) -> int:
+        """Copy the next bytes of the stream into a buffer.
+
+        :param b: the buffer
+        :return: number of bytes copied, 0 at the end of the stream
+        """
+        while not self.buffer and not self.exhausted:
+            block = self.blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            self.exhausted = not block
+            self.buffer = memoryview(block)
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+    def close(self) -> None:
+        """Stop the background thread and close the stream."""
+        if self.closed:
+            return
+        self.stopping.set()
+        while self.thread.is_alive():
+            try:
+                self.blocks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self.stream.close()
+        super().close()
+
+
+@contextmanager
+def open_csv(file: Union[str, Path]) -> Iterator[Union[Path, BinaryIO]]:
+    """Open a CSV file for pd.read_csv, decompressing it on a background thread if it's compressed.
+
+    :param file: the CSV file
+    :return: the path of a plain file, or a decompressed stream
+    """
+    compression = compression_of(file)
+    if compression is None:
+        yield Path(file)
+        return
+    reader = io.BufferedReader(ThreadedReader(_open_compressed(Path(file), compression)), DECOMPRESS_BLOCK_BYTES)
+    try:
+        yield reader
+    finally:
+        reader.close()
+
+
+def _sample_ratio(file: Path, compression: str) -> float:
+    """Estimate the compression ratio of a file from its first compressed bytes.
+
+    :param file: the file
+    :param compression: 'gzip', 'bz2', 'xz' or 'zstd'
+    :return: decompressed bytes per compressed byte
+    """
+    with open(file, 'rb') as f:
+        data = f.read(_SIZE_SAMPLE_BYTES)
+    if compression == 'gzip':
+        n_bytes = len(zlib.decompressobj(wbits=31).decompress(data))
+    elif compression == 'bz2':
+        n_bytes = len(bz2.BZ2Decompressor().decompress(data))
+    elif compression == 'xz':
+        n_bytes = len(lzma.LZMADecompressor().decompress(data))
+    else:
+        import zstandard
+        n_bytes = len(zstandard.ZstdDecompressor().decompressobj().decompress(data))
+    return n_bytes / max(len(data), 1)
+
+
+def file_sizes(file: Union[str, Path]) -> Tuple[int, Optional[int]]:
+    """Find the size of a file on disk and, for a compressed file, an estimate of its decompressed size.
+
+    gzip files store the decompressed size modulo 4GB and zstandard frames usually store it; for the other
+    formats, the ratio of the first MB is extrapolated.
+
+    :param file: the file
+    :return: the size in bytes, and the decompressed size, None for a plain file or when it can't be estimated
+    """
+    file = Path(file)
+    size = os.path.getsize(file)
+    compression = compression_of(file)
+    if compression is None or not size:
+        return size, None
+    try:
+        if compression == 'gzip':
+            with open(file, 'rb') as f:
+                f.seek(-4, os.SEEK_END)
+                isize = int.from_bytes(f.read(4), 'little')
+            # the field wraps around every 4GB: take the wrap closest to the extrapolated size
+            n_wraps = round((size * _sample_ratio(file, compression) - isize) / 2 ** 32)
+            return size, isize + max(n_wraps, 0) * 2 ** 32
+        if compression == 'zstd':
+            import zstandard
+            with open(file, 'rb') as f:
+                content_size = zstandard.frame_content_size(f.read(18))
+            if content_size >= 0 and content_size != zstandard.CONTENTSIZE_UNKNOWN:
+                return size, content_size
+        return size, int(size * _sample_ratio(file, compression))
+    except (ImportError, OSError, EOFError, lzma.LZMAError, zlib.error, ValueError):
+        return size, None
+
+
+def uncompressed_size(file: Union[str, Path]) -> int:
+    """Size of a CSV file once decompressed, estimated for compressed files.
+
+    :param file: the CSV file
+    :return: the size in bytes, the compressed size when it can't be estimated
+    """
+    size, decompressed = file_sizes(file)
+    return size if decompressed is None else decompressed
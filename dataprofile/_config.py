@@ -7,3 +7,56 @@ AUTHOR = 'Gordon Chen'
 RANDOM_STATE = 0
 MAX_STRING_SIZE = 15
 LOG_FILE = Path(os.getenv("HOME"), "log", "dataprofile.log")
+# coefficients of the cost model from scripts/calibrate_cost_model.py, and the runs recorded to refine them
+COST_MODEL_FILE = Path(os.getenv("HOME"), ".dataprofile", "cost_model.json")
+COST_RUNS_FILE = Path(os.getenv("HOME"), ".dataprofile", "cost_runs.jsonl")
+CATEGORY_SAMPLE_ROWS = 10000
+CATEGORY_MAX_RATIO = 0.5
+LOAD_CHUNK_ROWS = 100000
+LOAD_CHUNK_BYTES = 64 * 2 ** 20
+DECOMPRESS_BLOCK_BYTES = 2 ** 20
+DECOMPRESS_QUEUE_BLOCKS = 8
+DRIFT_PSI_THRESHOLD = 0.2
+DRIFT_KS_THRESHOLD = 0.1
+DRIFT_MISSING_THRESHOLD = 0.05
+DRIFT_TOP_K_THRESHOLD = 0.1
+CORRELATION_TOP_N = 10
+CORRELATION_SAMPLE_ROWS = 10000
+CORRELATION_BLOCK_SIZE = 512
+CORRELATION_MAX_CATEGORIES = 50
+HISTOGRAM_BINS = 16
+QUANTILE_HISTOGRAM_BINS = 10
+EXTERNAL_MEMORY_BUDGET = 2 ** 30
+# bytes in memory per byte of CSV text, to size the partitions of exact counting
+EXTERNAL_MEMORY_FACTOR = 4
+EXTERNAL_SAMPLE_ROWS = 100000
+EXTERNAL_TOP_K = 3
+FALLBACK_SAMPLE_ROWS = 10000
+DUPLICATE_TOP_N = 5
+# columns with at least this share of distinct values are checked as keys, alone and in pairs
+KEY_MIN_P_UNIQUE = 0.5
+KEY_MAX_CANDIDATES = 8
+SQL_FETCH_ROWS = 10000
+# distinct values whose frequencies each partition keeps, to find the most frequent values of partitioned frames
+PARTITION_TOP_CAPACITY = 1024
+# codepoints held in memory at once by the text statistics
+TEXT_BLOCK_CHARS = 2 ** 22
+TEXT_PATTERN_CHARS = 12
+TEXT_PATTERN_CAPACITY = 64
+# defaults of the cost model, from scripts/calibrate_cost_model.py on one core of a Linux VM
+COST_SECONDS_PER_MB = {'numeric': 0.04, 'boolean': 0.03, 'datetime': 0.035, 'object': 0.008}
+COST_COLUMN_SECONDS = 0.0025
+COST_WORKER_STARTUP_SECONDS = 0.01
+COST_TRANSFER_MB_PER_SECOND = 150.
+TUNING_MIN_SAMPLE_ROWS = 10000
+# bytes hashed at the head and tail of a watched file to tell an append from a rewrite
+WATCH_FINGERPRINT_BYTES = 2 ** 16
+# seconds a watched file must stay unchanged before a last line without a line break is profiled
+WATCH_SETTLE_SECONDS = 60
+# missing patterns and pairs of columns to report, and the most columns with a nullity correlation matrix
+MISSING_TOP_N = 10
+MISSING_MATRIX_MAX_COLUMNS = 12
+# cells of the null bitmaps unpacked at once when counting the rows pairs of columns miss together
+MISSING_BLOCK_CELLS = 2 ** 24
+# offending values kept for each data-quality rule
+RULE_EXAMPLES = 5
@@ -0,0 +1,244 @@
+"""Find the strongest correlations and associations between variables with blocked matrix products."""
+
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ._config import CORRELATION_BLOCK_SIZE, CORRELATION_MAX_CATEGORIES, CORRELATION_SAMPLE_ROWS, \
+    CORRELATION_TOP_N, RANDOM_STATE
+
+# a block of pairs: first variable index, second variable index, statistic and number of observations
+Pairs = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+PAIR_COLUMNS = ['var_a', 'var_b', 'method', 'value', 'n_obs']
+
+
+def _blocks(n: int, size: int) -> List[slice]:
+    """Split range(n) into consecutive slices of at most size items.
+
+    :param n: number of items
+    :param size: max number of items per block
+    :return: the slices
+    """
+    return [slice(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def _block_pairs(values: np.ndarray, n_obs: np.ndarray, rows: slice, cols: slice, top_n: int) -> Pairs:
+    """Keep the top_n strongest pairs of a block, each pair once and no variable with itself.
+
+    :param values: the statistic of each pair in the block
+    :param n_obs: number of observations behind each statistic
+    :param rows: the variables of the block rows
+    :param cols: the variables of the block columns
+    :param top_n: number of pairs to keep
+    :return: the kept pairs
+    """
+    i, j = np.meshgrid(np.arange(rows.start, rows.stop), np.arange(cols.start, cols.stop), indexing='ij')
+    keep = (i < j) & ~np.isnan(values)
+    i, j, values, n_obs = i[keep], j[keep], values[keep], n_obs[keep]
+    if len(values) > top_n:
+        top = np.argpartition(-np.abs(values), top_n - 1)[:top_n]
+        i, j, values, n_obs = i[top], j[top], values[top], n_obs[top]
+    return i, j, values, n_obs
+
+
+def _to_frame(pairs: List[Pairs], names: pd.Index, method: str, top_n: int) -> pd.DataFrame:
+    """Merge the pairs kept from every block into the top_n strongest pairs overall.
+
+    :param pairs: the pairs kept from each block
+    :param names: the variable names
+    :param method: name of the statistic
+    :param top_n: number of pairs to return
+    :return: a table of var_a, var_b, method, value and n_obs, strongest first
+    """
+    if not pairs:
+        return pd.DataFrame(columns=PAIR_COLUMNS)
+    i, j, values, n_obs = (np.concatenate(part) for part in zip(*pairs))
+    top = np.argsort(-np.abs(values), kind='stable')[:top_n]
+    return pd.DataFrame({'var_a': names[i[top]], 'var_b': names[j[top]], 'method': method,
+                         'value': values[top], 'n_obs': n_obs[top].astype('int64')}, columns=PAIR_COLUMNS)
+
+
+def _pearson_blocks(x: np.ndarray, top_n: int, block_size: int) -> Iterator[Pairs]:
+    """Pearson correlation of every pair of columns on the rows where both are present.
+
+    Each block of column pairs takes a few matrix products of the zero-filled data and its presence mask,
+    so memory stays bounded by the block size whatever the number of columns. Blocks of columns without
+    missing values take a single product.
+
+    :param x: the data, one column per variable, NaN for missing values; columns without missing values
+        should come first
+    :param top_n: number of pairs to keep from each block
+    :param block_size: number of columns per block
+    :return: the strongest pairs of each block
+    """
+    present = ~np.isnan(x)
+    complete = present.all(axis=0)
+    # centering first keeps the sums of squares well conditioned
+    x = np.where(present, x - np.nanmean(x, axis=0), 0.)
+    present = present.astype(float)
+    norms = np.sqrt((x * x).sum(axis=0))
+    blocks = _blocks(x.shape[1], block_size)
+    for k, rows in enumerate(blocks):
+        for cols in blocks[k:]:
+            xa, xb, ma, mb = x[:, rows], x[:, cols], present[:, rows], present[:, cols]
+            if complete[rows].all() and complete[cols].all():
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values = (xa.T @ xb) / np.outer(norms[rows], norms[cols])
+                values = np.where(np.isfinite(values), np.clip(values, -1, 1), np.nan)
+                yield _block_pairs(values, np.full(values.shape, float(len(x))), rows, cols, top_n)
+                continue
+            n_obs = ma.T @ mb
+            sum_a, sum_b = xa.T @ mb, ma.T @ xb
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cov = xa.T @ xb - sum_a * sum_b / n_obs
+                var_a = (xa * xa).T @ mb - sum_a ** 2 / n_obs
+                var_b = ma.T @ (xb * xb) - sum_b ** 2 / n_obs
+                values = np.where(var_a * var_b > 0, np.clip(cov / np.sqrt(var_a * var_b), -1, 1), np.nan)
+            yield _block_pairs(values, n_obs, rows, cols, top_n)
+
+
+def numeric_correlations(df: pd.DataFrame, method: str = 'pearson', top_n: int = CORRELATION_TOP_N,
+                         block_size: int = CORRELATION_BLOCK_SIZE) -> pd.DataFrame:
+    """Find the strongest Pearson or Spearman correlations between numerical variables.
+
+    Spearman correlations are Pearson correlations of the ranks; each variable is ranked once over all
+    of its values, so with missing values they approximate ``DataFrame.corr('spearman')``.
+
+    :param df: the numerical variables
+    :param method: 'pearson' or 'spearman'
+    :param top_n: number of pairs to return
+    :param block_size: number of variables per block
+    :return: a table of var_a, var_b, method, value and n_obs, strongest first
+    """
+    if method not in ('pearson', 'spearman'):
+        raise ValueError(f"method must be 'pearson' or 'spearman', got {method!r}")
+    data = df.rank() if method == 'spearman' else df
+    # variables without missing values go first, so that whole blocks take the single-product path
+    order = np.argsort(data.isnull().any().to_numpy(), kind='stable')
+    x = data.to_numpy(dtype=float, na_value=np.nan)[:, order]
+    return _to_frame(list(_pearson_blocks(x, top_n, block_size)), df.columns[order], method, top_n)
+
+
+def _category_blocks(n_categories: List[int], block_size: int) -> List[slice]:
+    """Group consecutive variables so that the one-hot columns of each group stay under block_size.
+
+    :param n_categories: number of categories of each variable
+    :param block_size: max number of one-hot columns per block, unless a single variable has more
+    :return: the slices of variables
+    """
+    blocks, start, total = [], 0, 0
+    for k, n in enumerate(n_categories):
+        if total and total + n > block_size:
+            blocks.append(slice(start, k))
+            start, total = k, 0
+        total += n
+    if total:
+        blocks.append(slice(start, len(n_categories)))
+    return blocks
+
+
+def _one_hot(codes: List[np.ndarray], n_categories: List[int]) -> np.ndarray:
+    """Encode variables as indicator columns, all zero on the rows where a variable is missing.
+
+    :param codes: the category codes of each variable, -1 for missing
+    :param n_categories: number of categories of each variable
+    :return: a matrix with one column per category
+    """
+    one_hot = np.zeros((len(codes[0]), sum(n_categories)))
+    offset = 0
+    for var_codes, n in zip(codes, n_categories):
+        rows = np.flatnonzero(var_codes >= 0)
+        one_hot[rows, offset + var_codes[rows]] = 1.
+        offset += n
+    return one_hot
+
+
+def _cramers_v_block(one_hot_a: np.ndarray, n_a: List[int], one_hot_b: np.ndarray, n_b: List[int]) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    """Cramér's V of every pair of variables between two blocks, on the rows where both are present.
+
+    :param one_hot_a: indicator columns of the first block
+    :param n_a: number of categories of each variable in the first block
+    :param one_hot_b: indicator columns of the second block
+    :param n_b: number of categories of each variable in the second block
+    :return: Cramér's V and the number of observations of each pair
+    """
+    starts_a, starts_b = np.cumsum([0] + n_a[:-1]), np.cumsum([0] + n_b[:-1])
+    var_a, var_b = np.repeat(np.arange(len(n_a)), n_a), np.repeat(np.arange(len(n_b)), n_b)
+    # every contingency table of the block at once: rows are categories of a, columns categories of b
+    observed = one_hot_a.T @ one_hot_b
+    row_totals = np.add.reduceat(observed, starts_b, axis=1)
+    col_totals = np.add.reduceat(observed, starts_a, axis=0)
+    expected = row_totals[:, var_b] * col_totals[var_a, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(observed > 0, observed ** 2 / expected, 0.)
+    # chi2 / n of each pair is the sum of observed^2 / (row total * column total) minus 1
+    phi2 = np.add.reduceat(np.add.reduceat(ratio, starts_a, axis=0), starts_b, axis=1) - 1
+    n_obs = np.add.reduceat(row_totals, starts_a, axis=0)
+    # number of categories of each variable seen on the rows where both are present
+    k_a = np.add.reduceat((row_totals > 0).astype(int), starts_a, axis=0)
+    k_b = np.add.reduceat((col_totals > 0).astype(int), starts_b, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.sqrt(np.maximum(phi2, 0) / (np.minimum(k_a, k_b) - 1))
+    return np.where(np.minimum(k_a, k_b) > 1, values, np.nan), n_obs
+
+
+def cramers_v(df: pd.DataFrame, top_n: int = CORRELATION_TOP_N, block_size: int = CORRELATION_BLOCK_SIZE,
+              max_categories: int = CORRELATION_MAX_CATEGORIES) -> pd.DataFrame:
+    """Find the strongest Cramér's V associations between categorical variables.
+
+    :param df: the categorical variables
+    :param top_n: number of pairs to return
+    :param block_size: max number of categories per block
+    :param max_categories: variables with more distinct values are left out
+    :return: a table of var_a, var_b, method, value and n_obs, strongest first
+    """
+    encoded = {name: pd.factorize(df[name]) for name in df}
+    encoded = {name: codes for name, (codes, uniques) in encoded.items() if 1 < len(uniques) <= max_categories}
+    names = pd.Index(list(encoded))
+    if len(names) < 2:
+        return pd.DataFrame(columns=PAIR_COLUMNS)
+    codes = list(encoded.values())
+    n_categories = [int(var_codes.max()) + 1 for var_codes in codes]
+    blocks = _category_blocks(n_categories, block_size)
+    one_hots = [_one_hot(codes[block], n_categories[block]) for block in blocks]
+    pairs = []
+    for k, rows in enumerate(blocks):
+        for cols, one_hot_b in zip(blocks[k:], one_hots[k:]):
+            values, n_obs = _cramers_v_block(one_hots[k], n_categories[rows], one_hot_b, n_categories[cols])
+            pairs.append(_block_pairs(values, n_obs, rows, cols, top_n))
+    return _to_frame(pairs, names, 'cramers_v', top_n)
+
+
+def get_correlations(df: pd.DataFrame, numerical_vars: List[str], categorical_vars: List[str],
+                     top_n: int = CORRELATION_TOP_N, sample_rows: Optional[int] = CORRELATION_SAMPLE_ROWS,
+                     random_state: int = RANDOM_STATE) -> pd.DataFrame:
+    """Collect the strongest Pearson, Spearman and Cramér's V pairs of a dataset.
+
+    :param df: the target dataset
+    :param numerical_vars: Interval variables, for Pearson and Spearman correlations
+    :param categorical_vars: Nominal and Binary variables, for Cramér's V
+    :param top_n: number of pairs to keep for each statistic
+    :param sample_rows: compute on a random sample of this many rows, None for all rows
+    :param random_state: Random seed for the row sampler
+    :return: a table of var_a, var_b, method, value and n_obs
+    """
+    logger.info("Getting 'Correlations' ready...")
+    if sample_rows and len(df) > sample_rows:
+        logger.info(f"Correlations are based on {sample_rows} sampled rows out of {len(df)}.")
+        df = df.sample(sample_rows, random_state=random_state)
+    tables = []
+    if len(numerical_vars) > 1:
+        # variables configured as Interval may hold text, which counts as missing as in their statistics
+        numerical = df[numerical_vars].apply(
+            lambda series: series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(series, errors='coerce'))
+        tables.append(numeric_correlations(numerical, 'pearson', top_n))
+        tables.append(numeric_correlations(numerical, 'spearman', top_n))
+    if len(categorical_vars) > 1:
+        tables.append(cramers_v(df[categorical_vars], top_n))
+    if not tables:
+        return pd.DataFrame(columns=PAIR_COLUMNS)
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,176 @@
+"""Compare two data profiles and measure how much each variable drifted."""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ._config import DRIFT_KS_THRESHOLD, DRIFT_MISSING_THRESHOLD, DRIFT_PSI_THRESHOLD, DRIFT_TOP_K_THRESHOLD
+
+QUANTILE_STATS = ['min', '5%', '25%', '50%', '75%', '95%', 'max']
+_QUANTILE_LEVELS = np.array([0, 0.05, 0.25, 0.5, 0.75, 0.95, 1])
+# the most frequent values kept by each variable type, as (value, frequency) statistics
+_TOP_K_STATS = {'Nominal': [('mode', 'mode_freq'), ('2nd_freq_value', '2nd_freq'), ('3rd_freq_value', '3rd_freq')],
+                'Binary': [('value1', 'n_value1'), ('value2', 'n_value2')]}
+# floor of a bin share in the PSI, so empty bins don't make it infinite
+_PSI_EPSILON = 1e-4
+
+
+def _all_stats(df_profile: Dict[str, Any]) -> pd.DataFrame:
+    """Stack the raw statistics of every variable type into one table with one row per variable.
+
+    :param df_profile: a dictionary of statistics
+    :return: the raw statistics of all variables
+    """
+    return pd.concat(df_profile['raw_stats'].values(), sort=False)
+
+
+def _numbers(stats: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """Read statistics as a float matrix, NaN where a variable doesn't have them.
+
+    :param stats: raw statistics of some variables
+    :param columns: the statistics to read
+    :return: a matrix with one row per variable
+    """
+    return pd.DataFrame(stats.reindex(columns=columns), dtype=object) \
+        .apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+
+def _cdf(x: np.ndarray, quantiles: np.ndarray) -> np.ndarray:
+    """Evaluate the piecewise-linear distribution functions through the stored quantiles of each variable.
+
+    :param x: points to evaluate, one row per variable
+    :param quantiles: min, 5%, 25%, 50%, 75%, 95% and max of each variable
+    :return: the fraction of values at or below each point
+    """
+    below = (quantiles[:, None, :] <= x[:, :, None]).sum(axis=2)
+    upper = np.clip(below, 1, len(_QUANTILE_LEVELS) - 1)
+    lo = np.take_along_axis(quantiles, upper - 1, axis=1)
+    hi = np.take_along_axis(quantiles, upper, axis=1)
+    level_lo, level_hi = _QUANTILE_LEVELS[upper - 1], _QUANTILE_LEVELS[upper]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cdf = level_lo + (x - lo) / (hi - lo) * (level_hi - level_lo)
+    cdf = np.where(below == 0, 0., np.where(below == len(_QUANTILE_LEVELS), 1., cdf))
+    return np.where(np.isnan(x) | np.isnan(quantiles).any(axis=1, keepdims=True), np.nan, cdf)
+
+
+def _bin_shares(cdf: np.ndarray) -> np.ndarray:
+    """Turn the distribution function at the inner bin edges into the share of values in each bin.
+
+    :param cdf: distribution function at the inner edges, one row per variable
+    :return: the share of each bin, the first and last bins open ended
+    """
+    n_rows = len(cdf)
+    return np.diff(np.hstack([np.zeros((n_rows, 1)), cdf, np.ones((n_rows, 1))]), axis=1)
+
+
+def quantile_drift(quantiles_a: np.ndarray, quantiles_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Approximate the PSI and the KS statistic of many variables from their stored quantiles.
+
+    Both distributions are taken as piecewise linear between their quantiles. The PSI bins are the
+    quantile intervals of profile a; the KS statistic is the largest gap between the two distribution
+    functions at any stored quantile.
+
+    :param quantiles_a: min, 5%, 25%, 50%, 75%, 95% and max of each variable in the baseline profile
+    :param quantiles_b: the same quantiles of the same variables in the current profile
+    :return: PSI and KS statistic of each variable
+    """
+    edges = quantiles_a[:, 1:-1]
+    shares_a = np.maximum(_bin_shares(_cdf(edges, quantiles_a)), _PSI_EPSILON)
+    shares_b = np.maximum(_bin_shares(_cdf(edges, quantiles_b)), _PSI_EPSILON)
+    psi = ((shares_b - shares_a) * np.log(shares_b / shares_a)).sum(axis=1)
+
+    points = np.hstack([quantiles_a, quantiles_b])
+    ks = np.abs(_cdf(points, quantiles_a) - _cdf(points, quantiles_b)).max(axis=1)
+    return psi, ks
+
+
+def _top_k_shares(stats: pd.DataFrame) -> pd.Series:
+    """Share of each stored frequent value, indexed by variable and value.
+
+    :param stats: raw statistics of some variables
+    :return: the share of each frequent value among all rows
+    """
+    shares = []
+    for type_, pairs in _TOP_K_STATS.items():
+        typed = stats[stats['type'] == type_]
+        for value, freq in pairs:
+            if value not in typed:
+                continue
+            share = pd.to_numeric(typed[freq], errors='coerce') / pd.to_numeric(typed['count'])
+            index = pd.MultiIndex.from_arrays([typed.index, typed[value].astype(str)])
+            shares.append(pd.Series(share.to_numpy(dtype=float), index=index))
+    if not shares:
+        return pd.Series([], index=pd.MultiIndex.from_arrays([[], []]), dtype=float)
+    return pd.concat(shares).dropna()
+
+
+def compare_profiles(profile_a: Dict[str, Any], profile_b: Dict[str, Any]) -> pd.DataFrame:
+    """Measure how each variable drifted from a baseline profile to a current one.
+
+    Everything is computed from the stored statistics, for all variables at once:
+
+    * missing_delta: change of the missing rate
+    * mean_shift: change of the mean in baseline standard deviations
+    * psi and ks: PSI and KS statistic approximated from the quantiles of Interval variables
+    * top_k_shift: largest change of the share of a stored frequent value of Nominal and Binary variables;
+      values that dropped out of the stored top values count as 0
+
+    :param profile_a: the baseline profile from ``get_df_profile``
+    :param profile_b: the current profile
+    :return: one row per variable of either profile, with its status ('common', 'new' or 'dropped'),
+        types, drift measures and whether any measure passed its threshold
+    """
+    stats_a, stats_b = _all_stats(profile_a), _all_stats(profile_b)
+    variables = stats_a.index.append(stats_b.index.difference(stats_a.index, sort=False))
+    stats_a, stats_b = stats_a.reindex(variables), stats_b.reindex(variables)
+
+    drift = pd.DataFrame(index=variables)
+    in_a, in_b = stats_a['type'].notna().to_numpy(), stats_b['type'].notna().to_numpy()
+    drift['status'] = np.where(in_a & in_b, 'common', np.where(in_a, 'dropped', 'new'))
+    drift['type_a'], drift['type_b'] = stats_a['type'], stats_b['type']
+
+    missing_a, missing_b = (_numbers(stats, ['n_missing']).ravel() / _numbers(stats, ['count']).ravel()
+                            for stats in (stats_a, stats_b))
+    drift['missing_a'], drift['missing_b'], drift['missing_delta'] = missing_a, missing_b, missing_b - missing_a
+
+    interval = ((stats_a['type'] == 'Interval') & (stats_b['type'] == 'Interval')).to_numpy()
+    mean_a, std_a = _numbers(stats_a, ['mean', 'std']).T
+    mean_b = _numbers(stats_b, ['mean']).ravel()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drift['mean_shift'] = np.where(interval & (std_a > 0), (mean_b - mean_a) / std_a, np.nan)
+    psi, ks = np.full(len(variables), np.nan), np.full(len(variables), np.nan)
+    if interval.any():
+        psi[interval], ks[interval] = quantile_drift(_numbers(stats_a[interval], QUANTILE_STATS),
+                                                     _numbers(stats_b[interval], QUANTILE_STATS))
+    drift['psi'], drift['ks'] = psi, ks
+
+    shares_a, shares_b = _top_k_shares(stats_a), _top_k_shares(stats_b)
+    common = stats_a.index[(stats_a['type'] == stats_b['type']).to_numpy()]
+    shifts = shares_b.sub(shares_a, fill_value=0).abs().groupby(level=0).max()
+    drift['top_k_shift'] = shifts.reindex(common).reindex(variables)
+
+    drift['drifted'] = (drift['status'] != 'common') | (drift['type_a'] != drift['type_b']) \
+        | (drift['psi'] >= DRIFT_PSI_THRESHOLD) | (drift['ks'] >= DRIFT_KS_THRESHOLD) \
+        | (drift['missing_delta'].abs() >= DRIFT_MISSING_THRESHOLD) | (drift['top_k_shift'] >= DRIFT_TOP_K_THRESHOLD)
+    return drift
+
+
+def _format_measure(value: Any) -> str:
+    """Format a drift measure, with an empty cell where it doesn't apply.
+
+    :param value: a cell of the drift table
+    :return: the text of the cell
+    """
+    if isinstance(value, float):
+        return '' if np.isnan(value) else f"{value:,.4f}"
+    return '' if value is None else value
+
+
+def format_drift(drift: pd.DataFrame) -> pd.DataFrame:
+    """Keep the drifted variables and format their measures for the report.
+
+    :param drift: the output of :func:`compare_profiles`
+    :return: a table of strings, one row per drifted variable
+    """
+    return drift[drift['drifted']].drop(columns='drifted').applymap(_format_measure)
@@ -0,0 +1,341 @@
+"""Find duplicate rows and check candidate keys with 64 bit hashes instead of comparing the values.
+
+Each column hashes in one vectorized pass and the hashes of the columns of a row combine into a row hash, so
+duplicates are counted by sorting integers. Past a memory budget, the hashes spill to disk as sorted runs that are
+read back one range of hash values at a time, so streams of any length are counted exactly, up to collisions.
+"""
+
+import math
+import numbers
+import shutil
+import tempfile
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ._config import DUPLICATE_TOP_N, EXTERNAL_MEMORY_BUDGET, KEY_MAX_CANDIDATES, KEY_MIN_P_UNIQUE
+
+# bytes held in memory per row: the hash and the position
+_ROW_BYTES = 16
+# rows of an object column whose distinct values decide how to hash it
+_PROBE_ROWS = 1000
+# flips the bits of floats that aren't integers, so they don't map onto the integers with the same bits
+_FLOAT_TAG = np.uint64(0x9e3779b97f4a7c15)
+# mixed into the hash of every value, so a value hashing to 0, like the number 0, stays apart from missing values
+_VALUE_TAG = np.uint64(0x2545f4914f6cdd1d)
+_GROUP_COLUMNS = ['n_copies', 'first_row']
+KEY_COLUMNS = ['key', 'n_columns', 'n_missing', 'n_duplicated', 'is_unique']
+
+
+class DuplicateCounts(NamedTuple):
+    """Exact counts of duplicate rows, and the largest groups of equal rows."""
+
+    n_row: int
+    n_distinct: int
+    groups: pd.DataFrame
+
+
+def _number_keys(series: pd.Series) -> np.ndarray:
+    """Map the numbers of a column to 64 bit keys, equal for equal values whatever their dtype.
+
+    Integers keep their 64 bits and integral floats turn into the same integers, so a column that is int64 in one
+    chunk and float64 in another, because of missing values, maps alike without losing integers past 2 ** 53.
+    Other floats keep their bits, flipped so they stay apart from the integers.
+
+    :param series: a numerical column
+    :return: the key of each value, 0 for missing values
+    """
+    if pd.api.types.is_unsigned_integer_dtype(series):
+        return series.to_numpy(dtype=np.uint64, na_value=0)
+    if pd.api.types.is_integer_dtype(series):
+        return series.to_numpy(dtype=np.int64, na_value=0).view(np.uint64)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid='ignore'):
+        integral = (values == np.round(values)) & (np.abs(values) < 2. ** 63)
+    keys = values.view(np.uint64) ^ _FLOAT_TAG
+    keys[integral] = values[integral].astype(np.int64).view(np.uint64)
+    return keys
+
+
+def _object_key(value: object) -> str:
+    """Describe a value that isn't text by its type and value, so 1 and '1' hash apart, but 1 and 1.0 alike.
+
+    :param value: a value of an object column
+    :return: the text to hash; strings hash as themselves
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (bool, np.bool_)):
+        return f"\x00b{value}"
+    if isinstance(value, numbers.Integral) or isinstance(value, numbers.Real) and float(value).is_integer():
+        return f"\x00n{int(value)}"
+    if isinstance(value, numbers.Real):
+        return f"\x00n{float(value)!r}"
+    return f"\x00{type(value).__name__}{value}"
+
+
+def value_hashes(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash the values of a column, alike whatever dtype it was inferred with.
+
+    Numbers hash by :func:`_number_keys` and dates as nanoseconds; any other value hashes as a Python object.
+    Objects that aren't all text, or with few distinct values among their first rows, are factorized first, which
+    finds the missing values on the way, and only their distinct values are hashed.
+
+    :param series: the column
+    :return: the hash of each value, 0 for missing values and never for a value, and the missing mask
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series) \
+            or pd.api.types.is_datetime64_any_dtype(series):
+        missing = series.isna().to_numpy()
+        values = pd.DatetimeIndex(series).asi8 if pd.api.types.is_datetime64_any_dtype(series) \
+            else _number_keys(series)
+        hashes = pd.util.hash_array(values)
+    else:
+        values = series.to_numpy(dtype=object)
+        # hash_array hashes objects by their text, which would fold 1 and '1' together
+        mixed = pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty')
+        if mixed or len(pd.unique(values[:_PROBE_ROWS])) * 2 <= min(len(values), _PROBE_ROWS):
+            codes, uniques = pd.factorize(values)
+            missing = codes < 0
+            uniques = np.array([_object_key(value) for value in uniques] if mixed else uniques, dtype=object)
+            # missing values take the code -1, the last hash
+            hashes = np.append(pd.util.hash_array(uniques, categorize=False), np.uint64(0))[codes]
+        else:
+            # mostly distinct values: hashing them all is cheaper than finding the distinct ones
+            missing = pd.isna(values)
+            if missing.any():
+                values = np.where(missing, '', values)
+            hashes = pd.util.hash_array(values, categorize=False)
+    hashes ^= _VALUE_TAG
+    hashes[missing] = 0
+    return hashes, missing
+
+
+def combine_hashes(hashes: Iterable[np.ndarray], n_row: int) -> np.ndarray:
+    """Combine the hashes of the columns of each row into a row hash, which depends on the order of the columns.
+
+    :param hashes: the value hashes of each column
+    :param n_row: number of rows
+    :return: the hash of each row
+    """
+    combined = np.full(n_row, 0x345678, dtype=np.uint64)
+    multiplier = np.uint64(1000003)
+    with np.errstate(over='ignore'):
+        for i, column in enumerate(hashes):
+            combined ^= column
+            combined *= multiplier
+            multiplier += np.uint64(82520 + 2 * i)
+        combined += np.uint64(97531)
+    return combined
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash every row of a frame.
+
+    :param df: the frame
+    :return: the hash of each row
+    """
+    return combine_hashes((value_hashes(series)[0] for _, series in df.items()), len(df))
+
+
+def _count_groups(hashes: np.ndarray, positions: np.ndarray, top_n: int) -> Tuple[int, pd.DataFrame]:
+    """Count the distinct hashes, and find the largest groups of equal hashes.
+
+    :param hashes: the hashes
+    :param positions: the row of each hash
+    :param top_n: number of groups to keep
+    :return: number of distinct hashes, and the copies and first row of the largest groups
+    """
+    order = np.argsort(hashes, kind='stable')
+    hashes, positions = hashes[order], positions[order]
+    starts = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]]) if len(hashes) else np.empty(0, dtype=np.intp)
+    copies = np.diff(np.r_[starts, len(hashes)])
+    repeated = copies > 1
+    groups = pd.DataFrame({'n_copies': copies[repeated],
+                           'first_row': np.minimum.reduceat(positions, starts)[repeated] if len(starts)
+                           else np.empty(0, dtype=np.int64)}, columns=_GROUP_COLUMNS)
+    return len(starts), _top_groups([groups], top_n)
+
+
+def _top_groups(groups: List[pd.DataFrame], top_n: int) -> pd.DataFrame:
+    """Keep the groups with the most copies, the earliest first among equal copies.
+
+    :param groups: groups of equal rows
+    :param top_n: number of groups to keep
+    :return: the largest groups
+    """
+    groups = pd.concat(groups, ignore_index=True)
+    return groups.sort_values(['n_copies', 'first_row'], ascending=[False, True]).head(top_n).reset_index(drop=True)
+
+
+class HashIndex:
+    """Count equal hashes over a stream of chunks, spilling sorted runs to disk past a memory budget."""
+
+    def __init__(self, memory_budget: int = EXTERNAL_MEMORY_BUDGET,
+                 tmp_dir: Optional[Union[str, Path]] = None) -> None:
+        """Initialize an empty index.
+
+        :param memory_budget: bytes of hashes and positions to hold in memory
+        :param tmp_dir: directory of the spilled runs, the system default if None
+        """
+        self.memory_budget = memory_budget
+        self.tmp_dir = tmp_dir
+        self.n_row = 0
+        self.buffer: List[np.ndarray] = []
+        self.n_buffered = 0
+        self.runs: List[Tuple[Path, Path]] = []
+        self.run_dir: Optional[Path] = None
+
+    def __enter__(self) -> 'HashIndex':
+        """Use the index in a with block, which removes the spilled runs."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Remove the spilled runs."""
+        self.close()
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Add the hashes of the next rows of the stream.
+
+        :param hashes: the hash of each row
+        """
+        self.buffer.append(hashes)
+        self.n_buffered += len(hashes)
+        self.n_row += len(hashes)
+        if self.n_buffered * _ROW_BYTES > self.memory_budget:
+            self._spill()
+
+    def _buffered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Take the buffered hashes out of the buffer, with their positions in the stream."""
+        hashes = np.concatenate(self.buffer) if self.buffer else np.empty(0, dtype=np.uint64)
+        positions = np.arange(self.n_row - self.n_buffered, self.n_row, dtype=np.int64)
+        self.buffer, self.n_buffered = [], 0
+        return hashes, positions
+
+    def _spill(self) -> None:
+        """Write the buffered hashes to disk as a run sorted by hash."""
+        hashes, positions = self._buffered()
+        if not len(hashes):
+            return
+        if self.run_dir is None:
+            self.run_dir = Path(tempfile.mkdtemp(dir=self.tmp_dir))
+        order = np.argsort(hashes, kind='stable')
+        run = (self.run_dir / f'hashes_{len(self.runs)}.npy', self.run_dir / f'positions_{len(self.runs)}.npy')
+        np.save(run[0], hashes[order])
+        np.save(run[1], positions[order])
+        self.runs.append(run)
+
+    def count(self, top_n: int = DUPLICATE_TOP_N) -> DuplicateCounts:
+        """Count the distinct hashes added so far, and find the largest groups of equal hashes.
+
+        Spilled runs are read back one range of hash values at a time, each range of every run holding about
+        the memory budget together.
+
+        :param top_n: number of groups to keep
+        :return: the counts
+        """
+        if not self.runs:
+            hashes = np.concatenate(self.buffer) if self.buffer else np.empty(0, dtype=np.uint64)
+            n_distinct, groups = _count_groups(hashes, np.arange(self.n_row, dtype=np.int64), top_n)
+            return DuplicateCounts(self.n_row, n_distinct, groups)
+        self._spill()
+        n_ranges = math.ceil(self.n_row * _ROW_BYTES / self.memory_budget)
+        bounds = [np.uint64(2 ** 64 * i // n_ranges) for i in range(n_ranges)]
+        runs = [(np.load(hashes, mmap_mode='r'), np.load(positions, mmap_mode='r')) for hashes, positions in self.runs]
+        n_distinct, groups = 0, []
+        for i, low in enumerate(bounds):
+            pieces = []
+            for hashes, positions in runs:
+                start = np.searchsorted(hashes, low)
+                end = np.searchsorted(hashes, bounds[i + 1]) if i + 1 < n_ranges else len(hashes)
+                pieces.append((np.asarray(hashes[start:end]), np.asarray(positions[start:end])))
+            n, range_groups = _count_groups(np.concatenate([h for h, _ in pieces]),
+                                            np.concatenate([p for _, p in pieces]), top_n)
+            n_distinct += n
+            groups.append(range_groups)
+        del runs
+        return DuplicateCounts(self.n_row, n_distinct, _top_groups(groups, top_n))
+
+    def close(self) -> None:
+        """Remove the spilled runs."""
+        if self.run_dir is not None:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            self.run_dir = None
+        self.runs = []
+
+
+def find_duplicates(df: pd.DataFrame, top_n: int = DUPLICATE_TOP_N,
+                    memory_budget: int = EXTERNAL_MEMORY_BUDGET) -> DuplicateCounts:
+    """Count the duplicate rows of a frame, and find the largest groups of equal rows.
+
+    :param df: the frame
+    :param top_n: number of groups to keep
+    :param memory_budget: bytes of hashes to hold in memory
+    :return: the counts
+    """
+    with HashIndex(memory_budget) as index:
+        index.add(row_hashes(df))
+        return index.count(top_n)
+
+
+def describe_duplicates(duplicates: DuplicateCounts, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Tabulate the largest groups of duplicate rows, with the values of each group when the rows are at hand.
+
+    :param duplicates: counts from :func:`find_duplicates` or a :class:`HashIndex`
+    :param df: the counted frame, None when only a sample of the rows is in memory
+    :return: the copies and first row of each group, followed by its values
+    """
+    groups = duplicates.groups
+    if df is None or not len(groups):
+        return groups
+    return pd.concat([groups, df.iloc[groups['first_row'].to_numpy()].reset_index(drop=True)], axis=1)
+
+
+def key_candidates(raw_stats: Dict[str, pd.DataFrame], n_row: int, min_p_unique: float = KEY_MIN_P_UNIQUE,
+                   max_candidates: int = KEY_MAX_CANDIDATES) -> pd.DataFrame:
+    """Pick the columns that could identify the rows: no missing values, and mostly distinct values.
+
+    :param raw_stats: the raw statistics of each variable type
+    :param n_row: number of rows of the dataset
+    :param min_p_unique: min share of distinct values of a candidate
+    :param max_candidates: max number of candidates, the most distinct first
+    :return: one row per candidate with its distinct values and missing values
+    """
+    stats = pd.concat([item[['n_unique', 'n_missing']] for item in raw_stats.values()])
+    stats = stats.apply(pd.to_numeric, errors='coerce').dropna()
+    candidates = stats[(stats['n_missing'] == 0) & (stats['n_unique'] >= min_p_unique * n_row)]
+    return candidates.sort_values('n_unique', ascending=False, kind='mergesort').head(max_candidates)
+
+
+def check_keys(df: Optional[pd.DataFrame], candidates: pd.DataFrame, n_row: int,
+               max_columns: int = 2) -> pd.DataFrame:
+    """Check which candidate columns, alone or combined, hold a distinct value for every row.
+
+    Single columns are decided by their distinct values. Combinations of the candidates that aren't keys
+    alone are checked on the row hashes of their columns, only when the whole frame is in memory.
+
+    :param df: the frame, None when only a sample of the rows is in memory
+    :param candidates: the candidates from :func:`key_candidates`
+    :param n_row: number of rows of the dataset
+    :param max_columns: max number of columns of a composite key
+    :return: one row per checked key with its missing values, duplicated values and whether it's unique
+    """
+    keys = []
+    for col, (n_unique, n_missing) in candidates[['n_unique', 'n_missing']].iterrows():
+        keys.append((f'{col}', 1, int(n_missing), int(n_row - n_missing - n_unique), n_unique == n_row))
+    others = [col for col, key in zip(candidates.index, keys) if not key[-1]]
+    if df is not None and len(df) == n_row:
+        hashes: Dict[str, np.ndarray] = {}
+        for size in range(2, max_columns + 1):
+            for columns in combinations(others, size):
+                for col in columns:
+                    if col not in hashes:
+                        hashes[col] = value_hashes(df[col])[0]
+                n_distinct = len(np.unique(combine_hashes((hashes[col] for col in columns), n_row)))
+                keys.append((', '.join(f'{col}' for col in columns), size, 0, n_row - n_distinct,
+                             n_distinct == n_row))
+    return pd.DataFrame(keys, columns=KEY_COLUMNS).sort_values(['is_unique', 'n_columns', 'n_duplicated'],
+                                                               ascending=[False, True, True], kind='mergesort')
@@ -0,0 +1,205 @@
+"""A scikit-learn style estimator that renders data profile reports."""
+
+from typing import Optional
+
+import pandas as pd
+
+from ._config import DEFAULT_SAMPLE_SIZE, RANDOM_STATE
+from ._profile_config import ProfileConfig
+from ._profiling import get_df_profile, get_a_sample
+from ._drift import compare_profiles
+from .exporting import export_profile
+from .reporting import profile_to_str, print_report, save_report
+
+try:
+    from sklearn.base import BaseEstimator, TransformerMixin
+    from sklearn.exceptions import NotFittedError
+except ImportError:  # scikit-learn is optional, it only lets ProfileReport join sklearn pipelines
+    class BaseEstimator:  # type: ignore
+        """Stand-in for ``sklearn.base.BaseEstimator``."""
+
+    class TransformerMixin:  # type: ignore
+        """Stand-in for ``sklearn.base.TransformerMixin``."""
+
+        def fit_transform(self, X, y=None, **fit_params):
+            """Fit to data, then transform it."""
+            return self.fit(X, **fit_params).transform(X)
+
+    class NotFittedError(ValueError, AttributeError):  # type: ignore
+        """Raised when a report is shown before the profile is fitted."""
+
+
+class ChangedBehaviorWarning(UserWarning):
+    """Raised when arguments changed after the last fit; scikit-learn no longer ships this warning."""
+
+
+class ProfileReport(BaseEstimator, TransformerMixin):
+    """print to screen or save a profile report to a file for a given pandas dataframe."""
+
+    def __init__(self,
+                 sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 var_per_row: int = 6,
+                 random_state: int = RANDOM_STATE,
+                 num_works: int = -1,
+                 config: Optional[ProfileConfig] = None) -> None:
+        """Initialize class.
+
+        :param sample_size:
+        :param var_per_row:
+        :param random_state:
+        :param num_works:
+        :param config: the columns to profile, stat groups to skip and type overrides
+        """
+        self._sample_size = sample_size
+        self._var_per_row = var_per_row
+        self._random_state = random_state
+        self._num_works = num_works
+        self._config = config
+        self.df_profile = None
+        self._is_new_arg = False
+
+    @property
+    def sample_size(self) -> int:
+        return self._sample_size
+
+    @sample_size.setter
+    def sample_size(self, new_sample_size) -> None:
+        self._sample_size = new_sample_size
+        self._is_new_arg = True
+        print(f"sample size set to {self._sample_size}")
+
+    @property
+    def var_per_row(self) -> int:
+        return self._var_per_row
+
+    @var_per_row.setter
+    def var_per_row(self, new_var_per_row) -> None:
+        self._var_per_row = new_var_per_row
+        self._is_new_arg = True
+        print(f"sample size set to {self._var_per_row}")
+
+    @property
+    def num_works(self) -> int:
+        return self._num_works
+
+    @num_works.setter
+    def num_works(self, new_num_works) -> None:
+        self._num_works = new_num_works
+        self._is_new_arg = True
+        print(f"sample size set to {self._num_works}")
+
+    @property
+    def random_state(self) -> int:
+        return self._random_state
+
+    @random_state.setter
+    def random_state(self, new_random_state) -> None:
+        self._random_state = new_random_state
+        self._is_new_arg = True
+        print(f"sample size set to {self._random_state}")
+
+    @property
+    def config(self) -> Optional[ProfileConfig]:
+        return self._config
+
+    @config.setter
+    def config(self, new_config) -> None:
+        self._config = new_config
+        self._is_new_arg = True
+        print(f"config set to {self._config}")
+
+    def _check_fitted(self) -> None:
+        """
+        Check if the data profile file has been rendered.
+
+        :return:
+        """
+        if not self.df_profile:
+            raise NotFittedError
+
+    def _check_new_args(self) -> None:
+        """
+        Check if the arguments have been updated since last fit.
+
+        :return:
+        """
+        if self._is_new_arg:
+            raise ChangedBehaviorWarning("new args inputted after last fit!")
+
+    def fit(self, df: pd.DataFrame):
+        self._df_to_profile(df)
+        self._is_new_arg = False
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.show_report()
+        return df
+
+    def _df_to_profile(self, df: pd.DataFrame) -> None:
+        """
+        Get the data profile.
+
+        :param df:
+        :return:
+        """
+        if self._sample_size > 0:
+            sample_df = get_a_sample(df, self._sample_size, self._random_state)
+        else:
+            sample_df = df
+
+        self.df_profile = get_df_profile(sample_df, self._num_works, config=self._config)
+
+    def show_report(self) -> None:
+        """
+        Print the data profile to the screen.
+
+        :return:
+        """
+        self._check_fitted()
+        self._check_new_args()
+        print_report(self.df_profile, self._var_per_row)
+
+    def save_report(self, report_file: str) -> None:
+        """
+        Save the data profile to as file.
+
+        :param report_file:
+        :return:
+        """
+        if report_file.split('.')[-1] not in ['md', 'html', 'txt']:
+            raise NotImplementedError("file type doesn't support!")
+        self._check_fitted()
+        self._check_new_args()
+        save_report(self.df_profile, self._var_per_row, report_file)
+        print(f"Report saved to {report_file}")
+
+    def export(self, export_file: str, table: Optional[str] = None) -> None:
+        """
+        Export the typed statistics as JSON Lines ('.jsonl') or a Parquet table ('.parquet').
+
+        :param export_file:
+        :param table: name of the dataset, stored with every variable
+        :return: None
+        """
+        self._check_fitted()
+        self._check_new_args()
+        export_profile(self.df_profile, export_file, table)
+        print(f"Profile exported to {export_file}")
+
+    def compare(self, baseline: 'ProfileReport') -> pd.DataFrame:
+        """
+        Measure the drift of every variable from a baseline profile, and add a drift section to the report.
+
+        :param baseline: a fitted ProfileReport of the reference data
+        :return: drift measures of each variable, see ``compare_profiles``
+        """
+        self._check_fitted()
+        baseline._check_fitted()
+        self.df_profile['drift'] = compare_profiles(baseline.df_profile, self.df_profile)
+        return self.df_profile['drift']
+
+    def __str__(self):
+        table_fmt = 'psql'
+        line_breaker = '\n'
+        report_str = profile_to_str(self.df_profile, self._var_per_row, table_fmt, line_breaker)
+        return line_breaker.join(report_str)
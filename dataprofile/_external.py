@@ -0,0 +1,205 @@
+"""Count distinct values, frequent values and duplicate rows exactly for CSV files larger than memory.
+
+Values are hash-partitioned into temporary files while the file streams in chunks: equal values always land in the
+same partition, so counting each partition on its own and adding up is exact. Rows are counted on their hashes alone,
+in a :class:`HashIndex` that spills to disk past the memory budget.
+"""
+
+import datetime
+import io
+import math
+import os
+import pickle
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ._compression import open_csv, uncompressed_size
+from ._config import EXTERNAL_MEMORY_BUDGET, EXTERNAL_MEMORY_FACTOR, EXTERNAL_SAMPLE_ROWS, EXTERNAL_TOP_K, \
+    LOAD_CHUNK_ROWS, RANDOM_STATE
+from ._duplicates import DuplicateCounts, HashIndex, row_hashes
+from ._var_statistics import ColumnCounts
+
+
+class ExactCounts(NamedTuple):
+    """Exact table and variable counts over a whole dataset."""
+
+    n_row: int
+    n_missing_cell: int
+    n_empty_row: int
+    n_duplicated_row: int
+    columns: Dict[str, ColumnCounts]
+    duplicates: Optional[DuplicateCounts] = None
+
+
+def n_partitions(file_size: int, memory_budget: int = EXTERNAL_MEMORY_BUDGET) -> int:
+    """Pick the number of partitions so that one partition of the parsed file fits in the memory budget.
+
+    :param file_size: size of the file in bytes
+    :param memory_budget: bytes available to count one partition
+    :return: number of partitions
+    """
+    return max(1, math.ceil(file_size * EXTERNAL_MEMORY_FACTOR / memory_budget))
+
+
+def append_pickle(path: Path, obj: Any) -> None:
+    """Append a pickled object to a file, like a partition or a checkpoint.
+
+    :param path: the file
+    :param obj: the values to append
+    """
+    with open(path, 'ab') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_pickles(path: Path) -> List[Any]:
+    """Read back every object appended to a file.
+
+    :param path: the file
+    :return: the appended objects, in order; empty if nothing was appended
+    """
+    objs = []
+    if not path.exists():
+        return objs
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                objs.append(pickle.load(f))
+            except EOFError:
+                return objs
+
+
+def _split(values: Any, hashes: np.ndarray, n_parts: int) -> List[Tuple[int, Any]]:
+    """Group values by their partition.
+
+    :param values: a numpy array or a DataFrame
+    :param hashes: the hash of each value or row
+    :param n_parts: number of partitions
+    :return: the partition and values of each non-empty partition
+    """
+    parts = hashes % np.uint64(n_parts)
+    order = np.argsort(parts, kind='stable')
+    bounds = np.searchsorted(parts[order], np.arange(n_parts + 1))
+    pieces = []
+    for part in range(n_parts):
+        rows = order[bounds[part]:bounds[part + 1]]
+        if len(rows):
+            pieces.append((part, values.iloc[rows] if isinstance(values, pd.DataFrame) else values[rows]))
+    return pieces
+
+
+class _Reservoir:
+    """Keep a uniform random sample of the rows of a stream: the rows with the smallest random keys."""
+
+    def __init__(self, n_rows: int, random_state: int) -> None:
+        """Initialize the reservoir.
+
+        :param n_rows: number of rows to keep
+        :param random_state: Random seed of the keys
+        """
+        self.n_rows = n_rows
+        self.rng = np.random.RandomState(random_state)
+        self.rows: Optional[pd.DataFrame] = None
+        self.keys = np.empty(0)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Offer the rows of a chunk to the sample.
+
+        :param chunk: consecutive rows of the dataset
+        """
+        keys = np.concatenate([self.keys, self.rng.random_sample(len(chunk))])
+        rows = chunk if self.rows is None else pd.concat([self.rows, chunk])
+        if len(keys) > self.n_rows:
+            keep = np.sort(np.argpartition(keys, self.n_rows - 1)[:self.n_rows])
+            keys, rows = keys[keep], rows.iloc[keep]
+        self.keys, self.rows = keys, rows
+
+
+def count_exact(file: Union[str, Path], encoding: str = 'utf8', sample_rows: int = EXTERNAL_SAMPLE_ROWS,
+                memory_budget: int = EXTERNAL_MEMORY_BUDGET, chunk_rows: int = LOAD_CHUNK_ROWS,
+                tmp_dir: Optional[Union[str, Path]] = None, top_k: int = EXTERNAL_TOP_K,
+                random_state: int = RANDOM_STATE,
+                usecols: Optional[List[str]] = None) -> Tuple[ExactCounts, pd.DataFrame]:
+    """Count a CSV file exactly under a memory budget, and draw a random sample of its rows on the way.
+
+    Values are compared as they are written in the file, so the counts of each column are those of the
+    text, with every chunk parsed alike.
+
+    :param file: the CSV file, plain or compressed
+    :param encoding: encoding of the CSV file
+    :param sample_rows: number of rows to sample for the other statistics
+    :param memory_budget: bytes available to count one partition
+    :param chunk_rows: number of rows per chunk
+    :param tmp_dir: directory of the temporary partition files, the system default if None
+    :param top_k: number of most frequent values to keep for each column
+    :param random_state: Random seed for the row sampler
+    :param usecols: names of the columns to count, all columns if None
+    :return: the exact counts, and the sample parsed with the default dtypes
+    """
+    import tqdm
+
+    file = Path(file)
+    n_parts = n_partitions(uncompressed_size(file), memory_budget)
+    logger.info(f"Counting {file} exactly in {n_parts} partitions...")
+    log_info_header = datetime.datetime.today().strftime("%Y-%m-%d at %X|INFO|")
+
+    n_row = n_empty_row = 0
+    n_missing: Dict[str, int] = {}
+    reservoir = _Reservoir(sample_rows, random_state)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp, open_csv(file) as source, \
+            HashIndex(memory_budget, tmp) as row_index:
+        tmp = Path(tmp)
+        chunks = pd.read_csv(source, encoding=encoding, dtype=str, chunksize=chunk_rows, usecols=usecols)
+        # one partition file for all the columns, open for the whole pass
+        with ExitStack() as stack:
+            partitions = [stack.enter_context(open(tmp / f'{part}.pkl', 'wb')) for part in range(n_parts)]
+            for chunk in tqdm.tqdm(chunks, desc=f"{log_info_header}Partitioning rows", unit=' chunks'):
+                columns = list(chunk.columns)
+                missing = chunk.isnull()
+                n_row += len(chunk)
+                n_empty_row += int(missing.all(axis=1).sum())
+                row_index.add(row_hashes(chunk))
+                for i, col in enumerate(columns):
+                    n_missing[col] = n_missing.get(col, 0) + int(missing[col].sum())
+                    values = chunk[col].dropna().to_numpy(dtype=object)
+                    for part, piece in _split(values, pd.util.hash_array(values), n_parts):
+                        pickle.dump((i, piece), partitions[part], protocol=pickle.HIGHEST_PROTOCOL)
+                reservoir.update(chunk)
+
+        duplicates = row_index.count()
+        n_unique = {col: 0 for col in n_missing}
+        tops: Dict[str, List[pd.Series]] = {col: [] for col in n_missing}
+        for part in tqdm.trange(n_parts, desc=f"{log_info_header}Counting partitions",
+                                bar_format='{l_bar}{bar:40}{n_fmt}/{total_fmt}'):
+            pieces: Dict[int, List[np.ndarray]] = {}
+            for i, piece in load_pickles(tmp / f'{part}.pkl'):
+                pieces.setdefault(i, []).append(piece)
+            os.remove(tmp / f'{part}.pkl')
+            for i, col in enumerate(n_missing):
+                if i in pieces:
+                    counts = pd.Series(np.concatenate(pieces.pop(i))).value_counts()
+                    n_unique[col] += len(counts)
+                    tops[col].append(counts.head(top_k))
+
+    columns = {}
+    for col in n_missing:
+        # every value lives in one partition, so the top values of the partitions hold the overall top values
+        top = pd.concat(tops[col]).sort_values(ascending=False, kind='mergesort').head(top_k) if tops[col] \
+            else pd.Series([], dtype='int64')
+        columns[col] = ColumnCounts(n_row, n_missing[col], n_unique[col], top)
+    counts = ExactCounts(n_row, sum(n_missing.values()), n_empty_row, duplicates.n_row - duplicates.n_distinct,
+                         columns, duplicates)
+
+    if reservoir.rows is not None:
+        sample = reservoir.rows
+    else:
+        with open_csv(file) as source:
+            sample = pd.read_csv(source, encoding=encoding, nrows=0, usecols=usecols)
+    # parse the sampled text again, so its dtypes are inferred as if the whole file were loaded
+    sample = pd.read_csv(io.StringIO(sample.to_csv(index=False)), low_memory=False)
+    return counts, sample
@@ -0,0 +1,434 @@
+"""Load datasets into pandas DataFrames for profiling."""
+
+import codecs
+import io
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, List, Union, Dict, Tuple, Optional, Iterable, Set
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ._compression import compression_of, open_csv, uncompressed_size
+from ._config import CATEGORY_SAMPLE_ROWS, CATEGORY_MAX_RATIO, LOAD_CHUNK_ROWS, LOAD_CHUNK_BYTES
+from ._profile_config import ProfileConfig
+
+DtypeChanges = Dict[str, Tuple[str, str]]
+READERS = ('pandas', 'parallel', 'pyarrow')
+
+
+def select_columns(file: Union[str, Path], encoding: str = 'utf8',
+                   config: Optional[ProfileConfig] = None) -> Optional[List[str]]:
+    """Read the header of a CSV file and keep the columns a config profiles, so the rest are never parsed.
+
+    :param file: the CSV file
+    :param encoding: encoding of the CSV file
+    :param config: the columns to profile
+    :return: the names of the columns to load, or None to load them all
+    """
+    if config is None or not (config.include or config.exclude):
+        return None
+    with open_csv(file) as source:
+        columns = list(pd.read_csv(source, encoding=encoding, nrows=0).columns)
+    selected = config.select(columns)
+    logger.debug(f"Loading {len(selected)} of {len(columns)} columns")
+    return selected
+
+
+def infer_category_columns(file: Union[str, Path], encoding: str = 'utf8', n_rows: int = CATEGORY_SAMPLE_ROWS,
+                           max_ratio: float = CATEGORY_MAX_RATIO, usecols: Optional[List[str]] = None) -> List[str]:
+    """Find the string columns with few distinct values from the first rows of a CSV file.
+
+    :param file: the CSV file
+    :param encoding: encoding of the CSV file
+    :param n_rows: number of rows to inspect
+    :param max_ratio: max ratio of distinct values to non-missing values for a category column
+    :param usecols: names of the columns to inspect, all columns if None
+    :return: names of the columns worth loading as category dtype
+    """
+    with open_csv(file) as source:
+        head = pd.read_csv(source, encoding=encoding, nrows=n_rows, low_memory=False, usecols=usecols)
+    return [col for col in head.columns
+            if head[col].dtype == object and head[col].nunique() <= max_ratio * head[col].count()]
+
+
+def _byte_ranges(file: Path, n_parts: int, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Split a file, or a byte range of it, into about n_parts byte ranges, each ending at the end of a line.
+
+    :param file: the file
+    :param n_parts: number of ranges to aim for
+    :param start: offset of the first line to split, 0 for the header
+    :param end: offset past the last line to split, the end of the file if None
+    :return: the start and end offset of each range; one starting at 0 holds the header
+    """
+    end = file.stat().st_size if end is None else end
+    bounds = [start]
+    with open(file, 'rb') as f:
+        for i in range(1, n_parts):
+            f.seek(max(start + (end - start) * i // n_parts, bounds[-1]))
+            f.readline()
+            if f.tell() >= end:
+                break
+            bounds.append(f.tell())
+    return list(zip(bounds, bounds[1:] + [end]))
+
+
+def _parse_range(file: Path, start: int, end: int, encoding: str, names: List[str],
+                 usecols: Optional[List[str]], dtype: Optional[dict]) -> Optional[pd.DataFrame]:
+    """Parse the lines in a byte range of a CSV file.
+
+    :param file: the CSV file
+    :param start: offset of the first line, 0 for the header
+    :param end: offset past the last line
+    :param encoding: encoding of the CSV file
+    :param names: names of all columns, from the header
+    :param usecols: names of the columns to parse, all columns if None
+    :param dtype: dtype of some columns, as in pd.read_csv
+    :return: the parsed rows, or None if the range may start or end inside a quoted value
+    """
+    with open(file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if data.count(b'"') % 2:
+        return None
+    try:
+        return pd.read_csv(io.BytesIO(data), encoding=encoding, header=0 if start == 0 else None,
+                           names=None if start == 0 else names, usecols=usecols, dtype=dtype, low_memory=False)
+    except pd.errors.ParserError:
+        return None
+
+
+def _agree(chunks: List[pd.Series]) -> bool:
+    """Tell whether the chunks of a column concatenate to the column pd.read_csv infers from all its values.
+
+    Chunks without values parse as float64 NaN, which concatenate with integers, floats and objects as pd.read_csv
+    reads them with missing cells, but turn booleans into floats and unsigned integers, which it reads as text
+    then, into floats. Integers and floats widen to floats alike. Objects agree if they are all text, or all
+    booleans with missing cells.
+
+    :param chunks: the chunks of the column
+    :return: True if concatenating the chunks is exact
+    """
+    filled = [chunk for chunk in chunks if chunk.count()]
+    kinds = {chunk.dtype.kind for chunk in filled}
+    if 'O' in kinds:
+        inferred = {pd.api.types.infer_dtype(chunk, skipna=True) for chunk in filled if chunk.dtype == object}
+        if inferred == {'string'}:
+            # text with '' comes from numbers past uint64, whose missing cells are '' only if every range holds one
+            return kinds == {'O'} and not any((chunk.to_numpy() == '').any() for chunk in filled)
+        return inferred == {'boolean'} and kinds <= {'b', 'O'}
+    if len(kinds) > 1:
+        return kinds == {'i', 'f'}
+    return len({chunk.dtype for chunk in chunks}) == 1 or kinds not in ({'b'}, {'u'})
+
+
+def _mixed_columns(chunks: List[pd.DataFrame]) -> List[str]:
+    """Find the columns whose chunks disagree on what the values of the column are.
+
+    :param chunks: the chunks of the file
+    :return: names of the columns to parse again from all their values at once
+    """
+    return [col for col in chunks[0].columns if not _agree([chunk[col] for chunk in chunks])]
+
+
+def read_csv_parallel(file: Union[str, Path], encoding: str = 'utf8', usecols: Optional[List[str]] = None,
+                      dtype: Optional[dict] = None, num_works: int = -1,
+                      chunk_bytes: int = LOAD_CHUNK_BYTES) -> pd.DataFrame:
+    """Parse a CSV file in byte ranges split on line boundaries, on several threads.
+
+    The C parser releases the GIL while it tokenizes, so the ranges parse side by side. The result matches
+    pd.read_csv: the columns whose chunks disagree on the dtype are parsed again in one piece, and category columns
+    share the categories of the whole file. A file with line breaks inside quoted values, or in a wide encoding,
+    is parsed in one piece instead.
+
+    :param file: the CSV file
+    :param encoding: encoding of the CSV file
+    :param usecols: names of the columns to parse, all columns if None
+    :param dtype: dtype of some columns, as in pd.read_csv
+    :param num_works: number of threads, -1 for all CPUs
+    :param chunk_bytes: max bytes per range
+    :return: the dataset
+    """
+    file = Path(file)
+    if codecs.lookup(encoding).name.startswith(('utf-16', 'utf-32')):
+        return pd.read_csv(file, encoding=encoding, usecols=usecols, dtype=dtype, low_memory=False)
+    num_works = num_works if num_works > 0 else os.cpu_count() or 1
+    ranges = _byte_ranges(file, max(num_works, math.ceil(file.stat().st_size / chunk_bytes)))
+    names = list(pd.read_csv(file, encoding=encoding, nrows=0).columns)
+
+    def parse(byte_range: Tuple[int, int]) -> Optional[pd.DataFrame]:
+        return _parse_range(file, *byte_range, encoding, names, usecols, dtype)
+
+    with ThreadPoolExecutor(num_works) as executor:
+        chunks = list(executor.map(parse, ranges))
+        if any(chunk is None for chunk in chunks):
+            # a range split inside a quoted value; parsing in one piece also reports a malformed file as usual
+            logger.debug(f"{file} has line breaks in quoted values, parsing it in one piece")
+            return pd.read_csv(file, encoding=encoding, usecols=usecols, dtype=dtype, low_memory=False)
+        # a range holding only the header parses as object columns, which concat would spread to the others
+        chunks = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+        mixed = _mixed_columns(chunks)
+
+    for col in chunks[0].columns:
+        if pd.api.types.is_categorical_dtype(chunks[0][col]):
+            categories = pd.api.types.union_categoricals([chunk[col] for chunk in chunks],
+                                                         sort_categories=True).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+    if len(chunks) == 1:
+        return chunks[0]
+    df = pd.concat(chunks, ignore_index=True)
+    if mixed:
+        logger.debug(f"Parsing columns {mixed} of {file} again in one piece, their chunks disagree on the dtype")
+        whole = pd.read_csv(file, encoding=encoding, usecols=mixed, dtype=dtype, low_memory=False)
+        for col in mixed:
+            df[col] = whole[col]
+    return df
+
+
+def read_csv_arrow(file: Union[str, Path, BinaryIO], encoding: str = 'utf8', usecols: Optional[List[str]] = None,
+                   category_columns: Iterable[str] = ()) -> pd.DataFrame:
+    """Parse a CSV file with the multi-threaded pyarrow reader, keeping the dtypes pd.read_csv would give.
+
+    :param file: the CSV file, or a binary stream of it
+    :param encoding: encoding of the CSV file
+    :param usecols: names of the columns to parse, all columns if None
+    :param category_columns: names of the columns to load as category dtype
+    :return: the dataset
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(
+        file, read_options=pa_csv.ReadOptions(encoding=encoding),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols, timestamp_parsers=[], strings_can_be_null=True,
+            column_types={col: pa.dictionary(pa.int32(), pa.string()) for col in category_columns}))
+    # pandas leaves dates as text and reads columns without values as float
+    for i, field in enumerate(table.schema):
+        if pa.types.is_temporal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+        elif pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+    return table.to_pandas()
+
+
+def load_csv(file: Union[str, Path], encoding: str = 'utf8', as_category: bool = False, reader: str = 'pandas',
+             config: Optional[ProfileConfig] = None, num_works: int = -1) -> pd.DataFrame:
+    """Load a CSV file, optionally parsing low-cardinality string columns straight into category dtype.
+
+    Category columns store each distinct string once plus small integer codes, which the profiler
+    uses directly instead of hashing the strings again. Columns the config leaves out are never parsed.
+
+    :param file: the CSV file
+    :param encoding: encoding of the CSV file
+    :param as_category: whether to load low-cardinality string columns as category dtype
+    :param reader: 'pandas' for the single-threaded parser, 'parallel' for byte ranges parsed on several threads,
+        or 'pyarrow' for the pyarrow reader, which falls back to 'parallel' when pyarrow isn't installed;
+        compressed files are decompressed on a background thread, as a stream the 'parallel' reader can't split
+    :param config: the columns to profile
+    :param num_works: number of threads of the 'parallel' reader, -1 for all CPUs
+    :return: the loaded dataset
+    """
+    if reader not in READERS:
+        raise ValueError(f"unknown reader {reader}, choose from {list(READERS)}")
+    if reader == 'pyarrow':
+        try:
+            import pyarrow.csv  # noqa: F401
+        except ImportError:
+            logger.warning("pyarrow is not installed, loading with the parallel reader")
+            reader = 'parallel'
+    usecols = select_columns(file, encoding, config)
+    dtype = None
+    if as_category:
+        dtype = {col: 'category' for col in infer_category_columns(file, encoding, usecols=usecols)}
+        logger.debug(f"Loading {len(dtype)} columns as category: {list(dtype)}")
+
+    if reader == 'parallel' and compression_of(file):
+        reader = 'pandas'
+
+    start = time.perf_counter()
+    with open_csv(file) as source:
+        if reader == 'pyarrow':
+            df = read_csv_arrow(source, encoding, usecols, dtype or ())
+        elif reader == 'parallel':
+            df = read_csv_parallel(file, encoding, usecols, dtype, num_works)
+        else:
+            df = pd.read_csv(source, low_memory=False, encoding=encoding, dtype=dtype, usecols=usecols)
+    _log_throughput(reader, uncompressed_size(file), time.perf_counter() - start)
+    return df
+
+
+def _log_throughput(reader: str, n_bytes: int, seconds: float) -> None:
+    """Log how fast a reader loaded a file.
+
+    :param reader: name of the reader
+    :param n_bytes: size of the file, decompressed
+    :param seconds: time the reader took
+    """
+    logger.info(f"Loaded {n_bytes / 10 ** 6:.2f}MB with the {reader} reader in {seconds:.2f}s, "
+                f"{n_bytes / 10 ** 6 / max(seconds, 1e-9):.2f}MB/s")
+
+
+def _arrow_string_dtype() -> Optional[str]:
+    """Return the Arrow-backed string dtype if pandas and pyarrow support it.
+
+    :return: the dtype name, or None when it's not available
+    """
+    try:
+        import pyarrow  # noqa: F401
+        pd.StringDtype('pyarrow')
+    except (ImportError, TypeError, ValueError):
+        return None
+    return 'string[pyarrow]'
+
+
+class _ColumnInference:
+    """Track what a column needs to be stored losslessly over a stream of chunks."""
+
+    def __init__(self, max_ratio: float) -> None:
+        """Initialize the tracker.
+
+        :param max_ratio: max ratio of distinct values to non-missing values for a category column
+        """
+        self.max_ratio = max_ratio
+        self.kinds: Set[str] = set()
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.fits_float32 = True
+        self.all_strings = True
+        self.count = 0
+        self.uniques: Optional[Set[str]] = set()
+
+    def update(self, series: pd.Series) -> None:
+        """Fold one chunk of the column into the tracker.
+
+        :param series: the chunk of the column
+        """
+        self.kinds.add(series.dtype.kind)
+        self.count += series.count()
+        if series.dtype.kind in 'iuf':
+            values = series.to_numpy()
+            if len(values) and not np.isnan(values.astype(np.float64)).all():
+                self.min = np.nanmin(values) if self.min is None else min(self.min, np.nanmin(values))
+                self.max = np.nanmax(values) if self.max is None else max(self.max, np.nanmax(values))
+            if series.dtype.kind in 'iu' and len(values):
+                # float32 holds every integer up to 2 ** 24, and not all of those beyond
+                self.fits_float32 &= bool(-2 ** 24 <= values.min() and values.max() <= 2 ** 24)
+            elif series.dtype.kind == 'f' and self.fits_float32:
+                with np.errstate(over='ignore'):
+                    narrowed = values.astype(np.float32).astype(np.float64)
+                self.fits_float32 = bool(((narrowed == values) | np.isnan(values)).all())
+        elif series.dtype.kind == 'O' and self.all_strings:
+            self.all_strings = pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty')
+            if self.uniques is not None:
+                self.uniques.update(series.dropna().unique())
+                # stop tracking once the column can't be a category any more
+                if len(self.uniques) > self.max_ratio * max(self.count, 1) and len(self.uniques) > 1000:
+                    self.uniques = None
+
+    def compact_dtype(self) -> Optional[str]:
+        """Pick the narrowest dtype that keeps every value of the column.
+
+        :return: the dtype name, or None to keep the parser's default
+        """
+        if self.kinds == {'i'} or self.kinds == {'u'}:
+            if self.min is None:
+                return None
+            for dtype in ('uint8', 'uint16', 'uint32') if self.min >= 0 else ('int8', 'int16', 'int32'):
+                info = np.iinfo(dtype)
+                if info.min <= self.min and self.max <= info.max:
+                    return dtype
+        elif self.kinds and self.kinds <= {'i', 'f'}:
+            if self.fits_float32:
+                return 'float32'
+        elif self.kinds == {'O'} and self.all_strings and self.count:
+            if self.uniques is not None and len(self.uniques) <= self.max_ratio * self.count:
+                return 'category'
+            return _arrow_string_dtype()
+        return None
+
+
+def infer_compact_dtypes(chunks: Iterable[pd.DataFrame],
+                         max_ratio: float = CATEGORY_MAX_RATIO) -> Tuple[DtypeChanges, int]:
+    """Find the narrowest lossless dtype of each column over a stream of chunks.
+
+    Integers get the smallest integer type holding their range, floats become float32 only when every value
+    survives the round trip, and string columns become category or Arrow-backed strings.
+
+    :param chunks: consecutive chunks of the dataset, as read with the default dtypes
+    :param max_ratio: max ratio of distinct values to non-missing values for a category column
+    :return: the original and compact dtype of each column that can shrink, and the original size in bytes
+    """
+    columns: Dict[str, _ColumnInference] = {}
+    original_dtypes: Dict[str, Set[str]] = {}
+    n_bytes = 0
+    for chunk in chunks:
+        n_bytes += chunk.memory_usage(index=False, deep=True).sum()
+        for col in chunk.columns:
+            columns.setdefault(col, _ColumnInference(max_ratio)).update(chunk[col])
+            original_dtypes.setdefault(col, set()).add(str(chunk[col].dtype))
+
+    changes = {}
+    for col, inference in columns.items():
+        dtype = inference.compact_dtype()
+        if dtype is not None:
+            original = 'float64' if len(original_dtypes[col]) > 1 else original_dtypes[col].pop()
+            changes[col] = (original, dtype)
+    return changes, n_bytes
+
+
+def optimize_dtypes(df: pd.DataFrame, max_ratio: float = CATEGORY_MAX_RATIO) -> Tuple[pd.DataFrame, DtypeChanges]:
+    """Downcast an in-memory DataFrame to its narrowest lossless dtypes.
+
+    :param df: the dataset
+    :param max_ratio: max ratio of distinct values to non-missing values for a category column
+    :return: the downcast dataset and the original and compact dtype of each changed column
+    """
+    changes, n_bytes = infer_compact_dtypes([df], max_ratio)
+    compact_df = df.astype({col: dtype for col, (_, dtype) in changes.items()})
+    _log_saving(n_bytes, compact_df, changes)
+    return compact_df, changes
+
+
+def load_compact_csv(file: Union[str, Path], encoding: str = 'utf8', chunk_rows: int = LOAD_CHUNK_ROWS,
+                     max_ratio: float = CATEGORY_MAX_RATIO,
+                     config: Optional[ProfileConfig] = None) -> Tuple[pd.DataFrame, DtypeChanges]:
+    """Load a CSV file with the narrowest lossless dtype for each column.
+
+    A first pass streams the file in chunks to infer the dtypes, so the full-width frame never sits in memory;
+    the second pass parses straight into those dtypes.
+
+    :param file: the CSV file
+    :param encoding: encoding of the CSV file
+    :param chunk_rows: number of rows per chunk in the inference pass
+    :param max_ratio: max ratio of distinct values to non-missing values for a category column
+    :param config: the columns to profile; the others are never parsed
+    :return: the dataset and the original and compact dtype of each changed column
+    """
+    usecols = select_columns(file, encoding, config)
+    with open_csv(file) as source:
+        chunks = pd.read_csv(source, encoding=encoding, chunksize=chunk_rows, usecols=usecols)
+        changes, n_bytes = infer_compact_dtypes(chunks, max_ratio)
+    with open_csv(file) as source:
+        df = pd.read_csv(source, low_memory=False, encoding=encoding, usecols=usecols,
+                         dtype={col: dtype for col, (_, dtype) in changes.items()})
+    _log_saving(n_bytes, df, changes)
+    return df, changes
+
+
+def _log_saving(n_bytes: int, df: pd.DataFrame, changes: DtypeChanges) -> None:
+    """Log how much memory the compact dtypes saved.
+
+    :param n_bytes: size of the dataset with the default dtypes
+    :param df: the compact dataset
+    :param changes: the original and compact dtype of each changed column
+    """
+    compact_bytes = df.memory_usage(index=False, deep=True).sum()
+    logger.info(f"Downcast {len(changes)} of {df.shape[1]} columns: {n_bytes / 10 ** 6:.2f}MB -> "
+                f"{compact_bytes / 10 ** 6:.2f}MB, saved {(n_bytes - compact_bytes) / 10 ** 6:.2f}MB")
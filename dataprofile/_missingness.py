@@ -0,0 +1,169 @@
+"""Describe how values go missing together, from one packed null bitmap per column.
+
+Each column packs its missing mask into 64 bit words, eight times smaller than a boolean frame and built one column
+at a time. Popcounts of the words give the missing values of each column and, ANDed over the columns, the empty rows.
+Blocks of rows unpack into a 0/1 matrix whose product counts the rows every pair of columns misses together, for
+the co-missingness and nullity correlation of all the pairs at once; rows hash their pattern to find the commonest.
+"""
+
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ._config import MISSING_BLOCK_CELLS, MISSING_MATRIX_MAX_COLUMNS, MISSING_TOP_N, RANDOM_STATE
+
+# columns listed for each missing pattern, the rest are counted
+_PATTERN_COLUMNS = 8
+PAIR_COLUMNS = ['var_a', 'var_b', 'n_both', 'p_both', 'nullity_corr']
+PATTERN_COLUMNS = ['missing_columns', 'n_missing_col', 'n_row', 'p_row']
+
+# masks of the bit-parallel popcount, for numpy without bitwise_count
+_M1, _M2, _M4, _H01 = (np.uint64(0x5555555555555555), np.uint64(0x3333333333333333),
+                       np.uint64(0x0f0f0f0f0f0f0f0f), np.uint64(0x0101010101010101))
+
+
+class NullBitmaps(NamedTuple):
+    """The missing mask of each column, packed in words of 64 rows; bits past n_row are 0."""
+
+    n_row: int
+    columns: List[str]
+    bits: np.ndarray
+    n_missing: np.ndarray
+
+
+def null_bitmaps(df: pd.DataFrame) -> NullBitmaps:
+    """Pack the missing mask of each column of a frame.
+
+    :param df: the frame
+    :return: the bitmaps, one row of words per column
+    """
+    n_word = -(-len(df) // 64)
+    bits = np.zeros((df.shape[1], n_word), dtype=np.uint64)
+    for i, (_, series) in enumerate(df.items()):
+        packed = np.packbits(series.isna().to_numpy())
+        bits[i].view(np.uint8)[:len(packed)] = packed
+    return NullBitmaps(len(df), list(df.columns), bits, popcount(bits))
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Count the bits set in rows of 64 bit words.
+
+    :param words: the words, the last axis holding the words of each row
+    :return: the number of bits set in each row
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    words = words - ((words >> np.uint64(1)) & _M1)
+    words = (words & _M2) + ((words >> np.uint64(2)) & _M2)
+    words = (words + (words >> np.uint64(4))) & _M4
+    return ((words * _H01) >> np.uint64(56)).sum(axis=-1, dtype=np.int64)
+
+
+def count_empty_rows(bitmaps: NullBitmaps) -> int:
+    """Count the rows missing in every column.
+
+    :param bitmaps: the bitmaps of the frame
+    :return: the number of empty rows
+    """
+    if not bitmaps.columns:
+        return bitmaps.n_row
+    return int(popcount(np.bitwise_and.reduce(bitmaps.bits, axis=0)))
+
+
+def co_missing(bitmaps: NullBitmaps, block_cells: int = MISSING_BLOCK_CELLS) -> np.ndarray:
+    """Count the rows where each pair of columns is missing together.
+
+    Bitmaps unpack a block of rows at a time into a 0/1 matrix whose product with itself counts every pair at
+    once; float32 counts stay exact as a block has at most 2 ** 24 cells.
+
+    :param bitmaps: the bitmaps of the columns
+    :param block_cells: number of cells per block, over all the columns
+    :return: a symmetric matrix, with the missing values of each column on the diagonal
+    """
+    n_col = len(bitmaps.columns)
+    counts = np.zeros((n_col, n_col), dtype=np.int64)
+    bytes_ = bitmaps.bits.view(np.uint8)
+    step = max(min(block_cells, 2 ** 24) // max(n_col, 1) // 8, 1)
+    for start in range(0, bytes_.shape[1], step):
+        block = np.unpackbits(bytes_[:, start:start + step], axis=1).astype(np.float32)
+        counts += np.rint(block @ block.T).astype(np.int64)
+    return counts
+
+
+def nullity_correlation(both: np.ndarray, n_missing: np.ndarray, n_row: int) -> np.ndarray:
+    """Correlate the missing masks of columns, from their counts alone.
+
+    :param both: rows missing together in each pair of columns, from :func:`co_missing`
+    :param n_missing: missing values of each column
+    :param n_row: number of rows
+    :return: the Pearson correlation of each pair of masks, NaN for columns never or always missing
+    """
+    n_missing = n_missing.astype(np.float64)
+    spread = n_missing * (n_row - n_missing)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (n_row * both - np.outer(n_missing, n_missing)) / np.sqrt(np.outer(spread, spread))
+    return np.where(np.outer(spread, spread) > 0, corr, np.nan)
+
+
+def missing_patterns(bitmaps: NullBitmaps, top_n: int = MISSING_TOP_N,
+                     random_state: int = RANDOM_STATE) -> pd.DataFrame:
+    """Find the most common sets of columns missing together in a row.
+
+    Each row sums a random 64 bit key of each column it misses, so rows with the same pattern share a hash.
+
+    :param bitmaps: the bitmaps of the frame
+    :param top_n: number of patterns to return
+    :param random_state: Random seed for the keys of the columns
+    :return: a table of the missing columns, their number, and the rows with the pattern, most common first
+    """
+    keys = np.random.RandomState(random_state).randint(1, 2 ** 63, len(bitmaps.columns), dtype=np.uint64)
+    hashes = np.zeros(bitmaps.n_row, dtype=np.uint64)
+    bytes_ = bitmaps.bits.view(np.uint8)
+    for i in np.flatnonzero(bitmaps.n_missing):
+        hashes += np.unpackbits(bytes_[i], count=bitmaps.n_row) * keys[i]
+    _, first_rows, n_rows = np.unique(hashes, return_index=True, return_counts=True)
+    order = np.lexsort((first_rows, -n_rows))[:top_n]
+    patterns = []
+    for row, n in zip(first_rows[order], n_rows[order]):
+        missing = np.flatnonzero((bytes_[:, row >> 3] >> np.uint8(7 - (row & 7))) & np.uint8(1))
+        names = ', '.join(str(bitmaps.columns[i]) for i in missing[:_PATTERN_COLUMNS])
+        if len(missing) > _PATTERN_COLUMNS:
+            names += f", ... {len(missing) - _PATTERN_COLUMNS} more"
+        patterns.append((names or '(none)', len(missing), int(n), n / bitmaps.n_row))
+    return pd.DataFrame(patterns, columns=PATTERN_COLUMNS)
+
+
+def describe_missingness(bitmaps: NullBitmaps, top_n: int = MISSING_TOP_N,
+                         max_matrix_columns: int = MISSING_MATRIX_MAX_COLUMNS) -> Dict[str, pd.DataFrame]:
+    """Describe the missing values of a frame beyond the counts of each column.
+
+    Only columns with some but not all values missing take part in the pairs: the others are missing together
+    with every column on all or none of its rows.
+
+    :param bitmaps: the bitmaps of the frame
+    :param top_n: number of patterns and pairs to return
+    :param max_matrix_columns: the nullity correlation matrix is returned for at most this many columns
+    :return: 'missing_patterns', the most common row patterns; 'missing_pairs', the pairs with the strongest
+        nullity correlation; and 'nullity_corr', the matrix; empty if no value is missing
+    """
+    if not bitmaps.n_missing.any():
+        return {}
+    missingness = {'missing_patterns': missing_patterns(bitmaps, top_n)}
+    partial = np.flatnonzero((bitmaps.n_missing > 0) & (bitmaps.n_missing < bitmaps.n_row))
+    if len(partial) < 2:
+        return missingness
+    names = [bitmaps.columns[i] for i in partial]
+    partial_bitmaps = NullBitmaps(bitmaps.n_row, names, bitmaps.bits[partial], bitmaps.n_missing[partial])
+    both = co_missing(partial_bitmaps)
+    corr = nullity_correlation(both, partial_bitmaps.n_missing, bitmaps.n_row)
+
+    rows, cols = np.triu_indices(len(names), 1)
+    order = np.argsort(-np.abs(corr[rows, cols]), kind='stable')[:top_n]
+    rows, cols = rows[order], cols[order]
+    missingness['missing_pairs'] = pd.DataFrame({
+        'var_a': [names[i] for i in rows], 'var_b': [names[j] for j in cols], 'n_both': both[rows, cols],
+        'p_both': both[rows, cols] / bitmaps.n_row, 'nullity_corr': corr[rows, cols]}, columns=PAIR_COLUMNS)
+    if len(names) <= max_matrix_columns:
+        missingness['nullity_corr'] = pd.DataFrame(corr, index=names, columns=names)
+    return missingness
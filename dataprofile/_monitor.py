@@ -1,12 +1,45 @@
 """A module for monitoring profiling performance."""
 
+import sys
 import time
 import tracemalloc
 from functools import wraps
+from pathlib import Path
+from typing import Optional, Union
 
-from colorama import Fore
 from loguru import logger
 
+_logger_ready = False
+
+
+def setup_logger(level: str = "WARNING", log_file: Optional[Union[str, Path]] = None) -> None:
+    """Route log records to the screen, and to a rotating log file if given.
+
+    Nothing is configured at import time, so importing the package stays cheap and never touches the disk.
+
+    :param level: minimum level shown on the screen
+    :param log_file: file to keep DEBUG records in, None for no file
+    :return:
+    """
+    global _logger_ready
+    from colorama import init
+    init(autoreset=True)
+    logger.remove()
+    logger.add(sys.stdout, format="{time:YYYY-MM-DD at HH:mm:ss}|{level}|{message}", level=level)
+    if log_file:
+        logger.add(log_file, format="{time:YYYY-MM-DD at HH:mm:ss} | {name: ^15} | {level} | {message}",
+                   level="DEBUG", rotation="10 MB")
+    _logger_ready = True
+
+
+def ensure_logger() -> None:
+    """Apply the default logger setup unless one is already in place.
+
+    :return:
+    """
+    if not _logger_ready:
+        setup_logger()
+
 
 def monitor_time_memory(original_func):
     """Monitor command computational consumptions.
@@ -23,6 +56,7 @@ def monitor_time_memory(original_func):
         current, peak = tracemalloc.get_traced_memory()
         time_end = time.time() - time_start
         tracemalloc.stop()
+        from colorama import Fore
         print(Fore.BLUE + f"{original_func.__name__} finished in {time_end:.2f} sec, "
                           f"Current memory usage is {current / 10 ** 6:.2f}MB; "
                           f"Peak memory usage was {peak / 10 ** 6:.2f}MB" + Fore.RESET)
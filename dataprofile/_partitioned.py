@@ -0,0 +1,283 @@
+"""Count partitioned frames, like a Dask DataFrame, without collecting them in one process.
+
+Each partition is summarized where it lives into a mergeable state: the hashes of its distinct values and rows,
+the frequencies of its most frequent values, the moments of its numerical columns and a random sample of its
+rows. States merge pairwise in a tree, so the driver only ever holds a few of them, never the rows.
+"""
+
+import functools
+import multiprocessing
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ._config import EXTERNAL_SAMPLE_ROWS, EXTERNAL_TOP_K, PARTITION_TOP_CAPACITY, RANDOM_STATE
+from ._duplicates import combine_hashes, value_hashes
+from ._external import ExactCounts
+from ._profile_config import ProfileConfig
+from ._var_statistics import ColumnCounts
+
+
+class Moments(NamedTuple):
+    """Mergeable moments of the values of a numerical column."""
+
+    n: int
+    mean: float
+    m2: float
+    min: float
+    max: float
+    sum: float
+    n_zeros: int
+
+
+class ColumnState(NamedTuple):
+    """Mergeable counts of a column over some partitions.
+
+    hashes holds the sorted hashes of the distinct values, top the frequencies of at most
+    PARTITION_TOP_CAPACITY values, and moments is None once any partition had non-numerical values.
+    """
+
+    n_missing: int
+    hashes: np.ndarray
+    top: pd.Series
+    moments: Optional[Moments]
+
+
+class PartitionState(NamedTuple):
+    """Mergeable counts and sample of some partitions of a frame."""
+
+    n_row: int
+    n_empty_row: int
+    row_hashes: np.ndarray
+    columns: Dict[str, ColumnState]
+    sample: pd.DataFrame
+    sample_keys: np.ndarray
+    sample_rows: int
+
+
+def is_partitioned(obj: Any) -> bool:
+    """Check whether an object is a partitioned frame: a Dask DataFrame, or an iterable of pandas DataFrames.
+
+    :param obj: the object to profile
+    :return: whether :func:`count_partitions` can read it
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray, str, bytes, dict)):
+        return False
+    return hasattr(obj, 'to_delayed') or hasattr(obj, '__iter__')
+
+
+def _moments(series: pd.Series) -> Optional[Moments]:
+    """Compute the moments of a numerical column.
+
+    :param series: the column of a partition
+    :return: the moments, None if the column isn't numerical
+    """
+    if series.isna().all():
+        return Moments(0, 0., 0., np.inf, -np.inf, 0., 0)
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return None
+    values = series.dropna().to_numpy(dtype=np.float64)
+    mean = values.mean()
+    return Moments(len(values), mean, float(((values - mean) ** 2).sum()), values.min(), values.max(),
+                   values.sum(), int((values == 0).sum()))
+
+
+def _merge_moments(a: Optional[Moments], b: Optional[Moments]) -> Optional[Moments]:
+    """Combine the moments of two sets of values, with the pairwise update of Chan et al.
+
+    :param a: moments of the first values
+    :param b: moments of the other values
+    :return: the moments of all the values, None if either isn't numerical
+    """
+    if a is None or b is None:
+        return None
+    if not a.n or not b.n:
+        return a if a.n else b
+    n = a.n + b.n
+    delta = b.mean - a.mean
+    return Moments(n, a.mean + delta * b.n / n, a.m2 + b.m2 + delta ** 2 * a.n * b.n / n, min(a.min, b.min),
+                   max(a.max, b.max), a.sum + b.sum, a.n_zeros + b.n_zeros)
+
+
+def _trim_top(top: pd.Series, capacity: int = PARTITION_TOP_CAPACITY) -> pd.Series:
+    """Keep the most frequent values of a frequency table.
+
+    :param top: frequency of each value
+    :param capacity: number of values to keep
+    :return: the frequencies of the most frequent values, in decreasing order
+    """
+    return top.sort_values(ascending=False, kind='mergesort').head(capacity).astype('int64')
+
+
+def summarize_partition(partition: pd.DataFrame, index: int = 0, sample_rows: int = EXTERNAL_SAMPLE_ROWS,
+                        random_state: int = RANDOM_STATE, config: Optional[ProfileConfig] = None) -> PartitionState:
+    """Summarize one partition of a frame into a mergeable state.
+
+    :param partition: the rows of the partition
+    :param index: position of the partition, to seed its sample apart from the others
+    :param sample_rows: number of rows to sample
+    :param random_state: Random seed for the row sampler
+    :param config: the columns to count
+    :return: the state of the partition
+    """
+    if not isinstance(partition, pd.DataFrame):
+        raise TypeError(f"partitions must be pandas DataFrames, got {type(partition).__name__}")
+    if config is not None:
+        partition = partition[config.select(partition.columns)]
+    column_hashes = []
+    empty = np.ones(len(partition), dtype=bool)
+    columns = {}
+    for col, series in partition.items():
+        hashes, missing = value_hashes(series)
+        column_hashes.append(hashes)
+        empty &= missing
+        top = series.value_counts()
+        top = top[top > 0]
+        top.index = top.index.astype(object)
+        columns[col] = ColumnState(int(missing.sum()), np.unique(hashes[~missing]), _trim_top(top),
+                                   _moments(series))
+
+    keys = np.random.RandomState([random_state, index]).random_sample(len(partition))
+    sample = partition
+    if len(keys) > sample_rows:
+        keep = np.sort(np.argpartition(keys, sample_rows - 1)[:sample_rows])
+        keys, sample = keys[keep], partition.iloc[keep]
+    row_hashes = np.unique(combine_hashes(column_hashes, len(partition)))
+    return PartitionState(len(partition), int(empty.sum()), row_hashes, columns, sample, keys,
+                          sample_rows)
+
+
+def merge_states(a: PartitionState, b: PartitionState) -> PartitionState:
+    """Merge the states of two sets of partitions.
+
+    Distinct values and rows are exact, up to 64 bit hash collisions. The frequencies of the values past
+    PARTITION_TOP_CAPACITY distinct values are dropped, so they are exact only for the columns with fewer
+    distinct values, and lower bounds otherwise.
+
+    :param a: state of the first partitions
+    :param b: state of the other partitions
+    :return: the state of all the partitions
+    """
+    columns = {}
+    # a column absent from some partitions is missing in all of their rows
+    empty = ColumnState(0, np.empty(0, dtype=np.uint64), pd.Series([], dtype='int64'),
+                        _moments(pd.Series([], dtype=float)))
+    for col in list(a.columns) + [col for col in b.columns if col not in a.columns]:
+        col_a = a.columns.get(col) or empty._replace(n_missing=a.n_row)
+        col_b = b.columns.get(col) or empty._replace(n_missing=b.n_row)
+        columns[col] = ColumnState(col_a.n_missing + col_b.n_missing, np.union1d(col_a.hashes, col_b.hashes),
+                                   _trim_top(col_a.top.add(col_b.top, fill_value=0)),
+                                   _merge_moments(col_a.moments, col_b.moments))
+
+    keys = np.concatenate([a.sample_keys, b.sample_keys])
+    sample = pd.concat([a.sample, b.sample])
+    if len(keys) > a.sample_rows:
+        keep = np.sort(np.argpartition(keys, a.sample_rows - 1)[:a.sample_rows])
+        keys, sample = keys[keep], sample.iloc[keep]
+    return PartitionState(a.n_row + b.n_row, a.n_empty_row + b.n_empty_row, np.union1d(a.row_hashes, b.row_hashes),
+                          columns, sample, keys, a.sample_rows)
+
+
+def tree_reduce(states: Iterable[PartitionState]) -> PartitionState:
+    """Merge states pairwise as they arrive, holding at most one pending state per level of the tree.
+
+    :param states: the states of the partitions, in order
+    :return: the state of all the partitions
+    """
+    pending: List[Tuple[int, PartitionState]] = []
+    for state in states:
+        level = 0
+        while pending and pending[-1][0] == level:
+            state = merge_states(pending.pop()[1], state)
+            level += 1
+        pending.append((level, state))
+    if not pending:
+        raise ValueError("no partitions to profile")
+    state = pending.pop()[1]
+    while pending:
+        state = merge_states(pending.pop()[1], state)
+    return state
+
+
+def _reduce_dask(frame: Any, summarize: Any, scheduler: Optional[str] = None) -> PartitionState:
+    """Summarize the partitions of a Dask DataFrame on its workers, and merge them in a tree of tasks.
+
+    :param frame: the Dask DataFrame
+    :param summarize: :func:`summarize_partition` with its settings bound
+    :param scheduler: the Dask scheduler, e.g. 'processes', its configured default if None
+    :return: the state of all the partitions
+    """
+    import dask
+
+    states = [dask.delayed(summarize)(partition, i) for i, partition in enumerate(frame.to_delayed())]
+    if not states:
+        raise ValueError("no partitions to profile")
+    merge = dask.delayed(merge_states)
+    while len(states) > 1:
+        states = [merge(*states[i:i + 2]) if i + 1 < len(states) else states[i] for i in range(0, len(states), 2)]
+    return dask.compute(states[0], scheduler=scheduler)[0]
+
+
+def _summarize_item(item: Tuple[int, pd.DataFrame], summarize: Any) -> PartitionState:
+    """Summarize a numbered partition, for Pool.imap."""
+    return summarize(item[1], item[0])
+
+
+def finalize_counts(state: PartitionState, top_k: int = EXTERNAL_TOP_K) -> ExactCounts:
+    """Turn the merged state into the exact counts the profile reads.
+
+    :param state: the state of all the partitions
+    :param top_k: number of most frequent values to keep for each column
+    :return: the exact counts, with the aggregates of the numerical columns
+    """
+    columns = {}
+    for col, column in state.columns.items():
+        top = column.top.head(top_k)
+        top.index = pd.Index(list(top.index))
+        aggregates = None
+        moments = column.moments
+        if moments is not None and moments.n:
+            variance = moments.m2 / (moments.n - 1) if moments.n > 1 else np.NaN
+            aggregates = {'min': moments.min, 'max': moments.max, 'sum': moments.sum, 'mean': moments.mean,
+                          'variance': variance, 'std': np.sqrt(variance), 'n_zeros': moments.n_zeros}
+        columns[col] = ColumnCounts(state.n_row, column.n_missing, len(column.hashes), top, aggregates)
+    return ExactCounts(state.n_row, sum(column.n_missing for column in state.columns.values()), state.n_empty_row,
+                       state.n_row - len(state.row_hashes), columns)
+
+
+def count_partitions(frame: Any, num_works: int = -1, sample_rows: int = EXTERNAL_SAMPLE_ROWS,
+                     top_k: int = EXTERNAL_TOP_K, random_state: int = RANDOM_STATE,
+                     config: Optional[ProfileConfig] = None,
+                     scheduler: Optional[str] = None) -> Tuple[ExactCounts, pd.DataFrame]:
+    """Count a partitioned frame exactly, and draw a random sample of its rows, partition by partition.
+
+    A Dask DataFrame is summarized by its own scheduler, so only the states of the partitions reach the driver.
+    The partitions of any other iterable are summarized by a pool of processes.
+
+    :param frame: a Dask DataFrame, or an iterable of pandas DataFrames with the same columns
+    :param num_works: number of cpu cores for multiprocessing, ignored for Dask
+    :param sample_rows: number of rows to sample for the other statistics
+    :param top_k: number of most frequent values to keep for each column
+    :param random_state: Random seed for the row sampler
+    :param config: the columns to count
+    :param scheduler: the Dask scheduler, e.g. 'processes', its configured default if None
+    :return: the exact counts, and the sample
+    """
+    summarize = functools.partial(summarize_partition, sample_rows=sample_rows, random_state=random_state,
+                                  config=config)
+    if hasattr(frame, 'to_delayed'):
+        logger.info(f"Counting {frame.npartitions} partitions with Dask...")
+        state = _reduce_dask(frame, summarize, scheduler)
+    else:
+        logger.info("Counting partitions...")
+        items: Iterator[Tuple[int, pd.DataFrame]] = enumerate(frame)
+        item_summarize = functools.partial(_summarize_item, summarize=summarize)
+        num_works = multiprocessing.cpu_count() if num_works < 1 else num_works
+        if num_works == 1:
+            state = tree_reduce(map(item_summarize, items))
+        else:
+            with multiprocessing.Pool(num_works) as executor:
+                state = tree_reduce(executor.imap(item_summarize, items))
+    return finalize_counts(state, top_k), state.sample.reset_index(drop=True)
@@ -0,0 +1,139 @@
+"""Choose which columns to profile and which statistics to compute for them."""
+
+import re
+from typing import Any, FrozenSet, Iterable, List, Mapping, Optional, Pattern, Sequence, Tuple, Union
+
+from ._rules import Rule, compile_rules
+
+# groups of statistics that can be skipped, and the variable types they apply to
+STAT_GROUPS = {'quantiles': ('Interval', 'Datetime'),
+               'moments': ('Interval',),
+               'histogram': ('Interval',),
+               'top_k': ('Nominal', 'Binary'),
+               'text': ('Nominal',),
+               'conf_matrix': ('Binary',),
+               'datetime': ('Nominal',)}
+VAR_TYPES = ('Interval', 'Datetime', 'Nominal', 'Binary')
+
+
+def _compile(patterns: Iterable[str]) -> List[Pattern]:
+    """Compile column patterns, each matching whole column names; a plain name matches itself.
+
+    :param patterns: column names or regular expressions
+    :return: the compiled patterns
+    """
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error:
+            compiled.append(re.compile(re.escape(pattern)))
+    return compiled
+
+
+def _check_groups(groups: Iterable[str]) -> FrozenSet[str]:
+    """Validate names of stat groups.
+
+    :param groups: names of stat groups
+    :return: the names as a set
+    """
+    groups = frozenset(groups)
+    unknown = groups - set(STAT_GROUPS)
+    if unknown:
+        raise ValueError(f"unknown stat groups {sorted(unknown)}, choose from {list(STAT_GROUPS)}")
+    return groups
+
+
+RuleSpecs = Mapping[Any, Sequence[Union[str, Mapping[str, Any]]]]
+
+
+class ProfileConfig:
+    """Which columns to profile, which stat groups to skip, which types to force and which rules to check.
+
+    Skipped work is never computed: the statistics of a skipped group are left out of the profile, a column with
+    'datetime' skipped is never parsed as dates, and one with 'conf_matrix' skipped stays out of every matrix.
+    """
+
+    def __init__(self,
+                 include: Sequence[str] = (),
+                 exclude: Sequence[str] = (),
+                 type_skips: Optional[Mapping[str, Sequence[str]]] = None,
+                 column_skips: Optional[Mapping[str, Sequence[str]]] = None,
+                 type_overrides: Optional[Mapping[str, str]] = None,
+                 type_rules: Optional[RuleSpecs] = None,
+                 column_rules: Optional[RuleSpecs] = None) -> None:
+        """Initialize the configuration.
+
+        :param include: names or regular expressions of the columns to profile, all columns if empty
+        :param exclude: names or regular expressions of the columns to leave out, even if included
+        :param type_skips: stat groups to skip for every variable of a type, e.g. {'Interval': ['moments']}
+        :param column_skips: stat groups to skip for single columns, e.g. {'comment': ['top_k', 'datetime']}
+        :param type_overrides: the type of some columns, one of VAR_TYPES, instead of the inferred one
+        :param type_rules: data-quality rules to check on every variable of a type, e.g. {'Interval': ['iqr']},
+            see :func:`compile_rule`
+        :param column_rules: rules to check on single columns, e.g. {'age': [{'check': 'range', 'min': 0}]}
+        """
+        type_skips = dict(type_skips or {})
+        type_rules = dict(type_rules or {})
+        unknown = (set(type_skips) | set(type_rules)) - set(VAR_TYPES)
+        type_overrides = dict(type_overrides or {})
+        unknown |= set(type_overrides.values()) - set(VAR_TYPES)
+        if unknown:
+            raise ValueError(f"unknown variable types {sorted(unknown)}, choose from {list(VAR_TYPES)}")
+        self.include = _compile(include)
+        self.exclude = _compile(exclude)
+        self.type_skips = {key: _check_groups(groups) for key, groups in type_skips.items()}
+        self.column_skips = {key: _check_groups(groups) for key, groups in (column_skips or {}).items()}
+        self.type_overrides = type_overrides
+        self.type_rules = compile_rules(type_rules)
+        self.column_rules = compile_rules(column_rules or {})
+
+    def __repr__(self) -> str:
+        """Show the patterns and skips of the configuration."""
+        return (f"ProfileConfig(include={[p.pattern for p in self.include]}, "
+                f"exclude={[p.pattern for p in self.exclude]}, type_skips={self.type_skips}, "
+                f"column_skips={self.column_skips}, type_overrides={self.type_overrides}, "
+                f"type_rules={_labels(self.type_rules)}, column_rules={_labels(self.column_rules)})")
+
+    def select(self, columns: Iterable) -> list:
+        """Keep the columns to profile, in their order.
+
+        :param columns: all column names
+        :return: the included columns that aren't excluded
+        """
+        def matches(column, patterns: List[Pattern]) -> bool:
+            return any(pattern.pattern == f'{column}' or pattern.fullmatch(f'{column}') for pattern in patterns)
+
+        return [column for column in columns
+                if (not self.include or matches(column, self.include)) and not matches(column, self.exclude)]
+
+    def skips(self, column, type_: Optional[str] = None) -> FrozenSet[str]:
+        """Stat groups to skip for a column.
+
+        :param column: the column name
+        :param type_: the variable type, once known
+        :return: names of the skipped stat groups
+        """
+        return self.column_skips.get(column, frozenset()) | self.type_skips.get(type_, frozenset())
+
+    def type_of(self, column) -> Optional[str]:
+        """Look up the forced type of a column.
+
+        :param column: the column name
+        :return: one of VAR_TYPES, or None to infer it
+        """
+        return self.type_overrides.get(column)
+
+    def rules(self, column, type_: Optional[str] = None) -> Tuple[Rule, ...]:
+        """Rules to check on a column.
+
+        :param column: the column name
+        :param type_: the variable type, once known
+        :return: the rules of its type, then its own rules
+        """
+        return self.type_rules.get(type_, ()) + self.column_rules.get(column, ())
+
+
+def _labels(rules: Mapping[Any, Tuple[Rule, ...]]) -> dict:
+    """Describe compiled rules by their labels, for the repr of a configuration."""
+    return {key: [rule.label for rule in item] for key, item in rules.items()}
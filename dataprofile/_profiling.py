@@ -1,19 +1,37 @@
 """Collect the statistics for each variable in the dataset."""
 
 import datetime
+import hashlib
 import multiprocessing
+import time
 from collections import defaultdict
-from functools import wraps
+from pathlib import Path
 from itertools import combinations
-from typing import List, Dict, Union, Tuple, Callable, Any
+from typing import List, Dict, Union, Tuple, Any, Optional, TYPE_CHECKING
 
 import numpy
 import pandas as pd
-import tqdm
 from loguru import logger
 
-from ._config import DEFAULT_SAMPLE_SIZE, RANDOM_STATE, MAX_STRING_SIZE
+from ._config import DEFAULT_SAMPLE_SIZE, RANDOM_STATE, MAX_STRING_SIZE, CORRELATION_TOP_N, FALLBACK_SAMPLE_ROWS
+from ._correlation import get_correlations
+from ._duplicates import DuplicateCounts, check_keys, describe_duplicates, find_duplicates, key_candidates, \
+    row_hashes
+from ._external import append_pickle, load_pickles
+from ._loading import DtypeChanges
+from ._missingness import NullBitmaps, count_empty_rows, describe_missingness, null_bitmaps
+from ._monitor import ensure_logger
+from ._partitioned import count_partitions, is_partitioned
+from ._profile_config import ProfileConfig, STAT_GROUPS
+from ._rules import evaluate_rules, rule_table
+from ._tuning import plan_profile, record_run
 from ._var_statistics import binary_stats, categorical_stats, datetime_stats, numerical_stats, base_stats
+from ._var_statistics import Factorized, factorize, ColumnContext, ColumnCounts, apply_exact_counts, \
+    counts_factorized, count_stats, is_text, summarize_text, text_stats
+from ._workers import run_supervised
+
+if TYPE_CHECKING:
+    from ._external import ExactCounts
 
 
 def _get_actual_dtype(series: pd.Series) -> str:
@@ -57,115 +75,337 @@ def _format_series(series: pd.Series) -> pd.Series:
     return series.apply(_format_value)
 
 
-def _format_series_decor(original_func: Callable) -> Callable:
-    """Change the output format for different value type.
+def _parse_datetime(series: pd.Series, factorized: Factorized) -> Tuple[pd.Series, ColumnContext]:
+    """Parse a categorical variable as dates by parsing each distinct value only once.
 
-    :param original_func: target function to wrap
-    :return:
+    :param series: target series
+    :param factorized: the series encoded by :func:`factorize`
+    :return: the parsed series, and its context with the counts taken from the distinct values
     """
+    parsed = pd.DatetimeIndex(pd.to_datetime(factorized.uniques))
+    converted = pd.Series(parsed.take(factorized.codes, allow_fill=True, fill_value=pd.NaT),
+                          index=series.index, name=series.name)
+    valid = ~parsed.isna()
+    return converted, ColumnContext(converted, count=int(factorized.counts[valid].sum()),
+                                    distinct_count=parsed[valid].nunique())
 
-    @wraps(original_func)
-    def wrapped_func(*args, **kwargs):
-        type_, series = original_func(*args, **kwargs)
-        return type_, series.apply(_format_value)
 
-    return wrapped_func
+def _widen(series: pd.Series) -> pd.Series:
+    """Compute on 64-bit numbers, so columns downcast to save memory report exactly the same statistics.
 
+    :param series: target series
+    :return: the series as int64 or float64 if it was stored narrower
+    """
+    if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series) \
+            or series.dtype.itemsize >= 8:
+        return series
+    return series.astype('int64' if pd.api.types.is_integer_dtype(series) else 'float64')
 
-@_format_series_decor
-def _cal_var_stats(series: pd.Series) -> Tuple[str, pd.Series]:
+
+def _cal_var_stats(series: pd.Series, counts: Optional[ColumnCounts] = None,
+                   config: Optional[ProfileConfig] = None) -> Tuple[str, pd.Series]:
     """Classify variable types regarding machine learning.
 
     :param series: target series
+    :param counts: exact counts of the variable over the whole dataset, when the series is a sample of it;
+        the variable is then classified and counted on them
+    :param config: stat groups to skip, type overrides and data-quality rules
+    :return: valuable type and calculated statistics, not yet formatted for display; the results of the rules
+        are kept as 'rule_violations'
+    """
+    config = config or ProfileConfig()
+    if config.type_of(series.name):
+        type_, stats = _forced_var_stats(series, config.type_of(series.name), config)
+    else:
+        type_, stats = _classify_var(series, counts, config)
+    stats = stats if counts is None else apply_exact_counts(stats, counts)
+    rules = config.rules(series.name, type_)
+    if rules:
+        # checked on the values already in this worker, with the quartiles, mean and std just computed
+        stats['rule_violations'] = evaluate_rules(series, rules, stats)
+    return type_, stats
+
+
+def _cal_var_stats_of(item: Tuple[pd.Series, Optional[ColumnCounts], Optional[ProfileConfig]]) \
+        -> Tuple[str, pd.Series]:
+    """Unpack the arguments of :func:`_cal_var_stats`, for pool maps.
+
+    :param item: target series, its exact counts and the profile configuration
     :return: valuable type and calculated statistics
     """
-    distinct_count = series.nunique()
+    return _cal_var_stats(*item)
+
+
+def _forced_var_stats(series: pd.Series, type_: str, config: ProfileConfig) -> Tuple[str, pd.Series]:
+    """Calculate the statistics of a variable as the type it is configured to be.
+
+    Values that don't fit the type, like text in an Interval variable, count as missing.
+
+    :param series: target series
+    :param type_: one of 'Interval', 'Datetime', 'Nominal' or 'Binary'
+    :param config: stat groups to skip
+    :return: valuable type and calculated statistics
+    """
+    skip = config.skips(series.name, type_)
+    if type_ == 'Interval':
+        stats = numerical_stats(_widen(pd.to_numeric(series, errors='coerce')), skip)
+    elif type_ == 'Datetime':
+        stats = datetime_stats(series if pd.api.types.is_datetime64_any_dtype(series)
+                               else pd.to_datetime(series, errors='coerce'), skip)
+        stats['data_type'] = _get_actual_dtype(series)
+    elif type_ == 'Binary':
+        stats = binary_stats(series, factorize(series), skip)
+        stats['data_type'] = _get_actual_dtype(series)
+    else:
+        stats = categorical_stats(series, factorize(series), skip)
+    stats['type'] = type_
+    return type_, stats
+
+
+def _classify_var(series: pd.Series, counts: Optional[ColumnCounts] = None,
+                  config: Optional[ProfileConfig] = None) -> Tuple[str, pd.Series]:
+    """Classify a variable and calculate the statistics of its type.
+
+    :param series: target series
+    :param counts: exact counts of the variable over the whole dataset
+    :param config: stat groups to skip
+    :return: valuable type and calculated statistics
+    """
+    config = config or ProfileConfig()
+    series = _widen(series)
+    # numerical columns are sorted once and any other column hashed once; every statistic below reads that
+    context = ColumnContext(series)
+    distinct_count = context.distinct_count
+    non_missing_cnt = context.count
     leng = len(series)
-    non_missing_cnt = series.count()
+    frequent = None
+    if counts is not None:
+        leng, non_missing_cnt, distinct_count = counts.count, counts.count - counts.n_missing, counts.n_unique
+        # the sample may miss rare values; frequent values come from the exact counts
+        frequent = counts_factorized(counts)
 
     if distinct_count == 0:
-        dty_empty = base_stats(series)
+        dty_empty = base_stats(series, context=context)
         dty_empty['type'] = 'ZeroVar'
         dty_empty['data_type'] = 'Empty'
         return 'Useless', dty_empty
 
     elif distinct_count == 1 and leng == non_missing_cnt:
-        dty_constant = base_stats(series)
+        dty_constant = base_stats(series, context=context)
         dty_constant['type'] = 'ZeroVar'
         dty_constant['data_type'] = 'Constant'
         return 'Useless', dty_constant
 
     elif distinct_count == leng and not pd.api.types.is_numeric_dtype(series):
-        dty_unique = base_stats(series)
+        dty_unique = base_stats(series, context=context)
+        # free text is mostly distinct; its text statistics are those of a Nominal variable
+        if 'text' not in config.skips(series.name, 'Nominal') and is_text(context.factorized):
+            uniques = context.factorized.uniques.to_numpy()
+            dty_unique = pd.Series({**dty_unique, **text_stats(summarize_text(uniques, context.factorized.counts))},
+                                   name=series.name)
         dty_unique['type'] = 'Unique'
         dty_unique['data_type'] = 'Unique'
         return 'Useless', dty_unique
 
     elif distinct_count == 2 or (distinct_count == 1 and leng != non_missing_cnt):
-        dty_binary = binary_stats(series)
+        dty_binary = binary_stats(series, frequent, config.skips(series.name, 'Binary'), context)
         dty_binary['type'] = 'Binary'
         dty_binary['data_type'] = _get_actual_dtype(series)
         return 'Binary', dty_binary
 
     elif pd.api.types.is_numeric_dtype(series):
-        dty_numerical = numerical_stats(series)
+        dty_numerical = numerical_stats(series, config.skips(series.name, 'Interval'), context)
         dty_numerical['type'] = 'Interval'
         return 'Interval', dty_numerical
 
     elif pd.api.types.is_datetime64_dtype(series):
-        dty_datetime = datetime_stats(series)
+        dty_datetime = datetime_stats(series, config.skips(series.name, 'Datetime'), context)
         dty_datetime['type'] = 'Datetime'
         return 'Datetime', dty_datetime
 
     else:
-        try:
-            converted = pd.to_datetime(series)
-            dty_datetime = datetime_stats(pd.Series(converted))
-            dty_datetime['type'] = 'Datetime'
-            dty_datetime['data_type'] = _get_actual_dtype(series)
-            return 'Datetime', dty_datetime
-        except:
-            dty_categorical = categorical_stats(series)
-            dty_categorical['type'] = 'Nominal'
-            return 'Nominal', dty_categorical
-
-
-def get_variable_stats(df: pd.DataFrame, num_works: int = -1) -> Dict[str, List[pd.Series]]:
+        if 'datetime' not in config.skips(series.name, 'Nominal'):
+            try:
+                converted, converted_context = _parse_datetime(series, context.factorized)
+                dty_datetime = datetime_stats(converted, config.skips(series.name, 'Datetime'), converted_context)
+                dty_datetime['type'] = 'Datetime'
+                dty_datetime['data_type'] = _get_actual_dtype(series)
+                return 'Datetime', dty_datetime
+            except:
+                pass
+        dty_categorical = categorical_stats(series, frequent, config.skips(series.name, 'Nominal'), context)
+        dty_categorical['type'] = 'Nominal'
+        return 'Nominal', dty_categorical
+
+
+def get_variable_stats(df: pd.DataFrame, num_works: int = -1,
+                       exact_counts: Optional[Dict[str, ColumnCounts]] = None,
+                       config: Optional[ProfileConfig] = None) -> Dict[str, List[pd.Series]]:
     """Collect types and statistics from each variable.
 
     :param df: the target dataset
     :param num_works: number of cpu cores for multiprocessing
-    :return: a dictionary contains statistics of all variables
+    :param exact_counts: exact counts of each variable over the whole dataset, when df is a sample of it
+    :param config: stat groups to skip and type overrides
+    :return: a dictionary contains the raw statistics of all variables
     """
+    return collect_variable_stats(df, num_works, exact_counts, config)[0]
+
+
+def _skipped_stats(series: pd.Series) -> pd.Series:
+    """Describe a variable whose statistics couldn't be computed with counts only.
+
+    :param series: target series
+    :return: the count and missing values of the variable
+    """
+    stats = count_stats(len(series), int(series.count()), 0)
+    stats.update({'type': 'Skipped', 'data_type': _get_actual_dtype(series)})
+    return pd.Series(stats, name=series.name)
+
+
+def _checkpoint_key(df: pd.DataFrame, exact_counts: Optional[Dict[str, ColumnCounts]],
+                    config: Optional[ProfileConfig]) -> str:
+    """Identify a profiling run, so a checkpoint is only resumed by the same run.
+
+    :param df: the target dataset
+    :param exact_counts: exact counts of each variable
+    :param config: the profile configuration
+    :return: a description of the dataset, a digest of its rows in order, and the settings
+    """
+    digest = hashlib.sha1(row_hashes(df).tobytes()).hexdigest()
+    return repr((list(df.columns), df.shape, [str(dtype) for dtype in df.dtypes], digest, exact_counts is not None,
+                 repr(config)))
+
+
+def collect_variable_stats(df: pd.DataFrame, num_works: int = -1,
+                           exact_counts: Optional[Dict[str, ColumnCounts]] = None,
+                           config: Optional[ProfileConfig] = None,
+                           column_timeout: Optional[float] = None,
+                           column_memory: Optional[int] = None,
+                           checkpoint_file: Optional[Union[str, Path]] = None) \
+        -> Tuple[Dict[str, List[pd.Series]], pd.DataFrame]:
+    """Collect types and statistics from each variable, isolating the variables that fail.
+
+    With a time or memory limit, every variable runs in a supervised worker: one that breaches a limit or
+    raises is profiled again on a sample of FALLBACK_SAMPLE_ROWS rows, and if that fails too, it is reported
+    as 'Skipped' with its counts only. Workers that timed out or ran out of memory are replaced.
+
+    :param df: the target dataset
+    :param num_works: number of cpu cores for multiprocessing, -1 to let the cost model pick them, see
+        :func:`plan_profile`
+    :param exact_counts: exact counts of each variable over the whole dataset, when df is a sample of it
+    :param config: stat groups to skip and type overrides
+    :param column_timeout: seconds each variable may take, None for no limit
+    :param column_memory: bytes each variable may allocate, None for no limit
+    :param checkpoint_file: file to record finished variables in; a run on the same dataset with the same
+        settings resumes from it
+    :return: the raw statistics of all variables, and the failed variables with the reason and the fallback
+    """
+    import tqdm
+
     logger.info("Calculating statistics for each variable...")
     var_stats = defaultdict(list)
-    num_works = multiprocessing.cpu_count() if num_works < 1 else num_works
+    failures = []
+    plan = workload = None
+    if num_works < 1:
+        plan, workload = plan_profile(df)
+        num_works = plan.num_works
+    started = time.perf_counter()
+    results = {}
+    if checkpoint_file:
+        key = _checkpoint_key(df, exact_counts, config)
+        records = load_pickles(Path(checkpoint_file))
+        if records and records[0] == key:
+            for record in records[1:]:
+                if record[0] == 'failure':
+                    failures.append(record[1:])
+                else:
+                    results[record[1].name] = record
+            logger.info(f"Resuming from {checkpoint_file}: {len(results)} of {df.shape[1]} variables done")
+        else:
+            if records:
+                logger.warning(f"{checkpoint_file} is from another dataset or settings, starting over")
+            Path(checkpoint_file).write_bytes(b'')
+            append_pickle(Path(checkpoint_file), key)
+
+    def record(result: Tuple[str, pd.Series], failure: Optional[tuple] = None) -> None:
+        results[result[1].name] = result
+        if failure:
+            failures.append(failure)
+        if checkpoint_file:
+            if failure:
+                append_pickle(Path(checkpoint_file), ('failure',) + failure)
+            append_pickle(Path(checkpoint_file), result)
+        progress.update()
 
     log_info_header = datetime.datetime.today().strftime("%Y-%m-%d at %X|INFO|")
-    with multiprocessing.Pool(num_works) as executor:
-        results = list(tqdm.tqdm(executor.imap_unordered(_cal_var_stats, (df[x] for x in df)), total=df.shape[1],
-                                 desc=f"{log_info_header}Profiling variables",
-                                 bar_format='{l_bar}{bar:40}{n_fmt}/{total_fmt}'))
-
-    for k, v in results:
+    progress = tqdm.tqdm(total=df.shape[1], initial=len(results), desc=f"{log_info_header}Profiling variables",
+                         bar_format='{l_bar}{bar:40}{n_fmt}/{total_fmt}')
+    todo = [x for x in df if x not in results]
+    items = ((df[x], exact_counts.get(x) if exact_counts else None, config) for x in todo)
+    with progress:
+        if column_timeout or column_memory:
+            tasks = ((x, item) for x, item in zip(todo, items))
+            failed = {}
+            for x, status, result in run_supervised(_cal_var_stats, tasks, num_works, column_timeout, column_memory):
+                if status == 'ok':
+                    record(result)
+                else:
+                    failed[x] = status
+            # second chance on a sample, then counts only
+            sample_rows = min(FALLBACK_SAMPLE_ROWS, len(df))
+            tasks = ((x, (df[x].sample(sample_rows, random_state=RANDOM_STATE),
+                          exact_counts.get(x) if exact_counts else None, config)) for x in failed)
+            for x, status, result in run_supervised(_cal_var_stats, tasks, num_works, column_timeout, column_memory):
+                if status == 'ok':
+                    record(result, (x, failed[x], f'sampled {sample_rows:,d} rows'))
+                else:
+                    record(('Useless', _skipped_stats(df[x])), (x, failed[x], 'skipped'))
+        elif num_works == 1:
+            # no pool for a single worker, so callers that already run on an executor don't spawn nested pools
+            for result in map(_cal_var_stats_of, items):
+                record(result)
+        else:
+            with multiprocessing.Pool(num_works) as executor:
+                for result in executor.imap_unordered(_cal_var_stats_of, items, plan.batch_size if plan else 1):
+                    record(result)
+    if plan:
+        record_run(workload, plan, time.perf_counter() - started)
+
+    for k, v in results.values():
         var_stats[k].append(v)
-
-    return var_stats
+    failures = pd.DataFrame(failures, columns=['variable', 'reason', 'fallback']).set_index('variable')
+    return var_stats, failures
 
 
-def get_table_stats(df: pd.DataFrame, var_stats: Dict[str, List[pd.Series]]) -> pd.DataFrame:
+def get_table_stats(df: pd.DataFrame, var_stats: Dict[str, List[pd.Series]],
+                    exact_counts: Optional['ExactCounts'] = None,
+                    duplicates: Optional[DuplicateCounts] = None,
+                    bitmaps: Optional[NullBitmaps] = None) -> pd.DataFrame:
     """Extract information from the target dataset.
 
     :param df: the target dataset
     :param var_stats: statistics from each variable
+    :param exact_counts: exact counts over the whole dataset, when df is a sample of it
+    :param duplicates: the duplicate rows of df from :func:`find_duplicates`, counted here if None
+    :param bitmaps: the null bitmaps of df from :func:`null_bitmaps`, packed here if None
     :return: a dictionary contains statistics of the target dataset
     """
     logger.info("Getting 'Table Statistics' ready...")
-    table_stats = {'n_row': df.shape[0],
-                   'n_col': df.shape[1],
-                   'n_missing_cell': df.isnull().sum().sum(),
-                   'n_empty_row': df.shape[0] - df.dropna(how='all').shape[0],
-                   'n_duplicated_row': df.duplicated().sum()}
+    if exact_counts is not None:
+        table_stats = {'n_row': exact_counts.n_row,
+                       'n_col': df.shape[1],
+                       'n_missing_cell': exact_counts.n_missing_cell,
+                       'n_empty_row': exact_counts.n_empty_row,
+                       'n_duplicated_row': exact_counts.n_duplicated_row}
+    else:
+        duplicates = duplicates or find_duplicates(df, 0)
+        bitmaps = bitmaps or null_bitmaps(df)
+        table_stats = {'n_row': df.shape[0],
+                       'n_col': df.shape[1],
+                       'n_missing_cell': int(bitmaps.n_missing.sum()),
+                       'n_empty_row': count_empty_rows(bitmaps),
+                       'n_duplicated_row': duplicates.n_row - duplicates.n_distinct}
     table_stats.update({'n_{}_var'.format(key): len(item) for key, item in var_stats.items()})
 
     return pd.DataFrame(_format_series(pd.Series(table_stats)), columns=['count'])
@@ -186,23 +426,71 @@ def get_var_summary(var_stats: Dict[str, List[pd.Series]]) -> pd.DataFrame:
     return pd.concat(tmp_df_stats)
 
 
-def get_confusion_matrix(df: pd.DataFrame, var_stats: Dict[str, List[pd.Series]]) -> List[pd.DataFrame]:
+def _str_labels(series: pd.Series) -> pd.Series:
+    """Convert values to the labels shown in a confusion matrix, with 'nan' for missing cells of any dtype.
+
+    :param series: target series
+    :return: the labels
+    """
+    labels = series.astype(str)
+    if series.dtype != object:
+        labels[series.isnull().to_numpy()] = 'nan'
+    return labels
+
+
+def get_confusion_matrix(df: pd.DataFrame, var_stats: Dict[str, List[pd.Series]],
+                         config: Optional[ProfileConfig] = None) -> List[pd.DataFrame]:
     """Provide confusion matrices for all combination of binary variables.
 
     :param df:
     :param var_stats:
+    :param config: binary variables with 'conf_matrix' skipped are left out
     :return: a list of confusion matrices
     """
     logger.info("Getting 'Confusion Matrix' ready...")
     cm_lt = []
-    binary_vars = [var.name for var in var_stats['Binary']]
+    config = config or ProfileConfig()
+    binary_vars = [var.name for var in var_stats['Binary'] if 'conf_matrix' not in config.skips(var.name, 'Binary')]
+    # encode each variable once instead of once per pair; labels are sorted strings, as pd.crosstab shows them
+    encoded = {var: pd.factorize(_str_labels(df[var]), sort=True) for var in binary_vars}
     for a, b in combinations(binary_vars, 2):
         logger.debug(f"Calculating confusion matrix of {a} and {b}")
-        confusion_matrix = pd.crosstab(df[a].astype(str), df[b].astype(str))
+        (codes_a, labels_a), (codes_b, labels_b) = encoded[a], encoded[b]
+        counts = numpy.bincount(codes_a * len(labels_b) + codes_b, minlength=len(labels_a) * len(labels_b))
+        confusion_matrix = pd.DataFrame(counts.reshape(len(labels_a), len(labels_b)),
+                                        index=pd.Index(labels_a, name=a), columns=pd.Index(labels_b, name=b))
         cm_lt.append(confusion_matrix)
     return cm_lt
 
 
+def get_avoided_work(n_rows: int, excluded: List[str], raw_stats: Dict[str, List[pd.Series]],
+                     config: ProfileConfig) -> pd.DataFrame:
+    """Measure the work a configuration skipped, as the number of values never scanned.
+
+    :param n_rows: number of rows of the dataset
+    :param excluded: the columns left out
+    :param raw_stats: statistics of the profiled variables
+    :param config: the profile configuration
+    :return: number of skipped variables (pairs for the confusion matrix) and values of each skipped work
+    """
+    avoided = {'excluded columns': (len(excluded), len(excluded) * n_rows)}
+    for group, types in STAT_GROUPS.items():
+        skipped = [stats for type_ in types for stats in raw_stats.get(type_, [])
+                   if group in config.skips(stats.name, type_)]
+        if group == 'conf_matrix':
+            n_binary = len(raw_stats.get('Binary', []))
+            n_pairs = n_binary * (n_binary - 1) // 2 - (n_binary - len(skipped)) * (n_binary - len(skipped) - 1) // 2
+            avoided[group] = (n_pairs, n_pairs * n_rows)
+        else:
+            avoided[group] = (len(skipped), sum(int(stats['count'] - stats['n_missing']) for stats in skipped))
+    avoided = pd.DataFrame.from_dict(avoided, orient='index', columns=['n_skipped', 'n_values'])
+    avoided = avoided[avoided['n_skipped'] > 0]
+    for work, (n_skipped, n_values) in avoided.iterrows():
+        logger.info(f"Skipped {work} for {n_skipped:,d} {'pairs' if work == 'conf_matrix' else 'variables'}, "
+                    f"avoiding a scan of {n_values:,d} values")
+    return avoided
+
+
 def get_a_sample(df: pd.DataFrame, sample_size: int = DEFAULT_SAMPLE_SIZE,
                  random_state: int = RANDOM_STATE) -> pd.DataFrame:
     """Provide the original dataset or a random sample of it.
@@ -225,22 +513,68 @@ def get_a_sample(df: pd.DataFrame, sample_size: int = DEFAULT_SAMPLE_SIZE,
     return sample_df
 
 
-def get_df_profile(df: pd.DataFrame, num_works: int = -1) \
+def get_df_profile(df: pd.DataFrame, num_works: int = -1, dtype_changes: Optional[DtypeChanges] = None,
+                   top_correlations: int = CORRELATION_TOP_N, exact_counts: Optional['ExactCounts'] = None,
+                   config: Optional[ProfileConfig] = None, column_timeout: Optional[float] = None,
+                   column_memory: Optional[int] = None, checkpoint_file: Optional[Union[str, Path]] = None) \
         -> Dict[str, Union[pd.DataFrame, list, Dict[str, pd.DataFrame]]]:
     """Collect all type of statistics together into one dictionary.
 
-    :param df:
-    :param num_works:
+    :param df: the frame, or a partitioned frame: a Dask DataFrame or an iterable of pandas DataFrames, which is
+        counted partition by partition with :func:`count_partitions` and profiled on a sample of its rows
+    :param num_works: number of cpu cores for multiprocessing, -1 to let the cost model pick them
+    :param dtype_changes: original and compact dtype of the columns downcast on load, to list in the report
+    :param top_correlations: number of strongest pairs to keep for each correlation statistic, 0 for none
+    :param exact_counts: exact counts over the whole dataset from ``count_exact``, when df is a sample of it;
+        counts, distinct values, frequent values and duplicate rows are then reported from them
+    :param config: the columns to profile, stat groups to skip, type overrides and data-quality rules; the
+        skipped work is logged and kept as 'avoided_work', the violations of the rules as 'rule_violations'
+    :param column_timeout: seconds each variable may take, see :func:`collect_variable_stats`
+    :param column_memory: bytes each variable may allocate
+    :param checkpoint_file: file to record finished variables in, to resume an interrupted run
     :return:
     """
+    if is_partitioned(df):
+        exact_counts, df = count_partitions(df, num_works, config=config)
     if not isinstance(df, pd.DataFrame):
         raise TypeError("only pandas DataFrames can be profiled! ")
 
+    ensure_logger()
     logger.info("Collecting stats for data profile...")
     df_profile = {}
-    var_stats = get_variable_stats(df, num_works)
-
-    df_profile['table_stats'] = get_table_stats(df, var_stats)
+    excluded = []
+    if config is not None:
+        selected = config.select(df.columns)
+        excluded = [col for col in df.columns if col not in set(selected)]
+        df = df[selected] if excluded else df
+    raw_stats, failures = collect_variable_stats(df, num_works, exact_counts.columns if exact_counts else None,
+                                                 config, column_timeout, column_memory, checkpoint_file)
+    if len(failures):
+        df_profile['failures'] = failures
+    # histograms are reported as charts, not as cells of the statistics tables
+    df_profile['histograms'] = {stats.name: stats.pop('histogram') for stats in raw_stats.get('Interval', [])
+                                if 'histogram' in stats}
+    df_profile['quantile_histograms'] = {stats.name: stats.pop('quantile_histogram')
+                                         for stats in raw_stats.get('Interval', []) if 'quantile_histogram' in stats}
+    violations = {stats.name: stats.pop('rule_violations') for item in raw_stats.values() for stats in item
+                  if 'rule_violations' in stats}
+    if violations:
+        df_profile['rule_violations'] = rule_table(violations)
+    # exports read the typed statistics; only the report tables go through the string formatting pass
+    df_profile['raw_stats'] = {f'{key}': pd.DataFrame(item) for key, item in raw_stats.items()}
+    var_stats = {key: [_format_series(stats) for stats in item] for key, item in raw_stats.items()}
+
+    duplicates = exact_counts.duplicates if exact_counts else find_duplicates(df)
+    bitmaps = null_bitmaps(df)
+    df_profile['table_stats'] = get_table_stats(df, var_stats, exact_counts, duplicates, bitmaps)
+    # patterns and pairs of missing values, on the rows profiled
+    df_profile.update(describe_missingness(bitmaps))
+    if duplicates is not None and len(duplicates.groups):
+        df_profile['duplicate_rows'] = describe_duplicates(duplicates, None if exact_counts else df)
+    n_row = exact_counts.n_row if exact_counts else len(df)
+    keys = check_keys(None if exact_counts else df, key_candidates(df_profile['raw_stats'], n_row), n_row)
+    if len(keys):
+        df_profile['keys'] = keys
     df_profile['var_summary'] = get_var_summary(var_stats)
 
     df_profile['var_stats'] = {}
@@ -250,6 +584,22 @@ def get_df_profile(df: pd.DataFrame, num_works: int = -1) \
         df_profile['var_stats'][f'{key}'] = pd.DataFrame(item).drop(['data_type', 'type'], axis=1)
 
     if 'Binary' in var_stats and len([var.name for var in var_stats['Binary']]) > 1:
-        df_profile['conf_matrix'] = get_confusion_matrix(df, var_stats)
+        conf_matrix = get_confusion_matrix(df, var_stats, config)
+        if conf_matrix:
+            df_profile['conf_matrix'] = conf_matrix
+
+    if top_correlations > 0:
+        numerical_vars = [var.name for var in raw_stats.get('Interval', [])]
+        categorical_vars = [var.name for key in ['Nominal', 'Binary'] for var in raw_stats.get(key, [])]
+        correlations = get_correlations(df, numerical_vars, categorical_vars, top_correlations)
+        if len(correlations):
+            df_profile['correlations'] = correlations
+
+    if config is not None:
+        df_profile['avoided_work'] = get_avoided_work(len(df), excluded, raw_stats, config)
+
+    if dtype_changes:
+        df_profile['dtype_changes'] = pd.DataFrame.from_dict(dtype_changes, orient='index',
+                                                             columns=['original_dtype', 'compact_dtype'])
 
     return df_profile
@@ -0,0 +1,223 @@
+"""Check declarative data-quality rules on each variable, in the same pass that computes its statistics.
+
+A rule is a check name and its parameters, e.g. {'check': 'range', 'min': 0, 'max': 120}. Rules compile once, when
+the configuration is built, into a kernel that computes the mask of violating rows of a column in a few vectorized
+operations; outlier rules read the quartiles, mean and std the statistics of the variable already hold.
+"""
+
+import datetime
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ._config import RULE_EXAMPLES
+
+# parameters of each check, and their defaults; None marks a required parameter
+RULE_CHECKS = {'iqr': {'k': 1.5},
+               'zscore': {'threshold': 3.},
+               'range': {'min': -np.inf, 'max': np.inf},
+               'regex': {'pattern': None},
+               'allowed': {'values': None},
+               'not_null': {}}
+RULE_COLUMNS = ['variable', 'rule', 'n_checked', 'n_violation', 'p_violation', 'examples', 'rows']
+
+
+class Rule(NamedTuple):
+    """A compiled rule: the check, its parameters with defaults filled in, and a label for the report."""
+
+    check: str
+    params: Dict[str, Any]
+    label: str
+
+
+class RuleResult(NamedTuple):
+    """The violations of a rule by a variable, with some offending values and their row labels."""
+
+    rule: str
+    n_checked: int
+    n_violation: int
+    examples: tuple
+    rows: tuple
+
+
+def compile_rule(spec: Union[str, Mapping[str, Any]]) -> Rule:
+    """Validate a rule and prepare its parameters.
+
+    :param spec: a check name, for a check with defaults for all its parameters, or a mapping of 'check' and
+        the parameters, e.g. {'check': 'regex', 'pattern': '[A-Z]{2}[0-9]+'}
+    :return: the compiled rule
+    """
+    spec = {'check': spec} if isinstance(spec, str) else dict(spec)
+    check = spec.pop('check', None)
+    if check not in RULE_CHECKS:
+        raise ValueError(f"unknown check {check!r}, choose from {list(RULE_CHECKS)}")
+    unknown = set(spec) - set(RULE_CHECKS[check])
+    if unknown:
+        raise ValueError(f"unknown parameters {sorted(unknown)} of check {check!r}, "
+                         f"choose from {list(RULE_CHECKS[check])}")
+    params = {**RULE_CHECKS[check], **spec}
+    missing = [key for key, value in params.items() if value is None]
+    if missing:
+        raise ValueError(f"check {check!r} needs the parameters {missing}")
+
+    if check == 'regex':
+        label = f"regex {params['pattern']}"
+        params['pattern'] = re.compile(params['pattern'])
+    elif check == 'allowed':
+        params['values'] = list(params['values'])
+        label = f"allowed {len(params['values'])} values"
+    elif check == 'range':
+        label = f"range [{params['min']}, {params['max']}]"
+    elif check == 'iqr':
+        label = f"iqr k={params['k']:g}"
+    elif check == 'zscore':
+        label = f"zscore > {params['threshold']:g}"
+    else:
+        label = check
+    return Rule(check, params, label)
+
+
+def compile_rules(specs: Mapping[Any, Sequence[Union[str, Mapping[str, Any]]]]) -> Dict[Any, Tuple[Rule, ...]]:
+    """Compile the rules of each column or variable type.
+
+    :param specs: the rules of each key
+    :return: the compiled rules of each key
+    """
+    return {key: tuple(compile_rule(spec) for spec in rules) for key, rules in specs.items()}
+
+
+def _numbers(series: pd.Series) -> pd.Series:
+    """Read a column as numbers, values that aren't counting as missing."""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series
+    return pd.to_numeric(series, errors='coerce')
+
+
+def _is_date(bound: Any) -> bool:
+    """Tell whether a bound of a range is a date, a date object or text that isn't a number."""
+    if isinstance(bound, (datetime.date, np.datetime64)):
+        return True
+    if not isinstance(bound, str):
+        return False
+    try:
+        float(bound)
+        return False
+    except ValueError:
+        return True
+
+
+def _outside(series: pd.Series, low: Any, high: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the values of a column outside closed bounds.
+
+    :param series: the column
+    :param low: the lower bound
+    :param high: the upper bound
+    :return: the mask of checked values, those not missing, and of the values outside the bounds
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        low = pd.Timestamp.min if low == -np.inf else pd.Timestamp(low)
+        high = pd.Timestamp.max if high == np.inf else pd.Timestamp(high)
+        checked = series.notna().to_numpy()
+        return checked, checked & ((series < low) | (series > high)).to_numpy()
+    values = _numbers(series).to_numpy(dtype=np.float64, na_value=np.nan)
+    checked = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        return checked, (values < low) | (values > high)
+
+
+def _iqr_kernel(series: pd.Series, stats: pd.Series, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the values beyond k interquartile ranges from the quartiles."""
+    if stats.get('type') == 'Interval' and '25%' in stats.index and '75%' in stats.index:
+        q1, q3 = float(stats['25%']), float(stats['75%'])
+    else:
+        q1, q3 = _numbers(series).quantile([.25, .75])
+    return _outside(_numbers(series), q1 - params['k'] * (q3 - q1), q3 + params['k'] * (q3 - q1))
+
+
+def _zscore_kernel(series: pd.Series, stats: pd.Series, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the values more than threshold standard deviations from the mean."""
+    values = _numbers(series)
+    if stats.get('type') == 'Interval' and 'mean' in stats.index and 'std' in stats.index:
+        mean, std = float(stats['mean']), float(stats['std'])
+    else:
+        mean, std = values.mean(), values.std()
+    return _outside(values, mean - params['threshold'] * std, mean + params['threshold'] * std)
+
+
+def _range_kernel(series: pd.Series, stats: pd.Series, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the values below min or above max, as dates for a Datetime variable or date bounds."""
+    low, high = params['min'], params['max']
+    if stats.get('type') == 'Datetime' or _is_date(low) or _is_date(high):
+        if not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, errors='coerce')
+        return _outside(series, low, high)
+    return _outside(series, float(low), float(high))
+
+
+def _regex_kernel(series: pd.Series, stats: pd.Series, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the values whose text doesn't fully match the pattern, matching each distinct value once."""
+    codes, uniques = pd.factorize(series)
+    pattern = params['pattern']
+    mismatch = np.array([pattern.fullmatch(str(value)) is None for value in uniques] + [False])
+    return codes >= 0, mismatch[codes]
+
+
+def _allowed_kernel(series: pd.Series, stats: pd.Series, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the values outside the allowed set."""
+    checked = series.notna().to_numpy()
+    return checked, checked & ~series.isin(params['values']).to_numpy()
+
+
+def _not_null_kernel(series: pd.Series, stats: pd.Series, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mark the missing values."""
+    return np.ones(len(series), dtype=bool), series.isna().to_numpy()
+
+
+_KERNELS: Dict[str, Callable[[pd.Series, pd.Series, Dict[str, Any]], Tuple[np.ndarray, np.ndarray]]] = {
+    'iqr': _iqr_kernel, 'zscore': _zscore_kernel, 'range': _range_kernel, 'regex': _regex_kernel,
+    'allowed': _allowed_kernel, 'not_null': _not_null_kernel}
+
+
+def evaluate_rules(series: pd.Series, rules: Iterable[Rule], stats: Optional[pd.Series] = None,
+                   n_examples: int = RULE_EXAMPLES) -> Tuple[RuleResult, ...]:
+    """Count the values of a variable that violate each rule.
+
+    :param series: the variable
+    :param rules: the compiled rules of the variable
+    :param stats: the statistics of the variable, whose quartiles, mean and std the outlier rules read if it's
+        an Interval variable
+    :param n_examples: number of offending values to keep for each rule
+    :return: the result of each rule; a rule that fails checks no value, and notes the error in its label
+    """
+    stats = pd.Series(dtype=object) if stats is None else stats
+    results = []
+    for rule in rules:
+        try:
+            checked, violation = _KERNELS[rule.check](series, stats, rule.params)
+        except Exception as e:
+            logger.warning(f"Rule {rule.label} of {series.name} failed: {e!r}")
+            results.append(RuleResult(f"{rule.label} (failed: {type(e).__name__})", 0, 0, (), ()))
+            continue
+        offending = np.flatnonzero(violation)
+        results.append(RuleResult(rule.label, int(checked.sum()), len(offending),
+                                  tuple(series.iloc[offending[:n_examples]]),
+                                  tuple(series.index[offending[:n_examples]])))
+    return tuple(results)
+
+
+def rule_table(results: Dict[str, Tuple[RuleResult, ...]]) -> pd.DataFrame:
+    """Collect the results of the rules of all variables into one table.
+
+    :param results: the results of the rules of each variable
+    :return: a table with a row per variable and rule, in RULE_COLUMNS
+    """
+    rows: List[tuple] = []
+    for name, item in results.items():
+        for result in item:
+            p_violation = result.n_violation / result.n_checked if result.n_checked else np.NaN
+            rows.append((name, result.rule, result.n_checked, result.n_violation, p_violation, result.examples,
+                         result.rows))
+    return pd.DataFrame(rows, columns=RULE_COLUMNS)
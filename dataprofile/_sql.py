@@ -0,0 +1,211 @@
+"""Profile a table of a SQL database, letting the database compute what it can over the whole table.
+
+Counts, missing and distinct values, most frequent values, empty and duplicate rows, and the min, max, sum, mean,
+variance and zeros of numerical columns are aggregated by the database. Only a random sample of the columns that
+need their values on the client, for quantiles, histograms, date parsing and pairwise statistics, is fetched,
+in batches. Columns the aggregates describe fully, empty, constant or all-distinct text, are never fetched.
+"""
+
+import math
+import numbers
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+
+from ._config import CORRELATION_TOP_N, EXTERNAL_SAMPLE_ROWS, EXTERNAL_TOP_K, SQL_FETCH_ROWS
+from ._external import ExactCounts
+from ._profile_config import ProfileConfig
+from ._profiling import get_df_profile
+from ._var_statistics import ColumnCounts
+
+SAMPLINGS = ('random', 'tablesample')
+
+
+def _quote(name: str) -> str:
+    """Quote an identifier, so any column name is safe to put in a query.
+
+    :param name: the column or table name
+    :return: the quoted identifier
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _table_ref(table: str) -> str:
+    """Quote a table name, optionally qualified by its schema as 'schema.table'.
+
+    :param table: the table name
+    :return: the quoted reference
+    """
+    return '.'.join(_quote(part) for part in table.split('.'))
+
+
+def _fetch_frame(cursor: Any, batch_rows: int = SQL_FETCH_ROWS) -> pd.DataFrame:
+    """Read the result of an executed query in batches of rows.
+
+    :param cursor: a DB-API cursor with an executed query
+    :param batch_rows: number of rows per fetchmany call
+    :return: the result, with the dtypes inferred from the values
+    """
+    columns = [description[0] for description in cursor.description]
+    batches = []
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            break
+        batches.append(pd.DataFrame.from_records(rows, columns=columns))
+    if not batches:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(batches, ignore_index=True).infer_objects()
+
+
+def _is_number(value: Any) -> bool:
+    """Check whether a value the database returned is a number.
+
+    :param value: a value of a column
+    :return: whether the column is numerical
+    """
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _sample_query(source: str, columns: List[str], n_row: int, sample_rows: int, sampling: str) -> str:
+    """Build the query drawing a random sample of some columns.
+
+    :param source: the quoted table
+    :param columns: the quoted columns to fetch
+    :param n_row: number of rows of the table
+    :param sample_rows: number of rows to sample
+    :param sampling: 'random' to sort on RANDOM(), as in SQLite and PostgreSQL, or 'tablesample' for TABLESAMPLE
+        SYSTEM, which reads only some pages of the table
+    :return: the query
+    """
+    select = f"SELECT {', '.join(columns)} FROM {source}"
+    if n_row <= sample_rows:
+        return select
+    if sampling == 'tablesample':
+        return f"{select} TABLESAMPLE SYSTEM ({min(100., 100. * sample_rows / n_row)})"
+    return f"{select} ORDER BY RANDOM() LIMIT {int(sample_rows)}"
+
+
+def count_sql(connection: Any, table: str, sample_rows: int = EXTERNAL_SAMPLE_ROWS, top_k: int = EXTERNAL_TOP_K,
+              config: Optional[ProfileConfig] = None, sampling: str = 'random', approx_distinct: bool = False,
+              batch_rows: int = SQL_FETCH_ROWS) -> Tuple[ExactCounts, pd.DataFrame]:
+    """Aggregate a database table exactly, and draw a random sample of the columns that need their values.
+
+    :param connection: a DB-API 2 connection, e.g. from sqlite3.connect
+    :param table: the table name, optionally qualified by its schema
+    :param sample_rows: number of rows to sample for the other statistics
+    :param top_k: number of most frequent values to keep for each column
+    :param config: the columns to profile and stat groups to skip
+    :param sampling: 'random' or 'tablesample', see :func:`_sample_query`
+    :param approx_distinct: whether to count distinct values with APPROX_COUNT_DISTINCT, where the database has it
+    :param batch_rows: number of rows per fetchmany call
+    :return: the exact counts, and the sample with a placeholder for each column that wasn't fetched
+    """
+    if sampling not in SAMPLINGS:
+        raise ValueError(f"unknown sampling {sampling}, choose from {list(SAMPLINGS)}")
+    config = config or ProfileConfig()
+    cursor = connection.cursor()
+    source = _table_ref(table)
+    cursor.execute(f"SELECT * FROM {source} WHERE 1 = 0")
+    columns = config.select([description[0] for description in cursor.description])
+    quoted = {col: _quote(col) for col in columns}
+    logger.info(f"Aggregating {len(columns)} columns of {table} in the database...")
+
+    distinct = 'APPROX_COUNT_DISTINCT({})' if approx_distinct else 'COUNT(DISTINCT {})'
+    all_missing = ' AND '.join(f"{q} IS NULL" for q in quoted.values()) or '1 = 0'
+    aggregates = ''.join(f", COUNT({q}), {distinct.format(q)}, MIN({q}), MAX({q})" for q in quoted.values())
+    cursor.execute(f"SELECT COUNT(*), SUM(CASE WHEN {all_missing} THEN 1 ELSE 0 END){aggregates} FROM {source}")
+    row = cursor.fetchone()
+    n_row, n_empty_row = row[0], row[1] or 0
+    count, n_unique, minimum, maximum = ({col: row[i + 2 + 4 * j] for j, col in enumerate(columns)}
+                                         for i in range(4))
+    n_distinct_row = n_row
+    if n_row and columns:
+        cursor.execute(f"SELECT COUNT(*) FROM (SELECT DISTINCT {', '.join(quoted.values())} FROM {source}) AS t")
+        n_distinct_row = cursor.fetchone()[0]
+
+    numerical = [col for col in columns if _is_number(minimum[col])]
+    # empty and constant columns, and text columns of distinct values, are described by their counts alone
+    placeholders = {col for col in columns if not config.type_of(col)
+                    and (n_unique[col] == 0 or (n_unique[col] == 1 and count[col] == n_row)
+                         or (n_unique[col] == n_row and col not in numerical))}
+    intervals = [col for col in numerical if n_unique[col] > 2 and col not in placeholders
+                 and 'moments' not in config.skips(col, 'Interval')]
+    ranked = [col for col in columns if col not in placeholders and (col not in numerical or n_unique[col] <= 2)]
+
+    tops = {col: pd.Series([n_row], index=[minimum[col]]) if n_unique[col] == 1 and count[col] == n_row
+            else pd.Series([], dtype='int64') for col in columns}
+    for col in ranked:
+        cursor.execute(f"SELECT {quoted[col]}, COUNT(*) FROM {source} WHERE {quoted[col]} IS NOT NULL "
+                       f"GROUP BY {quoted[col]} ORDER BY COUNT(*) DESC, {quoted[col]} LIMIT {int(top_k)}")
+        values = cursor.fetchall()
+        tops[col] = pd.Series([freq for _, freq in values], index=[value for value, _ in values], dtype='int64')
+
+    moments = _moments(cursor, source, {col: quoted[col] for col in intervals}, count)
+    column_counts = {}
+    for col in columns:
+        column_aggregates = None
+        if col in moments:
+            column_aggregates = {'min': minimum[col], 'max': maximum[col], **moments[col]}
+        column_counts[col] = ColumnCounts(n_row, n_row - count[col], n_unique[col], tops[col], column_aggregates)
+    counts = ExactCounts(n_row, sum(n_row - n for n in count.values()), n_empty_row, n_row - n_distinct_row,
+                         column_counts)
+
+    fetched = [col for col in columns if col not in placeholders]
+    logger.info(f"Fetching a sample of {len(fetched)} columns, {len(placeholders)} are described by their counts")
+    if fetched:
+        cursor.execute(_sample_query(source, [quoted[col] for col in fetched], n_row, sample_rows, sampling))
+        sample = _fetch_frame(cursor, batch_rows)
+    else:
+        sample = pd.DataFrame(index=pd.RangeIndex(min(n_row, sample_rows)))
+    for col in placeholders:
+        sample[col] = minimum[col] if n_unique[col] == 1 and count[col] == n_row else None
+    return counts, sample[columns]
+
+
+def _moments(cursor: Any, source: str, columns: Dict[str, str], count: Dict[str, int]) -> Dict[str, Dict[str, Any]]:
+    """Aggregate the sum, mean, variance and zeros of numerical columns in two scans of the table.
+
+    The variance sums squared deviations from the mean of the first scan, which keeps it accurate for values far
+    from zero.
+
+    :param cursor: a DB-API cursor
+    :param source: the quoted table
+    :param columns: the quoted name of each numerical column
+    :param count: number of values that aren't missing in each column
+    :return: the aggregates of each column
+    """
+    if not columns:
+        return {}
+    cursor.execute("SELECT " + ', '.join(f"SUM({q}), AVG({q}), SUM(CASE WHEN {q} = 0 THEN 1 ELSE 0 END)"
+                                         for q in columns.values()) + f" FROM {source}")
+    row = cursor.fetchone()
+    moments = {col: {'sum': row[3 * i], 'mean': float(row[3 * i + 1]), 'n_zeros': int(row[3 * i + 2])}
+               for i, col in enumerate(columns)}
+    cursor.execute("SELECT " + ', '.join(f"SUM(({q} - {moments[col]['mean']!r}) * ({q} - {moments[col]['mean']!r}))"
+                                         for col, q in columns.items()) + f" FROM {source}")
+    for col, squares in zip(columns, cursor.fetchone()):
+        variance = float(squares) / (count[col] - 1) if count[col] > 1 else math.nan
+        moments[col].update({'variance': variance, 'std': math.sqrt(variance)})
+    return moments
+
+
+def profile_sql(connection: Any, table: str, sample_rows: int = EXTERNAL_SAMPLE_ROWS, num_works: int = -1,
+                config: Optional[ProfileConfig] = None, top_correlations: int = CORRELATION_TOP_N,
+                sampling: str = 'random', approx_distinct: bool = False) -> Dict[str, Any]:
+    """Profile a database table, with the statistics the database can compute taken over the whole table.
+
+    :param connection: a DB-API 2 connection, e.g. from sqlite3.connect
+    :param table: the table name, optionally qualified by its schema
+    :param sample_rows: number of rows to sample for quantiles, histograms, dates and pairwise statistics
+    :param num_works: number of cpu cores for multiprocessing
+    :param config: the columns to profile, stat groups to skip and type overrides
+    :param top_correlations: number of most correlated pairs to keep, 0 to skip correlations
+    :param sampling: 'random' or 'tablesample', see :func:`_sample_query`
+    :param approx_distinct: whether to count distinct values with APPROX_COUNT_DISTINCT, where the database has it
+    :return: the profile, as from :func:`get_df_profile`
+    """
+    counts, sample = count_sql(connection, table, sample_rows, config=config, sampling=sampling,
+                               approx_distinct=approx_distinct)
+    return get_df_profile(sample, num_works, top_correlations=top_correlations, exact_counts=counts, config=config)
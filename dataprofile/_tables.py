@@ -0,0 +1,279 @@
+"""Render profile tables as psql, pipe (markdown) or html text in bulk.
+
+The output matches ``tabulate`` and ``DataFrame.to_html`` for the tables of a profile, but every cell is
+classified and formatted once, so wide profiles can be sliced into chunks without re-rendering the frame.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+TABLE_FORMATS = ('psql', 'pipe', 'html')
+
+# cell kinds, ordered from the least to the most generic, as tabulate infers column types
+_NONE, _BOOL, _INT, _FLOAT, _STR = range(5)
+
+# numbers with thousands separators, as tabulate 0.10 reads them
+_THOUSANDS = re.compile(r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$")
+
+_SPARK_BARS = ' ▁▂▃▄▅▆▇█'
+
+_HTML_ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '\t': '\\t', '\n': '\\n', '\r': '\\r'}
+
+
+class Markup(str):
+    """Text that is already html, so html tables show it unescaped."""
+
+
+def sparkline(counts: Sequence[float]) -> str:
+    """Draw bin counts as a line of block characters, one per bin.
+
+    :param counts: count of each bin
+    :return: the sparkline, a space for an empty bin
+    """
+    counts = np.asarray(counts, dtype=float)
+    peak = counts.max() if len(counts) else 0
+    if peak <= 0:
+        return _SPARK_BARS[0] * len(counts)
+    levels = np.ceil(counts / peak * (len(_SPARK_BARS) - 1)).astype(int)
+    return ''.join(_SPARK_BARS[level] for level in levels)
+
+
+def svg_bars(counts: Sequence[float], width: int = 96, height: int = 24) -> Markup:
+    """Draw bin counts as an inline svg bar chart.
+
+    :param counts: count of each bin
+    :param width: width of the chart in pixels
+    :param height: height of the chart in pixels
+    :return: the svg element
+    """
+    counts = np.asarray(counts, dtype=float)
+    peak = counts.max() if len(counts) and counts.max() > 0 else 1
+    bar = width / max(len(counts), 1)
+    rects = ''.join(f'<rect x="{i * bar:.1f}" y="{height - count / peak * height:.1f}" width="{bar * 0.9:.1f}" '
+                    f'height="{count / peak * height:.1f}"/>' for i, count in enumerate(counts))
+    return Markup(f'<svg width="{width}" height="{height}" fill="steelblue">{rects}</svg>')
+
+
+@lru_cache(maxsize=None)
+def _reads_separators() -> bool:
+    """Tell whether tabulate reads numbers with thousands separators as numbers, as it does from version 0.10.
+
+    The same version reads numpy integers as integers, and empty strings as missing.
+    """
+    from tabulate import tabulate
+
+    return tabulate([['1,000'], ['1']], tablefmt='pipe').startswith('|-')
+
+
+def _kind(value: Any) -> int:
+    """Classify a cell like tabulate does: numbers are right aligned and everything else left aligned.
+
+    :param value: a cell
+    :return: the kind of the cell
+    """
+    if value is None or isinstance(value, str) and not value and _reads_separators():
+        return _NONE
+    if hasattr(value, 'isoformat'):
+        return _STR
+    if type(value) is bool or isinstance(value, str) and value in ('True', 'False'):
+        return _BOOL
+    if type(value) is int or isinstance(value, np.integer) and _reads_separators():
+        return _INT
+    if isinstance(value, str):
+        try:
+            int(value)
+            return _INT
+        except ValueError:
+            pass
+        if value and _THOUSANDS.match(value) and _reads_separators():
+            return _FLOAT if '.' in value else _INT
+        try:
+            number = float(value)
+        except ValueError:
+            return _STR
+        if math.isinf(number) or math.isnan(number):
+            return _FLOAT if value.lower() in ('inf', '-inf', 'nan') else _STR
+        return _FLOAT
+    try:
+        float(value)
+        return _FLOAT
+    except (TypeError, ValueError):
+        return _STR
+
+
+def _format_cell(value: Any, kind: int) -> str:
+    """Format a cell for a column of the given kind.
+
+    :param value: a cell
+    :param kind: the kind of its column
+    :return: the text of the cell
+    """
+    if value is None:
+        return ''
+    if kind == _FLOAT:
+        if isinstance(value, str):
+            if not value:
+                return ''
+            value = value.replace(',', '')
+        return format(float(value), 'g')
+    return f"{value}"
+
+
+def _after_point(text: str) -> int:
+    """Count the digits after the decimal point of a formatted number, -1 if it has none.
+
+    :param text: a formatted number
+    :return: number of digits after the point
+    """
+    if _kind(text) != _FLOAT:
+        return -1
+    pos = text.rfind('.')
+    pos = text.lower().rfind('e') if pos < 0 else pos
+    return len(text) - pos - 1 if pos >= 0 else -1
+
+
+def _text_column(header: str, cells: Sequence[Any], kind: int) -> List[str]:
+    """Format and pad one column, the header first.
+
+    :param header: the column header
+    :param cells: the cells of the column
+    :param kind: the kind of the column
+    :return: the header and the cells, all of the same width
+    """
+    texts = [_format_cell(value, kind) for value in cells]
+    numeric = kind in (_INT, _FLOAT)
+    if kind == _FLOAT:
+        # align the decimal points, then right align
+        points = [_after_point(text) for text in texts]
+        max_points = max(points, default=-1)
+        texts = [text + ' ' * (max_points - point) for text, point in zip(texts, points)]
+    width = max([len(header) + 2] + [len(text) for text in texts])
+    if numeric:
+        return [header.rjust(width)] + [text.rjust(width) for text in texts]
+    return [header.ljust(width)] + [text.ljust(width) for text in texts]
+
+
+def _render_text(columns: List[List[str]], numeric: List[bool], table_fmt: str) -> str:
+    """Join padded columns into a psql or pipe table.
+
+    :param columns: the padded columns, headers first
+    :param numeric: whether each column is right aligned
+    :param table_fmt: 'psql' or 'pipe'
+    :return: the table
+    """
+    widths = [len(column[0]) + 2 for column in columns]
+    rows = ['| ' + ' | '.join(row) + ' |' for row in zip(*columns)]
+    if table_fmt == 'pipe':
+        separator = '|' + '|'.join('-' * (width - 1) + ':' if right else ':' + '-' * (width - 1)
+                                   for width, right in zip(widths, numeric)) + '|'
+        return '\n'.join([rows[0], separator] + rows[1:])
+    border = '+' + '+'.join('-' * width for width in widths) + '+'
+    separator = '|' + '+'.join('-' * width for width in widths) + '|'
+    return '\n'.join([border, rows[0], separator] + rows[1:] + [border])
+
+
+def _html_cell(value: Any) -> str:
+    """Format a cell like ``DataFrame.to_html`` does for object columns.
+
+    :param value: a cell
+    :return: the escaped text of the cell
+    """
+    if isinstance(value, Markup):
+        return value
+    if value is None:
+        text = 'None'
+    elif isinstance(value, float) and math.isnan(value):
+        text = 'NaN'
+    else:
+        text = str(value)
+    if any(char in text for char in _HTML_ESCAPES):
+        text = ''.join(_HTML_ESCAPES.get(char, char) for char in text)
+    return text
+
+
+def _render_html(values: np.ndarray, index: Sequence[Any], columns: Sequence[Any],
+                 index_name: Optional[str] = None, columns_name: Optional[str] = None) -> str:
+    """Render a table as ``DataFrame.to_html`` does.
+
+    :param values: the cells, one row per index value
+    :param index: the row labels
+    :param columns: the column labels
+    :param index_name: the name of the row labels
+    :param columns_name: the name of the column labels
+    :return: the table
+    """
+    def header_cell(value: Any) -> str:
+        return '' if value is None else _html_cell(value)
+
+    lines = ['<table border="1" class="dataframe">', '  <thead>', '    <tr style="text-align: right;">',
+             f'      <th>{header_cell(columns_name)}</th>']
+    lines.extend(f'      <th>{header_cell(column)}</th>' for column in columns)
+    lines.append('    </tr>')
+    if index_name is not None:
+        lines.extend(['    <tr>', f'      <th>{header_cell(index_name)}</th>'])
+        lines.extend('      <th></th>' for _ in columns)
+        lines.append('    </tr>')
+    lines.extend(['  </thead>', '  <tbody>'])
+    for label, row in zip(index, values):
+        lines.extend(['    <tr>', f'      <th>{_html_cell(label)}</th>'])
+        lines.extend(f'      <td>{_html_cell(value)}</td>' for value in row)
+        lines.append('    </tr>')
+    lines.extend(['  </tbody>', '</table>'])
+    return '\n'.join(lines)
+
+
+def render_table(values: np.ndarray, index: Sequence[Any], columns: Sequence[Any], table_fmt: str = 'psql',
+                 index_name: Optional[str] = None, columns_name: Optional[str] = None) -> str:
+    """Render a matrix of already formatted cells with its row and column labels.
+
+    :param values: a 2-d object array of cells, one row per index value
+    :param index: the row labels
+    :param columns: the column labels
+    :param table_fmt: one of TABLE_FORMATS
+    :param index_name: the name of the row labels, shown as the header of the index column
+    :param columns_name: the name of the column labels, only shown in html
+    :return: the table
+    """
+    if table_fmt not in TABLE_FORMATS:
+        raise ValueError(f"table_fmt must be one of {TABLE_FORMATS}, got {table_fmt!r}")
+    if table_fmt == 'html':
+        return _render_html(values, index, columns, index_name, columns_name)
+
+    cells = [list(index)] + [values[:, j].tolist() for j in range(values.shape[1])]
+    headers = ['' if index_name is None else str(index_name)] + [str(column) for column in columns]
+    kinds = [max(map(_kind, column), default=_NONE) for column in cells]
+    # tabulate never infers a column narrower than bool
+    kinds = [max(kind, _BOOL) for kind in kinds]
+    padded = [_text_column(header, column, kind) for header, column, kind in zip(headers, cells, kinds)]
+    return _render_text(padded, [kind in (_INT, _FLOAT) for kind in kinds], table_fmt)
+
+
+def is_renderable(df: pd.DataFrame, table_fmt: str) -> bool:
+    """Tell whether :func:`render_frame` reproduces tabulate or ``to_html`` for a DataFrame.
+
+    Float columns are printed by pandas with its own precision in html, so those go through ``to_html``.
+
+    :param df: the table
+    :param table_fmt: the string format of the table
+    :return: True if the built-in renderer can render it
+    """
+    if table_fmt not in TABLE_FORMATS or df.empty or df.columns.nlevels > 1 or df.index.nlevels > 1:
+        return False
+    return table_fmt != 'html' or all(dtype == object or pd.api.types.is_integer_dtype(dtype)
+                                      for dtype in df.dtypes)
+
+
+def render_frame(df: pd.DataFrame, table_fmt: str = 'psql') -> str:
+    """Render a DataFrame, like ``tabulate(df, headers='keys')`` or ``df.to_html()``.
+
+    :param df: the table
+    :param table_fmt: one of TABLE_FORMATS
+    :return: the table
+    """
+    return render_table(df.to_numpy(dtype=object), df.index, df.columns, table_fmt,
+                        df.index.name, df.columns.name)
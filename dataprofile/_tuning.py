@@ -0,0 +1,292 @@
+"""Pick the worker count, batch size and sample size of a profiling run from a cost model of its columns.
+
+The model prices each column by its size in MB and the throughput of its kind of dtype, and a pool by the startup
+of its workers and the time to send them the columns. Its coefficients come from
+``scripts/calibrate_cost_model.py``, and every planned run is recorded next to them, so they can be fitted again on
+real runs.
+"""
+
+import json
+import math
+import multiprocessing
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from ._config import COST_COLUMN_SECONDS, COST_MODEL_FILE, COST_RUNS_FILE, COST_SECONDS_PER_MB, \
+    COST_TRANSFER_MB_PER_SECOND, COST_WORKER_STARTUP_SECONDS, TUNING_MIN_SAMPLE_ROWS
+
+KINDS = ('numeric', 'boolean', 'datetime', 'object')
+# values of an object column whose deep size is extrapolated to the whole column
+_SIZE_SAMPLE_VALUES = 1000
+# tasks per worker, enough to even out columns of unequal cost
+_TASKS_PER_WORKER = 4
+
+
+def column_kind(series: pd.Series) -> str:
+    """Classify the dtype of a column by how fast it profiles.
+
+    :param series: the column
+    :return: one of KINDS
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return 'boolean'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    return 'object'
+
+
+def column_mb(series: pd.Series) -> float:
+    """Estimate the size of a column in memory, strings included, from a sample of its values.
+
+    :param series: the column
+    :return: the size in MB
+    """
+    if series.dtype != object or len(series) <= _SIZE_SAMPLE_VALUES:
+        return series.memory_usage(deep=True, index=False) / 10 ** 6
+    step = len(series) // _SIZE_SAMPLE_VALUES
+    sample = series.iloc[::step]
+    return sample.memory_usage(deep=True, index=False) / len(sample) * len(series) / 10 ** 6
+
+
+class Workload(NamedTuple):
+    """The size of each column of a frame, the input of the cost model."""
+
+    n_row: int
+    kinds: List[str]
+    mbs: List[float]
+
+    @classmethod
+    def of(cls, df: pd.DataFrame) -> 'Workload':
+        """Measure the columns of a frame.
+
+        :param df: the frame to profile
+        :return: the workload
+        """
+        return cls(len(df), [column_kind(series) for _, series in df.items()],
+                   [column_mb(series) for _, series in df.items()])
+
+    def mb_by_kind(self) -> Dict[str, float]:
+        """Add up the MB of the columns of each kind."""
+        totals = dict.fromkeys(KINDS, 0.)
+        for kind, mb in zip(self.kinds, self.mbs):
+            totals[kind] += mb
+        return totals
+
+
+class Plan(NamedTuple):
+    """How to run a profile: the backend, the workers, the columns per task, the rows and the expected time."""
+
+    backend: str
+    num_works: int
+    batch_size: int
+    sample_rows: Optional[int]
+    seconds: float
+
+
+class CostModel:
+    """Predict the time to profile the variables of a frame with a number of workers."""
+
+    def __init__(self, seconds_per_mb: Optional[Dict[str, float]] = None,
+                 column_seconds: float = COST_COLUMN_SECONDS,
+                 worker_startup_seconds: float = COST_WORKER_STARTUP_SECONDS,
+                 transfer_mb_per_second: float = COST_TRANSFER_MB_PER_SECOND) -> None:
+        """Initialize the coefficients.
+
+        :param seconds_per_mb: seconds to profile one MB of a column, for each of KINDS
+        :param column_seconds: fixed seconds to profile any column
+        :param worker_startup_seconds: seconds to start each worker of a pool
+        :param transfer_mb_per_second: throughput of sending columns to the workers
+        """
+        self.seconds_per_mb = {**COST_SECONDS_PER_MB, **(seconds_per_mb or {})}
+        self.column_seconds = column_seconds
+        self.worker_startup_seconds = worker_startup_seconds
+        self.transfer_mb_per_second = transfer_mb_per_second
+
+    def __repr__(self) -> str:
+        """Show the coefficients of the model."""
+        return f"CostModel({self.to_dict()})"
+
+    def to_dict(self) -> Dict[str, Union[float, Dict[str, float]]]:
+        """Return the coefficients, as saved to a file."""
+        return {'seconds_per_mb': self.seconds_per_mb, 'column_seconds': self.column_seconds,
+                'worker_startup_seconds': self.worker_startup_seconds,
+                'transfer_mb_per_second': self.transfer_mb_per_second}
+
+    def save(self, path: Union[str, Path] = COST_MODEL_FILE) -> None:
+        """Save the coefficients as JSON.
+
+        :param path: the file
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = COST_MODEL_FILE) -> 'CostModel':
+        """Load calibrated coefficients, or the defaults if there are none.
+
+        :param path: the file written by :meth:`save`
+        :return: the model
+        """
+        if not Path(path).exists():
+            return cls()
+        coefficients = json.loads(Path(path).read_text())
+        known = {key: value for key, value in coefficients.items() if key in cls().to_dict()}
+        if len(known) < len(coefficients):
+            logger.warning(f"{path} has unknown coefficients {sorted(set(coefficients) - set(known))}, calibrate again")
+        return cls(**known)
+
+    def column_costs(self, workload: Workload) -> np.ndarray:
+        """Predict the seconds to profile each column on its own.
+
+        :param workload: the columns
+        :return: the seconds of each column
+        """
+        return np.array([self.column_seconds + self.seconds_per_mb[kind] * mb
+                         for kind, mb in zip(workload.kinds, workload.mbs)])
+
+    def estimate(self, workload: Workload, num_works: int) -> float:
+        """Predict the seconds to profile every column with a number of workers.
+
+        A pool runs in about the time of its largest share of the work, and adds the startup of its workers and
+        the time to send them the columns.
+
+        :param workload: the columns
+        :param num_works: number of workers, 1 for no pool
+        :return: the seconds
+        """
+        costs = self.column_costs(workload)
+        if num_works == 1 or len(costs) < 2:
+            return float(costs.sum())
+        num_works = min(num_works, len(costs))
+        return float(self.worker_startup_seconds * num_works + sum(workload.mbs) / self.transfer_mb_per_second
+                     + max(costs.sum() / num_works, costs.max()))
+
+    def plan(self, workload: Workload, max_works: Optional[int] = None,
+             target_seconds: Optional[float] = None) -> Plan:
+        """Choose the fastest number of workers, and the rows to sample to meet a target time.
+
+        Among worker counts within 5% of the fastest, the fewest is taken.
+
+        :param workload: the columns
+        :param max_works: max number of workers, all cpu cores if None
+        :param target_seconds: time to profile the variables in, None to profile every row
+        :return: the plan
+        """
+        max_works = max_works or multiprocessing.cpu_count()
+        estimates = [self.estimate(workload, n) for n in range(1, min(max_works, max(len(workload.kinds), 1)) + 1)]
+        num_works = next(n for n, seconds in enumerate(estimates, 1) if seconds <= min(estimates) * 1.05)
+        seconds = estimates[num_works - 1]
+        batch_size = 1 if num_works == 1 else math.ceil(len(workload.kinds) / (num_works * _TASKS_PER_WORKER))
+        sample_rows = None
+        if target_seconds is not None and seconds > target_seconds and workload.n_row > TUNING_MIN_SAMPLE_ROWS:
+            # the work per column scales with the rows, the fixed costs don't
+            fixed = self.estimate(workload._replace(mbs=[0.] * len(workload.mbs)), num_works)
+            share = max(target_seconds - fixed, 0.) / max(seconds - fixed, 1e-9)
+            sample_rows = max(TUNING_MIN_SAMPLE_ROWS, int(workload.n_row * share))
+            seconds = fixed + (seconds - fixed) * sample_rows / workload.n_row
+        return Plan('serial' if num_works == 1 else 'pool', num_works, batch_size, sample_rows, seconds)
+
+    def refit(self, runs: List[Dict]) -> 'CostModel':
+        """Fit the seconds per MB of each kind and per column again on recorded runs.
+
+        Each run's time, less the worker startup and transfer the model predicts for it, is shared evenly by its
+        workers; the coefficients are the non-negative least squares fit of those times.
+
+        :param runs: records from :func:`record_run`
+        :return: a model with the fitted coefficients, the current one if there are too few runs
+        """
+        features, times = [], []
+        for run in runs:
+            mb = run['mb_by_kind']
+            works = min(run['num_works'], run['n_col']) if run['num_works'] > 1 else 1
+            overhead = 0. if works == 1 \
+                else self.worker_startup_seconds * works + sum(mb.values()) / self.transfer_mb_per_second
+            features.append([mb.get(kind, 0.) / works for kind in KINDS] + [run['n_col'] / works])
+            times.append(max(run['seconds'] - overhead, 0.))
+        if len(runs) <= len(KINDS):
+            return self
+        features, times = np.array(features), np.array(times)
+        used = features.any(axis=0)
+        coefficients = np.zeros(features.shape[1])
+        coefficients[used] = _nnls(features[:, used], times)
+        seconds_per_mb = {kind: coefficients[i] if used[i] else self.seconds_per_mb[kind]
+                          for i, kind in enumerate(KINDS)}
+        return CostModel(seconds_per_mb, coefficients[-1] if used[-1] else self.column_seconds,
+                         self.worker_startup_seconds, self.transfer_mb_per_second)
+
+
+def _nnls(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Least squares with non-negative coefficients, dropping the negative ones and fitting the rest again.
+
+    :param x: the features, one row per observation
+    :param y: the observations
+    :return: the coefficients
+    """
+    active = np.ones(x.shape[1], dtype=bool)
+    coefficients = np.zeros(x.shape[1])
+    while active.any():
+        coefficients[:] = 0.
+        coefficients[active] = np.linalg.lstsq(x[:, active], y, rcond=None)[0]
+        if (coefficients >= 0).all():
+            break
+        active &= coefficients > 0
+    return np.clip(coefficients, 0., None)
+
+
+def record_run(workload: Workload, plan: Plan, seconds: float, runs_file: Union[str, Path] = COST_RUNS_FILE) -> None:
+    """Log a planned run next to its actual time, and append it to the runs of a calibrated model.
+
+    Runs are only written once the model was calibrated, i.e. the directory of the runs file exists.
+
+    :param workload: the columns that were profiled
+    :param plan: the plan the run followed
+    :param seconds: the actual time
+    :param runs_file: JSON Lines file of the recorded runs
+    """
+    logger.info(f"Profiled variables in {seconds:.2f} sec, the cost model expected {plan.seconds:.2f} sec")
+    if not Path(runs_file).parent.is_dir():
+        return
+    run = {'time': time.time(), 'n_row': workload.n_row, 'n_col': len(workload.kinds),
+           'mb_by_kind': workload.mb_by_kind(), 'backend': plan.backend, 'num_works': plan.num_works,
+           'batch_size': plan.batch_size, 'expected_seconds': plan.seconds, 'seconds': seconds}
+    with open(runs_file, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def load_runs(runs_file: Union[str, Path] = COST_RUNS_FILE) -> List[Dict]:
+    """Read the recorded runs.
+
+    :param runs_file: JSON Lines file of the recorded runs
+    :return: the runs, empty if none were recorded
+    """
+    if not Path(runs_file).exists():
+        return []
+    with open(runs_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def plan_profile(df: pd.DataFrame, max_works: Optional[int] = None, target_seconds: Optional[float] = None,
+                 model: Optional[CostModel] = None) -> Tuple[Plan, Workload]:
+    """Plan the profile of a frame with the calibrated cost model, and log the decision.
+
+    :param df: the frame to profile
+    :param max_works: max number of workers, all cpu cores if None
+    :param target_seconds: time to profile the variables in, None to profile every row
+    :param model: the cost model, the calibrated one if None
+    :return: the plan, and the workload to record the run with
+    """
+    model = model or CostModel.load()
+    workload = Workload.of(df)
+    plan = model.plan(workload, max_works, target_seconds)
+    sampled = f", sampling {plan.sample_rows:,d} of {workload.n_row:,d} rows" if plan.sample_rows else ''
+    logger.info(f"Planned a {plan.backend} run of {len(workload.kinds)} variables ({sum(workload.mbs):.1f}MB) with "
+                f"{plan.num_works} workers and {plan.batch_size} variables per task{sampled}, "
+                f"expecting {plan.seconds:.2f} sec")
+    return plan, workload
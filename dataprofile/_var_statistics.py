@@ -1,109 +1,571 @@
 """Compute summary statistics for various data types."""
 
+import calendar
+from typing import Any, NamedTuple, Optional, Dict, List, Union, FrozenSet
+
 import numpy as np
 import pandas as pd
 
+from ._config import HISTOGRAM_BINS, QUANTILE_HISTOGRAM_BINS, TEXT_BLOCK_CHARS, TEXT_PATTERN_CHARS, \
+    TEXT_PATTERN_CAPACITY
+
+NAT = np.iinfo(np.int64).min
+NS_PER_HOUR = 3600 * 10 ** 9
+NS_PER_DAY = 24 * NS_PER_HOUR
+PERCENTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+# text lengths are counted exactly up to 1024 characters, then in bins doubling in width
+LENGTH_EDGES = np.concatenate([np.arange(1024), 1024 * 2 ** np.arange(40)])
+_SPACES = np.array([9, 10, 11, 12, 13, 32, 0x85, 0xA0, 0x1680, *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F,
+                    0x205F, 0x3000], dtype=np.uint32)
+
+
+class Factorized(NamedTuple):
+    """A categorical variable encoded once as integer codes into its observed distinct values."""
+
+    codes: np.ndarray
+    uniques: pd.Index
+    counts: np.ndarray
+
+
+def factorize(series: pd.Series) -> Factorized:
+    """Hash a variable once into codes (-1 for missing), its distinct values and their frequencies.
+
+    :param series: The variable to encode
+    :return: the encoded variable
+    """
+    # category columns are factorized on their integer codes, which also drops categories that don't occur
+    codes, uniques = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    return Factorized(codes, uniques, counts)
+
+
+def _top_k(factorized: Factorized, k: int) -> pd.Series:
+    """Return the k most frequent values, like ``value_counts().head(k)`` but from the codes.
+
+    Ties go to the value that appears first, so the result doesn't depend on how the column is stored.
+
+    :param factorized: The encoded variable
+    :param k: number of values to return
+    :return: frequencies indexed by value
+    """
+    counts = factorized.counts
+    top = np.arange(len(counts))
+    if len(counts) > k:
+        top = np.flatnonzero(counts >= np.partition(counts, len(counts) - k)[len(counts) - k])
+    top = top[np.argsort(-counts[top], kind='stable')][:k]
+    return pd.Series(counts[top], index=factorized.uniques[top])
+
+
+class ColumnCounts(NamedTuple):
+    """Exact counts of a variable over a whole dataset, computed outside of memory.
+
+    aggregates optionally holds the exact 'min', 'max', 'sum', 'mean', 'std', 'variance' and 'n_zeros' of a
+    numerical variable, e.g. computed by a database.
+    """
+
+    count: int
+    n_missing: int
+    n_unique: int
+    top: pd.Series
+    aggregates: Optional[Dict[str, Any]] = None
+
+
+def counts_factorized(counts: ColumnCounts) -> Factorized:
+    """Encode the most frequent values of exact counts, so the frequency statistics can read them.
+
+    :param counts: exact counts of a variable
+    :return: the most frequent values and their frequencies, without codes
+    """
+    return Factorized(np.empty(0, dtype=np.intp), pd.Index(counts.top.index), counts.top.to_numpy())
+
+
+class Histogram(NamedTuple):
+    """Number of values between consecutive edges; the last bin also holds values equal to its right edge."""
+
+    edges: np.ndarray
+    counts: np.ndarray
+
+
+def merge_histograms(histograms: List[Histogram], bins: int = HISTOGRAM_BINS) -> Histogram:
+    """Merge histograms of several chunks, fixed-width or quantile-based, into one fixed-width histogram.
+
+    Histograms with the same edges are added up exactly; otherwise they are re-binned over the combined
+    range, spreading the count of each bin evenly over its width.
+
+    :param histograms: histograms of the same variable
+    :param bins: number of bins of the merged histogram when the edges differ
+    :return: the merged histogram
+    """
+    first = histograms[0]
+    if all(np.array_equal(histogram.edges, first.edges) for histogram in histograms):
+        return Histogram(first.edges, np.sum([histogram.counts for histogram in histograms], axis=0))
+    edges = np.linspace(min(histogram.edges[0] for histogram in histograms),
+                        max(histogram.edges[-1] for histogram in histograms), bins + 1)
+    counts = np.zeros(bins)
+    for histogram in histograms:
+        cumulative = np.concatenate([[0], np.cumsum(histogram.counts)])
+        # everything below the second edge lands in the first bin, everything above the last but one in the last
+        inner = np.interp(edges[1:-1], histogram.edges, cumulative)
+        counts += np.diff(np.concatenate([[0], inner, [cumulative[-1]]]))
+    return Histogram(edges, counts)
+
+
+class TextSummary(NamedTuple):
+    """Length, character class and pattern counts of text values, added up over chunks by :func:`merge_text`."""
+
+    n_values: int
+    n_empty: int
+    n_blank: int
+    n_chars: int
+    n_digit: int
+    n_alpha: int
+    n_space: int
+    min_length: int
+    max_length: int
+    length_counts: np.ndarray
+    patterns: Dict[str, int]
+
+
+def _top_patterns(patterns: Dict[str, int], capacity: int = TEXT_PATTERN_CAPACITY) -> Dict[str, int]:
+    """Keep the most frequent patterns, so the pattern counts stay bounded however many chunks are merged.
+
+    :param patterns: frequency of each pattern
+    :param capacity: number of patterns to keep
+    :return: the most frequent patterns, most frequent first
+    """
+    return dict(sorted(patterns.items(), key=lambda item: -item[1])[:capacity])
+
+
+def summarize_text(values: np.ndarray, weights: Optional[np.ndarray] = None) -> TextSummary:
+    """Summarize text values with NumPy kernels on their codepoints, in blocks of bounded memory.
+
+    Digits are ASCII digits, letters are ASCII letters and any character past U+00BF that isn't a space.
+    The pattern of a value maps its first characters, letters to 'A' and digits to '9', e.g. 'AAA-999'.
+
+    :param values: distinct strings of a variable
+    :param weights: frequency of each value, 1 if None
+    :return: the summary of the values
+    """
+    weights = np.ones(len(values), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    order = np.argsort(lengths, kind='stable')
+    n_digit = n_alpha = n_space = n_blank = 0
+    patterns: Dict[str, int] = {}
+    start = 0
+    while start < len(order):
+        # values sorted by length fill blocks of about TEXT_BLOCK_CHARS codepoints
+        stop = start + 1
+        while stop < len(order) and (stop - start + 1) * max(int(lengths[order[stop]]), 1) <= TEXT_BLOCK_CHARS:
+            stop += 1
+        block = order[start:stop]
+        width = max(int(lengths[block[-1]]), 1)
+        codes = np.asarray(values[block], dtype=f'<U{width}').view(np.uint32).reshape(len(block), width)
+        digit = (codes >= 48) & (codes <= 57)
+        # unsigned codes below 9 wrap around past 4
+        space = (codes == 32) | (codes - 9 <= 4)
+        if codes.max(initial=0) >= 0x85:
+            space |= np.isin(codes, _SPACES[6:])
+        alpha = ((codes | 32) >= 97) & ((codes | 32) <= 122) | (codes >= 0xC0) & ~space
+        block_weights = weights[block]
+        n_digit += int(digit.sum(axis=1) @ block_weights)
+        n_alpha += int(alpha.sum(axis=1) @ block_weights)
+        row_spaces = space.sum(axis=1)
+        n_space += int(row_spaces @ block_weights)
+        n_blank += int(block_weights[(row_spaces == lengths[block]) & (lengths[block] > 0)].sum())
+
+        head = codes[:, :TEXT_PATTERN_CHARS].copy()
+        head[digit[:, :TEXT_PATTERN_CHARS]] = ord('9')
+        head[alpha[:, :TEXT_PATTERN_CHARS]] = ord('A')
+        shapes = np.ascontiguousarray(head).view(f'<U{head.shape[1]}').ravel()
+        shapes = np.where(lengths[block] > TEXT_PATTERN_CHARS, np.char.add(shapes, '…'), shapes)
+        uniques, inverse = np.unique(shapes, return_inverse=True)
+        for shape, freq in zip(uniques.tolist(), np.bincount(inverse, weights=block_weights).tolist()):
+            patterns[shape] = patterns.get(shape, 0) + int(freq)
+        start = stop
+
+    length_bins = np.searchsorted(LENGTH_EDGES, lengths, 'right') - 1
+    return TextSummary(int(weights.sum()), int(weights[lengths == 0].sum()), n_blank, int(lengths @ weights),
+                       n_digit, n_alpha, n_space, int(lengths.min()) if len(lengths) else 0,
+                       int(lengths.max()) if len(lengths) else 0,
+                       np.bincount(length_bins, weights=weights, minlength=len(LENGTH_EDGES)).astype(np.int64),
+                       _top_patterns(patterns))
+
+
+def merge_text(summaries: List[TextSummary]) -> TextSummary:
+    """Add up the text summaries of several chunks of a variable.
 
-def base_stats(series: pd.Series) -> pd.Series:
+    Counts and lengths add up exactly; a pattern outside the kept top of a chunk is undercounted by at most
+    the count of the least frequent pattern kept there.
+
+    :param summaries: summaries of the same variable
+    :return: the merged summary
+    """
+    patterns: Dict[str, int] = {}
+    for summary in summaries:
+        for shape, freq in summary.patterns.items():
+            patterns[shape] = patterns.get(shape, 0) + freq
+    non_empty = [summary for summary in summaries if summary.n_values]
+    return TextSummary(*(sum(getattr(summary, field) for summary in summaries)
+                         for field in ['n_values', 'n_empty', 'n_blank', 'n_chars', 'n_digit', 'n_alpha', 'n_space']),
+                       min((summary.min_length for summary in non_empty), default=0),
+                       max((summary.max_length for summary in non_empty), default=0),
+                       np.sum([summary.length_counts for summary in summaries], axis=0),
+                       _top_patterns(patterns))
+
+
+def text_stats(summary: TextSummary) -> Dict[str, Any]:
+    """Compute the length, character class and pattern statistics of a text summary.
+
+    Length quantiles are exact up to 1024 characters and rounded down to a power of two above.
+
+    :param summary: the summary of a variable
+    :return: descriptive statistics
+    """
+    stats: Dict[str, Any] = {'len_min': summary.min_length}
+    cumulative = np.cumsum(summary.length_counts)
+    for percentile in [0.25, 0.5, 0.75]:
+        rank = np.searchsorted(cumulative, percentile * summary.n_values)
+        stats["len_{:.0%}".format(percentile)] = int(LENGTH_EDGES[min(rank, len(LENGTH_EDGES) - 1)]) \
+            if summary.n_values else np.NaN
+    stats['len_max'] = summary.max_length
+    stats['len_mean'] = summary.n_chars / summary.n_values if summary.n_values else np.NaN
+    # the counts of characters back the shares, which exports compute again as floats
+    stats['n_chars'] = summary.n_chars
+    for key in ['digit', 'alpha', 'space']:
+        stats[f'n_{key}'] = getattr(summary, f'n_{key}')
+        stats[f'p_{key}'] = f"{stats[f'n_{key}'] / summary.n_chars:.2%}" if summary.n_chars else 'N/A'
+    stats['n_empty'] = summary.n_empty
+    stats['n_blank'] = summary.n_blank
+    for i, (shape, freq) in enumerate(list(summary.patterns.items())[:3], 1):
+        stats[f'pattern{i}'] = shape
+        stats[f'pattern{i}_freq'] = freq
+    return stats
+
+
+def is_text(factorized: Factorized) -> bool:
+    """Check whether the distinct values of a variable are all strings.
+
+    :param factorized: The encoded variable
+    :return: whether text statistics apply
+    """
+    return len(factorized.uniques) > 0 and \
+        pd.api.types.infer_dtype(factorized.uniques.to_numpy(), skipna=True) == 'string'
+
+
+class ColumnContext:
+    """A variable and the intermediates its statistics share, each computed once on first use.
+
+    Numerical variables are sorted once: distinct values, quantiles, extremes and histograms all read the sorted
+    values. Any other variable is factorized once, see :func:`factorize`.
+    """
+
+    def __init__(self, series: pd.Series, factorized: Optional[Factorized] = None,
+                 count: Optional[int] = None, distinct_count: Optional[int] = None) -> None:
+        """Initialize the context, with the intermediates already known.
+
+        :param series: The variable
+        :param factorized: The variable already encoded by :func:`factorize`
+        :param count: number of values that aren't missing
+        :param distinct_count: number of distinct values
+        """
+        self.series = series
+        self.sortable = pd.api.types.is_numeric_dtype(series) and factorized is None
+        self._factorized = factorized
+        self._count = count
+        self._distinct_count = distinct_count
+        self._missing: Optional[np.ndarray] = None
+        self._sorted: Optional[np.ndarray] = None
+
+    @property
+    def factorized(self) -> Factorized:
+        """The variable encoded by :func:`factorize`; for sortable variables, without codes."""
+        if self._factorized is None:
+            if self.sortable:
+                values = self.sorted_values
+                starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]])) if len(values) \
+                    else np.empty(0, dtype=np.intp)
+                counts = np.diff(np.append(starts, len(values)))
+                self._factorized = Factorized(np.empty(0, dtype=np.intp), pd.Index(values[starts]), counts)
+            else:
+                self._factorized = factorize(self.series)
+        return self._factorized
+
+    @property
+    def missing(self) -> np.ndarray:
+        """Mask of the missing values."""
+        if self._missing is None:
+            self._missing = self.series.isna().to_numpy()
+        return self._missing
+
+    @property
+    def sorted_values(self) -> np.ndarray:
+        """The values that aren't missing, in ascending order."""
+        if self._sorted is None:
+            values = self.series.to_numpy()
+            if self.missing.any():
+                values = values[~self.missing]
+            if values.dtype == object:
+                # nullable integer and boolean columns
+                values = values.astype('float64')
+            self._sorted = np.sort(values)
+        return self._sorted
+
+    @property
+    def count(self) -> int:
+        """Number of values that aren't missing."""
+        if self._count is None:
+            self._count = len(self.sorted_values) if self.sortable else int(self.factorized.counts.sum())
+        return self._count
+
+    @property
+    def distinct_count(self) -> int:
+        """Number of distinct values."""
+        if self._distinct_count is None:
+            if self.sortable:
+                values = self.sorted_values
+                self._distinct_count = int(np.count_nonzero(values[1:] != values[:-1]) + 1) if len(values) else 0
+            else:
+                self._distinct_count = len(self.factorized.uniques)
+        return self._distinct_count
+
+
+def base_stats(series: pd.Series, factorized: Optional[Factorized] = None,
+               context: Optional[ColumnContext] = None) -> pd.Series:
     """Compute common summary statistics of a variable.
 
     :param series: The variable to describe
+    :param factorized: The variable already encoded by :func:`factorize`, if available
+    :param context: intermediates shared with the other statistics of the variable
     :return: descriptive statistics
     """
-    length = len(series)
-    count = series.count()
-    distinct_count = series.nunique()
+    context = context or ColumnContext(series, factorized)
+    return pd.Series(count_stats(len(series), context.count, context.distinct_count), name=series.name)
 
-    stats = {'count': length,
-             'n_missing': length - count,
-             'p_missing': f"{1 - count / length:.2%}",
-             'n_unique': distinct_count if distinct_count else 'N/A',
-             'p_unique': f"{distinct_count / count:.2%}" if distinct_count else 'N/A'}
 
-    return pd.Series(stats, name=series.name)
+def count_stats(length: int, count: int, distinct_count: int) -> Dict[str, Union[int, str]]:
+    """Format the common summary statistics from the counts of a variable.
+
+    :param length: number of values, missing included
+    :param count: number of values that aren't missing
+    :param distinct_count: number of distinct values
+    :return: descriptive statistics
+    """
+    return {'count': length,
+            'n_missing': length - count,
+            'p_missing': f"{1 - count / length:.2%}",
+            'n_unique': distinct_count if distinct_count else 'N/A',
+            'p_unique': f"{distinct_count / count:.2%}" if distinct_count else 'N/A'}
+
 
+def apply_exact_counts(stats: pd.Series, counts: ColumnCounts) -> pd.Series:
+    """Replace the counting statistics of a sample by the exact counts over the whole dataset.
 
-def numerical_stats(series: pd.Series) -> pd.Series:
+    :param stats: statistics of a sample of the variable
+    :param counts: exact counts of the variable
+    :return: the statistics with exact counts, missing values, most frequent values and aggregates
+    """
+    stats = stats.copy()
+    count = counts.count - counts.n_missing
+    for key, value in count_stats(counts.count, count, counts.n_unique).items():
+        stats[key] = value
+    if 'value1' in stats.index:
+        # binary shares are taken over all rows, missing included
+        top = counts.top.head(2)
+        top.index = top.index.astype(str)
+        if len(top) < 2:
+            top['nan'] = counts.n_missing
+        for i, (value, freq) in enumerate(top.items(), 1):
+            stats[f'value{i}'], stats[f'n_value{i}'] = value, freq
+            stats[f'p_value{i}'] = f"{freq / counts.count:.2%}"
+    if counts.aggregates and stats.get('type') == 'Interval':
+        for key, value in counts.aggregates.items():
+            if key in stats.index:
+                stats[key] = value
+        stats['range'] = stats['max'] - stats['min']
+        stats['p_zeros'] = stats['n_zeros'] / counts.count
+        if 'coff_of_var' in stats.index:
+            stats['coff_of_var'] = stats['std'] / stats['mean'] if stats['mean'] else np.NaN
+    return stats
+
+
+def numerical_stats(series: pd.Series, skip: FrozenSet[str] = frozenset(),
+                    context: Optional[ColumnContext] = None) -> pd.Series:
     """Compute summary statistics of a numerical variable.
 
     :param series: The variable to describe
+    :param skip: stat groups not to compute: 'moments', 'quantiles' or 'histogram'
+    :param context: intermediates shared with the other statistics of the variable
     :return: descriptive statistics
     """
-    stats = dict(base_stats(series))
+    context = context or ColumnContext(series)
+    stats = dict(base_stats(series, context=context))
     stats['data_type'] = 'Numerical'
-    stats['mean'] = series.mean()
-    stats['std'] = series.std()
-    stats['variance'] = series.var()
-    stats['min'] = series.min()
-    stats.update({"{:.0%}".format(percentile): series.dropna().quantile(percentile)
-                  for percentile in [0.05, 0.25, 0.5, 0.75, 0.95]})
-    stats['max'] = series.max()
+    if 'moments' not in skip:
+        stats['mean'] = series.mean()
+        stats['std'] = series.std()
+        stats['variance'] = series.var()
+    values = context.sorted_values
+    stats['min'] = values[0] if len(values) else np.NaN
+    deciles = np.linspace(0, 1, QUANTILE_HISTOGRAM_BINS + 1).round(10)
+    if 'quantiles' not in skip:
+        # the percentiles and the quantile histogram edges come from a single quantile call
+        levels = sorted(set(PERCENTILES) | (set() if 'histogram' in skip else set(deciles)))
+        quantiles = pd.Series(np.quantile(values, levels) if len(values) else np.full(len(levels), np.NaN),
+                              index=levels)
+        stats.update({"{:.0%}".format(percentile): quantiles[percentile] for percentile in PERCENTILES})
+    stats['max'] = values[-1] if len(values) else np.NaN
     stats['range'] = stats['max'] - stats['min']
-    stats['iqr'] = stats['75%'] - stats['25%']
-    stats['kurtosis'] = series.kurt()
-    stats['skewness'] = series.skew()
-    stats['sum'] = series.sum()
-    stats['mean_abs_dev'] = series.mad()
-    stats['coff_of_var'] = stats['std'] / stats['mean'] if stats['mean'] else np.NaN
-    stats['n_zeros'] = (stats['count'] - np.count_nonzero(series))
+    if 'quantiles' not in skip:
+        stats['iqr'] = stats['75%'] - stats['25%']
+    if 'moments' not in skip:
+        stats['kurtosis'] = series.kurt()
+        stats['skewness'] = series.skew()
+        stats['sum'] = series.sum()
+        stats['mean_abs_dev'] = np.abs(values - stats['mean']).mean() if len(values) else np.NaN
+        stats['coff_of_var'] = stats['std'] / stats['mean'] if stats['mean'] else np.NaN
+    stats['n_zeros'] = int(np.searchsorted(values, 0, 'right') - np.searchsorted(values, 0, 'left'))
     stats['p_zeros'] = stats['n_zeros'] / stats['count']
 
+    if 'histogram' not in skip:
+        # infinite values sit at both ends of the sorted values
+        finite = values.astype(float, copy=False)
+        finite = finite[np.searchsorted(finite, -np.inf, 'right'):np.searchsorted(finite, np.inf, 'left')]
+        counts, edges = np.histogram(finite, bins=HISTOGRAM_BINS)
+        stats['histogram'] = Histogram(edges, counts)
+        if 'quantiles' not in skip:
+            edges = quantiles[deciles].to_numpy(dtype=float)
+            if len(finite) < len(values):
+                edges = np.quantile(finite, deciles) if len(finite) else np.zeros(len(deciles))
+            stats['quantile_histogram'] = Histogram(edges, _sorted_histogram(finite, edges))
+
     return pd.Series(stats, name=series.name)
 
 
-def datetime_stats(series: pd.Series) -> pd.Series:
+def _sorted_histogram(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Count sorted values between edges, like ``np.histogram`` but without sorting them again.
+
+    :param values: values in ascending order
+    :param edges: bin edges in ascending order
+    :return: the count of each bin, the last bin holding values equal to its right edge
+    """
+    bounds = np.append(np.searchsorted(values, edges[:-1], 'left'), np.searchsorted(values, edges[-1], 'right'))
+    return np.diff(bounds)
+
+
+def _calendar_counts(days: np.ndarray, minlength: int, names: List[str]) -> Dict[str, int]:
+    """Count integer calendar fields in a single bincount pass.
+
+    :param days: calendar field of each value, from 0 to minlength - 1
+    :param minlength: number of possible field values
+    :param names: the name of each field value
+    :return: frequency of each field value
+    """
+    return dict(zip(names, np.bincount(days, minlength=minlength).tolist()))
+
+
+def datetime_stats(series: pd.Series, skip: FrozenSet[str] = frozenset(),
+                   context: Optional[ColumnContext] = None) -> pd.Series:
     """Compute summary statistics of a date variable.
 
+    Everything is computed on the int64 nanosecond view of the dates; weekday, month, year and, for values
+    with a time of day, hour histograms are plain counts, so histograms of several chunks add up.
+
     :param series: The variable to describe
+    :param skip: stat groups not to compute: 'quantiles'
+    :param context: intermediates shared with the other statistics of the variable
     :return: descriptive statistics
     """
-    stats = dict(base_stats(series))
+    stats = dict(base_stats(series, context=context))
     stats['data_type'] = 'Datetime'
-    stats['min'] = series.min()
-    stats.update({"{:.0%}".format(percentile): series.dropna().quantile(percentile)
-                  for percentile in [0.05, 0.25, 0.5, 0.75, 0.95]})
-    stats['max'] = series.max()
+    tz = series.dt.tz
+    epoch_ns = (series if tz is None else series.dt.tz_convert(None)).to_numpy(dtype='datetime64[ns]').view('i8')
+    epoch_ns = epoch_ns[epoch_ns != NAT]
+    # calendar fields follow the wall clock, which differs from UTC for tz-aware dates
+    wall_ns = epoch_ns if tz is None else \
+        series.dt.tz_localize(None).dropna().to_numpy(dtype='datetime64[ns]').view('i8')
+
+    def to_timestamp(value: int) -> pd.Timestamp:
+        return pd.Timestamp(value) if tz is None else pd.Timestamp(value, tz='UTC').tz_convert(tz)
+
+    stats['min'] = to_timestamp(epoch_ns.min()) if len(epoch_ns) else pd.NaT
+    percentiles = [0.05, 0.25, 0.5, 0.75, 0.95]
+    quantiles = np.percentile(epoch_ns, np.array(percentiles) * 100).astype('i8') \
+        if len(epoch_ns) and 'quantiles' not in skip else []
+    stats.update({"{:.0%}".format(percentile): to_timestamp(quantile)
+                  for percentile, quantile in zip(percentiles, quantiles)})
+    stats['max'] = to_timestamp(epoch_ns.max()) if len(epoch_ns) else pd.NaT
     stats['range'] = stats['max'] - stats['min']
-    day_of_week = series.dt.dayofweek
-    wd_map = {0: 'n_Monday', 1: 'n_Tuesday', 2: 'n_Wednesday', 3: 'n_Thursday', 4: 'n_Friday', 5: 'n_Saturday',
-              6: 'n_Sunday'}
-    stats.update({v: 0 for k, v in wd_map.items()})
-    day_of_week_sum = day_of_week.value_counts().rename(wd_map)
-    stats.update(day_of_week_sum)
+
+    days, time_of_day = np.divmod(wall_ns, NS_PER_DAY)
+    # 1970-01-01 was a Thursday
+    stats.update(_calendar_counts((days + 3) % 7, 7, [f'n_{day}' for day in calendar.day_name]))
+    months = wall_ns.astype('datetime64[ns]').astype('datetime64[M]').view('i8')
+    years, months = np.divmod(months, 12)
+    stats.update(_calendar_counts(months, 12, [f'n_{month}' for month in calendar.month_name[1:]]))
+    # only the years with dates: they may span centuries
+    observed, n_dates = np.unique(years, return_counts=True)
+    stats.update({f'n_{1970 + year}': n for year, n in zip(observed.tolist(), n_dates.tolist())})
+    if time_of_day.any():
+        stats.update(_calendar_counts(time_of_day // NS_PER_HOUR, 24, [f'n_{hour:02d}h' for hour in range(24)]))
 
     return pd.Series(stats, name=series.name)
 
 
-def categorical_stats(series: pd.Series) -> pd.Series:
+def categorical_stats(series: pd.Series, factorized: Optional[Factorized] = None,
+                      skip: FrozenSet[str] = frozenset(), context: Optional[ColumnContext] = None) -> pd.Series:
     """Compute summary statistics of a categorical variable.
 
     :param series: The variable to describe
+    :param factorized: The most frequent values, if not those of the context
+    :param skip: stat groups not to compute: 'top_k' or 'text'
+    :param context: intermediates shared with the other statistics of the variable
     :return: descriptive statistics
     """
-    stats = dict(base_stats(series))
-    aggr = series.value_counts()
+    context = context or ColumnContext(series, factorized)
+    stats = dict(base_stats(series, context=context))
     stats['data_type'] = 'Categorical'
-    stats['mode'] = aggr.index[0]
-    stats['mode_freq'] = aggr[0]
-    stats['2nd_freq_value'] = aggr.index[1]
-    stats['2nd_freq'] = aggr[1]
-    if len(aggr) > 2:
-        stats['3rd_freq_value'] = aggr.index[2]
-        stats['3rd_freq'] = aggr[2]
+    if 'top_k' not in skip:
+        aggr = _top_k(factorized if factorized is not None else context.factorized, 3)
+        stats['mode'] = aggr.index[0]
+        stats['mode_freq'] = aggr.iloc[0]
+        stats['2nd_freq_value'] = aggr.index[1]
+        stats['2nd_freq'] = aggr.iloc[1]
+        if len(aggr) > 2:
+            stats['3rd_freq_value'] = aggr.index[2]
+            stats['3rd_freq'] = aggr.iloc[2]
+    if 'text' not in skip and is_text(context.factorized):
+        stats.update(text_stats(summarize_text(context.factorized.uniques.to_numpy(), context.factorized.counts)))
 
     return pd.Series(stats, name=series.name)
 
 
-def binary_stats(series: pd.Series) -> pd.Series:
+def binary_stats(series: pd.Series, factorized: Optional[Factorized] = None,
+                 skip: FrozenSet[str] = frozenset(), context: Optional[ColumnContext] = None) -> pd.Series:
     """Compute summary statistics of a boolean variable.
 
+    Ties go to the value that appears first, or to the smaller value of a numerical variable.
+
     :param series: The variable to describe
+    :param factorized: The most frequent values, if not those of the context
+    :param skip: stat groups not to compute: 'top_k'
+    :param context: intermediates shared with the other statistics of the variable
     :return: descriptive statistics
     """
-    stats = dict(base_stats(series))
-    aggr = series.astype(str).value_counts()
-    if len(aggr) > 2 and 'nan' in aggr.index:
-        aggr.drop('nan', inplace=True)
+    context = context or ColumnContext(series, factorized)
+    stats = dict(base_stats(series, context=context))
+    if 'top_k' in skip:
+        stats['data_type'] = 'Binary'
+        return pd.Series(stats, name=series.name)
+    aggr = _top_k(factorized if factorized is not None else context.factorized, 2)
+    aggr.index = aggr.index.astype(str)
+    if len(aggr) < 2:
+        # a single value plus missing cells reports the missing cells as a value, labelled as str() shows them;
+        # with exact counts, the sample may hold none of them
+        missing = series[series.isna()]
+        label = str(missing.iloc[0]) if len(missing) else \
+            'NaT' if pd.api.types.is_datetime64_any_dtype(series) else 'nan'
+        aggr[label] = stats['n_missing']
+        aggr = aggr.sort_values(ascending=False, kind='stable')
 
     stats['data_type'] = 'Binary'
     stats['value1'] = aggr.index[0]
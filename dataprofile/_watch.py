@@ -0,0 +1,313 @@
+"""Watch a landing directory and profile the CSV files that are new or changed since the last scan.
+
+Scans only list the directory and compare the size and modification time of each file with a local index, so
+they work on any file system and take seconds for tens of thousands of files. Each profiled file keeps the
+mergeable state of its columns: rows appended to a file are the only ones parsed again, and their state is
+merged into the cached one.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+from loguru import logger
+
+from ._compression import compression_of, is_csv, strip_compression
+from ._config import EXTERNAL_SAMPLE_ROWS, LOAD_CHUNK_BYTES, WATCH_FINGERPRINT_BYTES, WATCH_SETTLE_SECONDS
+from ._external import count_exact
+from ._loading import _byte_ranges, _parse_range
+from ._partitioned import PartitionState, finalize_counts, merge_states, summarize_partition, tree_reduce
+
+# directory of the index and the cached states, inside the watched directory
+STATE_DIR = '.dataprofile'
+CHANGES = ('new', 'appended', 'rewritten', 'unchanged')
+
+
+class FileState(NamedTuple):
+    """What the index remembers of a file: its last seen size and time, and the rows already profiled."""
+
+    seen_size: int
+    mtime_ns: int
+    size: int
+    fingerprint: str
+    n_parts: int
+    state_file: str
+
+
+def scan(target_dir: Union[str, Path], file_suffix: str = '.csv') -> Dict[str, Tuple[int, int]]:
+    """List the CSV files of a directory and its sub directories, plain or compressed.
+
+    :param target_dir: the watched directory
+    :param file_suffix: suffix of the plain files
+    :return: the size and modification time in ns of each file
+    """
+    files = {}
+    dirs = [str(target_dir)]
+    while dirs:
+        with os.scandir(dirs.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != STATE_DIR:
+                        dirs.append(entry.path)
+                elif is_csv(entry.name, file_suffix):
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def load_index(target_dir: Union[str, Path]) -> Dict[str, FileState]:
+    """Read the index of a watched directory.
+
+    :param target_dir: the watched directory
+    :return: the state of each file, empty on the first scan
+    """
+    path = Path(target_dir, STATE_DIR, 'index.json')
+    if not path.exists():
+        return {}
+    return {file: FileState(**state) for file, state in json.loads(path.read_text()).items()}
+
+
+def save_index(target_dir: Union[str, Path], index: Dict[str, FileState]) -> None:
+    """Write the index of a watched directory, replacing the previous one at once.
+
+    :param target_dir: the watched directory
+    :param index: the state of each file
+    """
+    path = Path(target_dir, STATE_DIR, 'index.json')
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps({file: state._asdict() for file, state in index.items()}))
+    os.replace(tmp, path)
+
+
+def _fingerprint(file: Union[str, Path], size: int) -> str:
+    """Hash the first and the last bytes of the first size bytes of a file, to tell an append from a rewrite.
+
+    :param file: the file
+    :param size: number of bytes to fingerprint
+    :return: the hex digest
+    """
+    digest = hashlib.sha1(str(size).encode())
+    with open(file, 'rb') as f:
+        digest.update(f.read(min(size, WATCH_FINGERPRINT_BYTES)))
+        f.seek(max(size - WATCH_FINGERPRINT_BYTES, 0))
+        digest.update(f.read(min(size, WATCH_FINGERPRINT_BYTES)))
+    return digest.hexdigest()
+
+
+def _settled(mtime_ns: int) -> bool:
+    """Tell whether a file hasn't changed for WATCH_SETTLE_SECONDS, so its writer is done with it.
+
+    :param mtime_ns: modification time of the file
+    :return: True if the file settled
+    """
+    return time.time() - mtime_ns / 1e9 > WATCH_SETTLE_SECONDS
+
+
+def _complete_end(file: Union[str, Path], size: int, mtime_ns: int) -> int:
+    """Find the end of the last complete line of a file that may still be written to.
+
+    A last line without a line break counts once the file hasn't changed for WATCH_SETTLE_SECONDS.
+
+    :param file: the file
+    :param size: size of the file
+    :param mtime_ns: modification time of the file
+    :return: the offset past the last complete line
+    """
+    if _settled(mtime_ns):
+        return size
+    with open(file, 'rb') as f:
+        end = size
+        while end > 0:
+            start = max(end - WATCH_FINGERPRINT_BYTES, 0)
+            f.seek(start)
+            block = f.read(end - start)
+            if b'\n' in block:
+                return start + block.rindex(b'\n') + 1
+            end = start
+    return 0
+
+
+def classify(file: str, size: int, mtime_ns: int, state: Optional[FileState]) -> str:
+    """Tell how a file changed since it was last profiled.
+
+    A file that grew is 'appended' if its profiled bytes are intact and ended with a line break; compressed
+    files are always profiled again in full. A file whose last line had no line break when it was seen is
+    pending until it settles, then its last line is profiled even if the file didn't change since.
+
+    :param file: the file
+    :param size: size of the file
+    :param mtime_ns: modification time of the file
+    :param state: what the index remembers of the file, None if it's new
+    :return: one of CHANGES
+    """
+    if state is None:
+        return 'new'
+    if size == state.seen_size and mtime_ns == state.mtime_ns and (state.size == size or not _settled(mtime_ns)):
+        return 'unchanged'
+    if compression_of(file) or not state.state_file or size < state.size:
+        return 'rewritten'
+    if _fingerprint(file, state.size) != state.fingerprint:
+        return 'rewritten'
+    with open(file, 'rb') as f:
+        f.seek(max(state.size - 1, 0))
+        ends_line = f.read(1) in (b'\n', b'')
+    return 'appended' if ends_line else 'rewritten'
+
+
+def _summarize_range(file: Path, start: int, end: int, encoding: str, first_part: int,
+                     sample_rows: int) -> Tuple[PartitionState, int]:
+    """Summarize the lines in a byte range of a CSV file, one chunk of LOAD_CHUNK_BYTES at a time.
+
+    :param file: the CSV file
+    :param start: offset of the first line, 0 for the header
+    :param end: offset past the last line
+    :param encoding: encoding of the CSV file
+    :param first_part: index of the first chunk, to seed its sample apart from the chunks summarized before
+    :param sample_rows: number of rows to sample
+    :return: the state of the range, and its number of chunks
+    """
+    names = list(pd.read_csv(file, encoding=encoding, nrows=0).columns)
+    ranges = _byte_ranges(file, -(-(end - start) // LOAD_CHUNK_BYTES), start, end)
+
+    def chunks() -> Iterator[pd.DataFrame]:
+        for i, (chunk_start, chunk_end) in enumerate(ranges):
+            chunk = _parse_range(file, chunk_start, chunk_end, encoding, names, None, None)
+            if chunk is None:
+                raise ValueError(f"line breaks in quoted values between bytes {chunk_start} and {chunk_end}")
+            yield summarize_partition(chunk, first_part + i, sample_rows)
+
+    return tree_reduce(chunks()), len(ranges)
+
+
+def profile_file(file: str, size: int, mtime_ns: int, state: Optional[FileState], state_dir: Path,
+                 encoding: str = 'utf8', sample_rows: int = EXTERNAL_SAMPLE_ROWS) -> Tuple[str, FileState, tuple]:
+    """Count a new or changed file, parsing only the appended rows when its cached state still holds.
+
+    :param file: the CSV file
+    :param size: size of the file
+    :param mtime_ns: modification time of the file
+    :param state: what the index remembers of the file, None if it's new
+    :param state_dir: directory of the cached states
+    :param encoding: encoding of the CSV file
+    :param sample_rows: number of rows to sample
+    :return: how the file changed, its new state, and its exact counts and sample, empty if it wasn't profiled;
+        the state is written to a new file, so the cached one holds until the index stops pointing to it
+    """
+    change = classify(file, size, mtime_ns, state)
+    if change == 'unchanged':
+        return change, state, ()
+    if compression_of(file):
+        # compressed files can't be read from an offset: count them in one pass, without a cached state
+        counts, sample = count_exact(file, encoding, sample_rows)
+        return change, FileState(size, mtime_ns, size, '', 0, ''), (counts, sample)
+
+    start = state.size if change == 'appended' else 0
+    end = _complete_end(file, size, mtime_ns)
+    if end <= start:
+        # no complete line yet
+        return change, (state or FileState(0, 0, 0, '', 0, ''))._replace(seen_size=size, mtime_ns=mtime_ns), ()
+    first_part = state.n_parts if change == 'appended' else 0
+    merged, n_parts = _summarize_range(Path(file), start, end, encoding, first_part, sample_rows)
+    state_file = state_dir / f"{hashlib.sha1(file.encode()).hexdigest()}-{mtime_ns}-{end}.pkl"
+    if change == 'appended':
+        with open(state_dir / state.state_file, 'rb') as f:
+            merged = merge_states(pickle.load(f), merged)
+    with open(state_file, 'wb') as f:
+        pickle.dump(merged, f, protocol=pickle.HIGHEST_PROTOCOL)
+    new_state = FileState(size, mtime_ns, end, _fingerprint(file, end), first_part + n_parts, state_file.name)
+    return change, new_state, (finalize_counts(merged), merged.sample.reset_index(drop=True))
+
+
+def _drop_stale_states(state_dir: Path, index: Dict[str, FileState]) -> None:
+    """Delete the cached states the index no longer points to, replaced or left by an interrupted scan.
+
+    :param state_dir: directory of the cached states
+    :param index: the state of each file
+    """
+    current = {state.state_file for state in index.values()}
+    for path in state_dir.iterdir():
+        if path.name not in current:
+            path.unlink()
+
+
+def scan_once(target_dir: Union[str, Path], report_type: str = '.txt', encoding: str = 'utf8',
+              sample_rows: int = EXTERNAL_SAMPLE_ROWS, num_works: int = 1) -> Dict[str, int]:
+    """Scan a directory once, and render a report for every new or changed CSV file next to it.
+
+    :param target_dir: the watched directory
+    :param report_type: suffix of the reports, one of the report or export types of :func:`render_report`
+    :param encoding: encoding of the CSV files
+    :param sample_rows: number of rows to sample from each file
+    :param num_works: number of cpu cores to profile each file
+    :return: the number of files of each change, and of the removed and failed files
+    """
+    from ._profiling import get_df_profile
+    from .exporting import EXPORT_TYPES, export_profile
+    from .reporting import save_report
+
+    start = time.perf_counter()
+    index = load_index(target_dir)
+    state_dir = Path(target_dir, STATE_DIR, 'states')
+    state_dir.mkdir(parents=True, exist_ok=True)
+    files = scan(target_dir)
+    summary = dict.fromkeys(CHANGES + ('removed', 'failed'), 0)
+    for file, (size, mtime_ns) in files.items():
+        try:
+            change, state, profiled = profile_file(file, size, mtime_ns, index.get(file), state_dir, encoding,
+                                                   sample_rows)
+            if profiled:
+                counts, sample = profiled
+                name = strip_compression(file)
+                report_file = name[:name.rfind('.')] + report_type
+                logger.info(f"Rendering the report of {change} file {file}...")
+                df_profile = get_df_profile(sample, num_works, exact_counts=counts)
+                if report_type[1:] in EXPORT_TYPES:
+                    export_profile(df_profile, report_file, file)
+                else:
+                    save_report(df_profile, 6, report_file)
+        except Exception as e:
+            # one bad file mustn't stop the scan, or every later scan would stop on it again
+            logger.warning(f"{file} couldn't be profiled: {e!r}, retrying once it changes")
+            index[file] = FileState(size, mtime_ns, size, '', 0, '')
+            summary['failed'] += 1
+            continue
+        index[file] = state
+        summary[change] += 1
+    for file in set(index) - set(files):
+        del index[file]
+        summary['removed'] += 1
+    if summary['unchanged'] < len(files) or summary['removed']:
+        save_index(target_dir, index)
+        _drop_stale_states(state_dir, index)
+    logger.info(f"Scanned {len(files)} files in {time.perf_counter() - start:.2f} sec: "
+                + ', '.join(f"{n} {change}" for change, n in summary.items() if n))
+    return summary
+
+
+def watch(target_dir: Union[str, Path], report_type: str = '.txt', interval: float = 10.,
+          encoding: str = 'utf8', sample_rows: int = EXTERNAL_SAMPLE_ROWS, num_works: int = 1,
+          n_scans: Optional[int] = None) -> None:
+    """Scan a directory every interval seconds, profiling the new and changed CSV files.
+
+    :param target_dir: the watched directory
+    :param report_type: suffix of the reports
+    :param interval: seconds between the start of two scans
+    :param encoding: encoding of the CSV files
+    :param sample_rows: number of rows to sample from each file
+    :param num_works: number of cpu cores to profile each file
+    :param n_scans: number of scans before returning, None to watch until interrupted
+    """
+    logger.info(f"Watching {target_dir} every {interval:g} sec...")
+    scans = 0
+    while n_scans is None or scans < n_scans:
+        started = time.monotonic()
+        scan_once(target_dir, report_type, encoding, sample_rows, num_works)
+        scans += 1
+        if n_scans is None or scans < n_scans:
+            time.sleep(max(interval - (time.monotonic() - started), 0.))
@@ -0,0 +1,163 @@
+"""Run tasks in worker processes with a time and memory limit for each task.
+
+A task that runs out of time or memory, or takes its worker down, is reported as failed and its worker is
+replaced, so the other tasks carry on.
+"""
+
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+# a finished task: its key, 'ok' or the reason it failed, and its result
+Outcome = Tuple[Hashable, str, Any]
+
+
+def _limit_memory(limit: Optional[int]) -> None:
+    """Cap the address space of this process at its current size plus limit bytes.
+
+    Allocations past the cap raise MemoryError instead of waking the OOM killer. Only enforced on Linux.
+
+    :param limit: bytes the process may allocate, None for no cap
+    """
+    if not limit:
+        return
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * resource.getpagesize()
+    except (ImportError, OSError):
+        logger.warning("memory limits are only enforced on Linux")
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (current + limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+
+def _serve(conn: Connection, func: Callable, memory_limit: Optional[int]) -> None:
+    """Run the tasks received on a connection until told to stop.
+
+    :param conn: the worker end of the pipe, receiving (key, args) and sending outcomes
+    :param func: the function to run on the arguments of each task
+    :param memory_limit: bytes a task may allocate
+    """
+    _limit_memory(memory_limit)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        key, args = task
+        try:
+            outcome = (key, 'ok', func(*args))
+        except MemoryError:
+            outcome = (key, 'memory', None)
+        except Exception as e:
+            outcome = (key, f'error: {e!r}', None)
+        try:
+            conn.send(outcome)
+        except MemoryError:
+            conn.send((key, 'memory', None))
+        if outcome[1] == 'memory':
+            # a process that ran out of memory may hold on to fragments of it; start afresh
+            return
+
+
+class _Worker:
+    """A worker process and the task it is running."""
+
+    def __init__(self, func: Callable, memory_limit: Optional[int]) -> None:
+        """Start the process.
+
+        :param func: the function to run on the arguments of each task
+        :param memory_limit: bytes a task may allocate
+        """
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child_conn, func, memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.key: Optional[Hashable] = None
+        self.deadline = float('inf')
+
+    def submit(self, key: Hashable, args: tuple, timeout: Optional[float]) -> None:
+        """Send a task to the worker.
+
+        :param key: the task key
+        :param args: the arguments of the task
+        :param timeout: seconds the task may run, None for no limit
+        """
+        self.key = key
+        self.deadline = time.monotonic() + timeout if timeout else float('inf')
+        self.conn.send((key, args))
+
+    def stop(self, kill: bool = False) -> None:
+        """Stop the process, at once if kill.
+
+        :param kill: whether to kill the process instead of letting it finish
+        """
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join()
+        self.conn.close()
+
+
+def run_supervised(func: Callable, tasks: Iterable[Tuple[Hashable, tuple]], num_works: int,
+                   timeout: Optional[float] = None, memory_limit: Optional[int] = None) -> Iterator[Outcome]:
+    """Run tasks on worker processes, each under a time and a memory limit.
+
+    :param func: the function to run, a module-level function so that it can be sent to the workers
+    :param tasks: the key and arguments of each task
+    :param num_works: number of worker processes
+    :param timeout: seconds a task may run, None for no limit
+    :param memory_limit: bytes a task may allocate, None for no limit
+    :return: an iterator of (key, status, result) in completion order; status is 'ok', 'timeout', 'memory',
+        'crashed' or 'error: ...', and the result is None unless the task succeeded
+    """
+    pending = deque(tasks)
+    workers: List[_Worker] = []
+    try:
+        while pending or any(worker.key is not None for worker in workers):
+            for worker in workers:
+                if worker.key is None and pending:
+                    worker.submit(*pending.popleft(), timeout)
+            while pending and len(workers) < num_works:
+                workers.append(_Worker(func, memory_limit))
+                workers[-1].submit(*pending.popleft(), timeout)
+
+            busy = [worker for worker in workers if worker.key is not None]
+            deadline = min(worker.deadline for worker in busy)
+            ready = wait([worker.conn for worker in busy],
+                         None if deadline == float('inf') else max(deadline - time.monotonic(), 0))
+            for i, worker in enumerate(workers):
+                if worker.key is None:
+                    continue
+                key, failure = worker.key, None
+                if worker.conn in ready:
+                    try:
+                        key, status, result = worker.conn.recv()
+                    except (EOFError, OSError):
+                        status, result = 'crashed', None
+                    yield key, status, result
+                    worker.key = None
+                    if status == 'ok' or status.startswith('error'):
+                        continue
+                    failure = status
+                elif time.monotonic() >= worker.deadline:
+                    failure = 'timeout'
+                    yield key, failure, None
+                else:
+                    continue
+                logger.warning(f"{key}: {failure}, restarting its worker")
+                worker.stop(kill=True)
+                workers[i] = _Worker(func, memory_limit)
+    finally:
+        for worker in workers:
+            worker.stop(kill=worker.key is not None)
@@ -1,20 +1,14 @@
 """Automatically generate reports for all CSV file find in path."""
 
 import os
-import sys
 from typing import List, Tuple
 
 import click
-import pandas as pd
 from loguru import logger
 
+from ._compression import file_sizes, is_csv, strip_compression
 from ._config import LOG_FILE
-from .reporting import render_report
-
-logger.remove()
-logger.add(sys.stdout, format="{time:YYYY-MM-DD at HH:mm:ss}|{level}|{message}", level="INFO")
-logger.add(LOG_FILE, format="{time:YYYY-MM-DD at HH:mm:ss} | {name: ^15} | {level} | {message}",
-           level="DEBUG", rotation="10 MB")
+from ._monitor import setup_logger
 
 
 def _human_readable_size(n_bytes: int) -> str:
@@ -33,7 +27,9 @@ def _human_readable_size(n_bytes: int) -> str:
 
 
 def find_files(target_dir: str = os.getcwd(), file_suffix: str = ".csv") -> List[Tuple[str, int, str]]:
-    """Find target type of files in target folder and its sub folders.
+    """Find target type of files in target folder and its sub folders, plain or compressed (.gz, .bz2, .xz, .zst).
+
+    The size of a compressed file shows its estimated decompressed size as well.
 
     :param target_dir:
     :param file_suffix:
@@ -43,9 +39,11 @@ def find_files(target_dir: str = os.getcwd(), file_suffix: str = ".csv") -> List
     for subdir, dirs, files in os.walk(target_dir):
         for filename in files:
             filepath_full = os.path.join(subdir, filename)
-            if filepath_full.endswith(file_suffix):
-                f_size_original = os.path.getsize(filepath_full)
+            if is_csv(filepath_full, file_suffix):
+                f_size_original, f_size_decompressed = file_sizes(filepath_full)
                 f_size = _human_readable_size(f_size_original)
+                if f_size_decompressed is not None:
+                    f_size += f" (~{_human_readable_size(f_size_decompressed)} decompressed)"
                 output.append((f_size, f_size_original, filepath_full))
     return output
 
@@ -53,9 +51,10 @@ def find_files(target_dir: str = os.getcwd(), file_suffix: str = ".csv") -> List
 @click.command()
 @click.option('-t', '--report_type',
               prompt='file type to store the report.',
-              required=False, default='.txt', type=click.Choice(['.html', '.txt', '.md']),
+              required=False, default='.txt', type=click.Choice(['.html', '.txt', '.md', '.jsonl', '.parquet']),
               show_default=True,
-              help='file type (html ,txt, or markdown) to store the report.')
+              help='file type (html ,txt, or markdown) to store the report, or jsonl and parquet to export the '
+                   'typed statistics.')
 def render_reports_for_all(target_dir: str = os.getcwd(), report_type: str = ".txt"):
     """Render given type reports for all CSV files find in current directory and sub directory.
 
@@ -63,6 +62,10 @@ def render_reports_for_all(target_dir: str = os.getcwd(), report_type: str = ".t
     :param report_type:
     :return:
     """
+    from ._loading import load_csv
+    from .reporting import render_report
+
+    setup_logger("INFO", LOG_FILE)
     files = find_files(target_dir)
     for f in files:
         print(f)
@@ -71,13 +74,42 @@ def render_reports_for_all(target_dir: str = os.getcwd(), report_type: str = ".t
         cnt = 0
         for _, _, f in files:
             try:
-                df = pd.read_csv(f)
-                report_file = f[:f.rfind(".")] + report_type
+                df = load_csv(f, reader='parallel')
+                name = strip_compression(f)
+                report_file = name[:name.rfind(".")] + report_type
                 logger.info(f"\nRender Report for {f}...")
-                render_report(df, report_file=report_file)
+                render_report(df, report_file=report_file, table_name=f)
                 cnt += 1
             except UnicodeDecodeError:
                 logger.warning(f"{f} skipped due to UnicodeDecodeError!")
         logger.info(f"Summary: {cnt} reports successfully rendered, {len(files) - cnt} failed.")
     else:
         print("Aborted!")
+
+
+@click.command()
+@click.argument('target_dir', required=False, default=os.getcwd(), type=click.Path(exists=True, file_okay=False))
+@click.option('-t', '--report_type',
+              required=False, default='.txt', type=click.Choice(['.html', '.txt', '.md', '.jsonl', '.parquet']),
+              show_default=True,
+              help='file type (html ,txt, or markdown) to store the report, or jsonl and parquet to export the '
+                   'typed statistics.')
+@click.option('--interval', required=False, default=10., type=float, show_default=True,
+              help='seconds between two scans of the directory.')
+@click.option('--once', is_flag=True, default=False,
+              help='scan the directory once and exit, e.g. from cron.')
+def watch_reports(target_dir: str = os.getcwd(), report_type: str = ".txt", interval: float = 10., once: bool = False):
+    """Watch a directory, and render reports for the CSV files that are new or changed since the last scan.
+
+    Rows appended to a file are the only ones read again; the state of the files is kept in .dataprofile.
+
+    :param target_dir:
+    :param report_type:
+    :param interval:
+    :param once:
+    :return:
+    """
+    from ._watch import watch
+
+    setup_logger("INFO", LOG_FILE)
+    watch(target_dir, report_type, interval, n_scans=1 if once else None)
@@ -1,35 +1,29 @@
 """This module contains code for CLI run reports."""
 
-import sys
+import json
 from pathlib import Path
 from typing import Optional
 
 import click
-import pandas as pd
-from colorama import Fore, init
 from loguru import logger
 
-from ._config import DEFAULT_SAMPLE_SIZE, LOG_FILE, AUTHOR
-from .reporting import render_report
-
-init(autoreset=True)
-logger.remove()
-logger.add(sys.stdout, format="{time:YYYY-MM-DD at HH:mm:ss}|{level}|{message}", level="INFO")
-logger.add(LOG_FILE, format="{time:YYYY-MM-DD at HH:mm:ss} | {name: ^15} | {level} | {message}",
-           level="DEBUG", rotation="10 MB")
+from ._compression import is_csv
+from ._config import DEFAULT_SAMPLE_SIZE, LOG_FILE, AUTHOR, EXTERNAL_MEMORY_BUDGET, EXTERNAL_SAMPLE_ROWS
+from ._monitor import setup_logger
 
 
 def _find_csv_file() -> Optional[Path]:
-    """Return the first CSV file found in the current directory.
+    """Return the first CSV file found in the current directory, plain or compressed.
 
     :return:
     """
-    csv_lt = list(Path().glob('*.csv'))
+    csv_lt = sorted(path for path in Path().glob('*.csv*') if is_csv(path))
     return csv_lt[0] if csv_lt else None
 
 
 @click.command()
-@click.option('-f', '--file', prompt='target cvs file', required=True, help='cvs format is required',
+@click.option('-f', '--file', prompt='target cvs file', required=True,
+              help='cvs format is required, optionally compressed as .gz, .bz2, .xz or .zst',
               default=_find_csv_file(),
               show_default=True)
 @click.option('-e', '--encoding', prompt='file encoding type', required=False, help='correct encoding is required',
@@ -44,11 +38,46 @@ def _find_csv_file() -> Optional[Path]:
               help='number of variables to show per row')
 @click.option('-t', '--save_report_to_file',
               prompt='file type to store the report, skip if not needed or choose one from',
-              required=False, default='', type=click.Choice(['', 'html', 'txt', 'md']),
+              required=False, default='', type=click.Choice(['', 'html', 'txt', 'md', 'jsonl', 'parquet']),
+              show_default=True,
+              help='file type (html ,txt, or markdown) to store the report, or jsonl and parquet to export the '
+                   'typed statistics, skip if not needed')
+@click.option('--as_category', is_flag=True, default=False,
+              help='load low-cardinality string columns as category dtype to save memory and time')
+@click.option('--optimize_memory', is_flag=True, default=False,
+              help='load every column with its narrowest lossless dtype')
+@click.option('--exact_counts', is_flag=True, default=False,
+              help='count distinct values, frequent values and duplicate rows exactly through temporary files, '
+                   'for files larger than memory; other statistics come from a sample')
+@click.option('--memory_budget', required=False, default=EXTERNAL_MEMORY_BUDGET // 2 ** 20, show_default=True,
+              help='memory in MB available to count one partition with --exact_counts')
+@click.option('--column_timeout', required=False, default=0., show_default=True,
+              help='seconds each variable may take before it is profiled on a sample instead, 0 for no limit')
+@click.option('--column_memory', required=False, default=0, show_default=True,
+              help='memory in MB each variable may allocate before it is profiled on a sample, 0 for no limit')
+@click.option('--checkpoint', required=False, default='', show_default=True,
+              help='file to record finished variables in; rerun with the same file to resume')
+@click.option('--reader', required=False, default='parallel', type=click.Choice(['pandas', 'parallel', 'pyarrow']),
               show_default=True,
-              help='file type (html ,txt, or markdown) to store the report, skip if not needed')
+              help='CSV reader: the single-threaded pandas parser, byte ranges parsed on several threads, '
+                   'or the pyarrow reader')
+@click.option('--include', required=False, default='', show_default=True,
+              help='comma-separated names or regular expressions of the only columns to load and profile')
+@click.option('--exclude', required=False, default='', show_default=True,
+              help='comma-separated names or regular expressions of columns never to load')
+@click.option('--table', required=False, default='', show_default=True,
+              help='profile this table of the SQLite database given as file, aggregating in the database')
+@click.option('--target_seconds', required=False, default=0., show_default=True,
+              help='seconds to profile the variables in, sampling rows as the cost model predicts, 0 for no target')
+@click.option('--rules', required=False, default='', show_default=True,
+              help='JSON file of data-quality rules to check, as {"type_rules": {...}, "column_rules": {...}}')
 def render_single_file_report(file: str, encoding: str = 'utf8', sample_size: int = DEFAULT_SAMPLE_SIZE,
-                              var_per_row: int = 6, save_report_to_file: str = '') -> None:
+                              var_per_row: int = 6, save_report_to_file: str = '', as_category: bool = False,
+                              optimize_memory: bool = False, exact_counts: bool = False,
+                              memory_budget: int = EXTERNAL_MEMORY_BUDGET // 2 ** 20, column_timeout: float = 0.,
+                              column_memory: int = 0, checkpoint: str = '', reader: str = 'parallel',
+                              include: str = '', exclude: str = '', table: str = '',
+                              target_seconds: float = 0., rules: str = '') -> None:
     """Render given type report for the target file.
 
     :param encoding:
@@ -56,13 +85,59 @@ def render_single_file_report(file: str, encoding: str = 'utf8', sample_size: in
     :param sample_size:
     :param var_per_row:
     :param save_report_to_file:
+    :param as_category:
+    :param optimize_memory:
+    :param exact_counts:
+    :param memory_budget:
+    :param column_timeout:
+    :param column_memory:
+    :param checkpoint:
+    :param reader:
+    :param include:
+    :param exclude:
+    :param table:
+    :param target_seconds:
+    :param rules:
     :return:
     """
+    setup_logger("INFO", LOG_FILE)
     logger.debug(f"{AUTHOR} executed at {Path('.').absolute()}")
     logger.debug(f"input args: {locals()}")
+
+    # the loader and the report engine are imported only once the arguments are in, to keep startup fast
+    from colorama import Fore
+    from ._loading import load_csv, load_compact_csv, select_columns
+    from ._profile_config import ProfileConfig
+    from .reporting import render_report
+
+    dtype_changes = counts = config = None
+    if include or exclude or rules:
+        config = ProfileConfig(include=[p for p in include.split(',') if p],
+                               exclude=[p for p in exclude.split(',') if p],
+                               **(json.loads(Path(rules).read_text()) if rules else {}))
     try:
         logger.info(f"Loading data from {file}...")
-        df = pd.read_csv(Path(file), low_memory=False, encoding=encoding)
+        if table:
+            import sqlite3
+            from contextlib import closing
+            from ._sql import count_sql
+            if not Path(file).exists():
+                raise FileNotFoundError(file)
+            with closing(sqlite3.connect(file)) as connection:
+                counts, df = count_sql(connection, table, config=config,
+                                       sample_rows=sample_size if sample_size > 0 else EXTERNAL_SAMPLE_ROWS)
+            sample_size = -1
+        elif exact_counts:
+            from ._external import count_exact
+            counts, df = count_exact(file, encoding=encoding,
+                                     sample_rows=sample_size if sample_size > 0 else EXTERNAL_SAMPLE_ROWS,
+                                     memory_budget=memory_budget * 2 ** 20,
+                                     usecols=select_columns(file, encoding, config))
+            sample_size = -1
+        elif optimize_memory:
+            df, dtype_changes = load_compact_csv(file, encoding=encoding, config=config)
+        else:
+            df = load_csv(file, encoding=encoding, as_category=as_category, reader=reader, config=config)
     except FileNotFoundError:
         logger.error(Fore.RED + "Target file doesn't exist! Profiling stopped!")
     except UnicodeDecodeError:
@@ -73,7 +148,10 @@ def render_single_file_report(file: str, encoding: str = 'utf8', sample_size: in
     else:
         report_file_name = 'report_' + str(file).split('/')[-1].split('.')[
             0] + '.' + save_report_to_file if save_report_to_file else None
-        render_report(df, sample_size=sample_size, var_per_row=var_per_row, report_file=report_file_name)
+        render_report(df, sample_size=sample_size, var_per_row=var_per_row, report_file=report_file_name,
+                      dtype_changes=dtype_changes, table_name=str(file), exact_counts=counts,
+                      column_timeout=column_timeout or None, column_memory=column_memory * 2 ** 20 or None,
+                      checkpoint_file=checkpoint or None, config=config, target_seconds=target_seconds or None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,125 @@
+"""Export the typed statistics of a profile as JSON Lines or a Parquet table for downstream pipelines."""
+
+import json
+import math
+import numbers
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+EXPORT_TYPES = ('jsonl', 'parquet')
+
+# ratios that the report shows as percent strings, recomputed from their counts: (numerator, denominator)
+_RATIOS = {'p_missing': ('n_missing', 'count'),
+           'p_value1': ('n_value1', 'count'),
+           'p_value2': ('n_value2', 'count'),
+           'p_digit': ('n_digit', 'n_chars'),
+           'p_alpha': ('n_alpha', 'n_chars'),
+           'p_space': ('n_space', 'n_chars')}
+
+_ID_FIELDS = ('table', 'variable', 'type', 'data_type')
+
+
+def _to_python(value: Any) -> Union[None, bool, int, float, str]:
+    """Convert a raw statistic to a JSON type; durations become seconds and dates ISO 8601 strings.
+
+    :param value: a raw statistic
+    :return: the value as None, bool, int, float or str
+    """
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, pd.Timedelta):
+        return value.total_seconds()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _typed_stats(stats: pd.Series) -> Dict[str, Any]:
+    """Turn the raw statistics of a variable into a flat record of JSON types.
+
+    :param stats: the raw statistics of one variable
+    :return: a record of statistic name to value
+    """
+    record = {f'{key}': _to_python(value) for key, value in stats.items()}
+    if record.get('n_unique') == 'N/A':
+        record['n_unique'] = 0
+    for ratio, (numerator, denominator) in _RATIOS.items():
+        if ratio in record and denominator in record:
+            record[ratio] = record[numerator] / record[denominator] if record[denominator] else None
+    if 'p_unique' in record:
+        n_present = record['count'] - record['n_missing']
+        record['p_unique'] = record['n_unique'] / n_present if record['n_unique'] and n_present else None
+    return record
+
+
+def iter_records(df_profile: Dict[str, Any], table: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield one record per variable with its type and typed statistics.
+
+    Statistics that don't apply to a variable, like '3rd_freq' of a variable with two values, are None.
+
+    :param df_profile: a dictionary of statistics
+    :param table: the name of the profiled dataset, added to every record if given
+    :return: an iterator of records
+    """
+    for raw_stats in df_profile['raw_stats'].values():
+        for name, stats in raw_stats.iterrows():
+            record = {'table': table} if table is not None else {}
+            record['variable'] = _to_python(name)
+            stats = _typed_stats(stats)
+            record['type'] = stats.pop('type')
+            record['data_type'] = stats.pop('data_type')
+            record.update(stats)
+            yield record
+
+
+def profile_to_frame(df_profile: Dict[str, Any], table: Optional[str] = None) -> pd.DataFrame:
+    """Collect the statistics into a long table with one row per variable and statistic.
+
+    Numbers go to the float column 'value' and everything else to the string column 'value_str'.
+
+    :param df_profile: a dictionary of statistics
+    :param table: the name of the profiled dataset, added as the first column if given
+    :return: a table of table (optional), variable, type, data_type, stat, value and value_str
+    """
+    rows = []
+    for record in iter_records(df_profile, table):
+        ids = tuple(record[field] for field in _ID_FIELDS if field in record)
+        for stat, value in record.items():
+            if stat in _ID_FIELDS or value is None:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                rows.append(ids + (stat, float(value), None))
+            else:
+                rows.append(ids + (stat, None, str(value)))
+    ids = [field for field in _ID_FIELDS if field != 'table' or table is not None]
+    return pd.DataFrame(rows, columns=ids + ['stat', 'value', 'value_str']).astype({'value': 'float64'})
+
+
+def export_profile(df_profile: Dict[str, Any], export_file: Union[str, Path], table: Optional[str] = None) -> None:
+    """Write the typed statistics to a '.jsonl' (one record per variable) or '.parquet' (long table) file.
+
+    :param df_profile: a dictionary of statistics
+    :param export_file: the target file, its suffix picks the format
+    :param table: the name of the profiled dataset, stored with every variable if given
+    :return: None
+    """
+    export_type = Path(export_file).suffix[1:]
+    if export_type not in EXPORT_TYPES:
+        raise NotImplementedError("file type doesn't support!")
+    if export_type == 'jsonl':
+        with open(export_file, 'w', encoding='UTF-8') as f:
+            for record in iter_records(df_profile, table):
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    else:
+        profile_to_frame(df_profile, table).to_parquet(export_file, index=False)
+    logger.info(f"profile exported to {export_file}")
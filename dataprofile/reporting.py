@@ -3,22 +3,31 @@
 import sys
 from datetime import date
 from pathlib import Path
-from typing import Optional, Union, Dict, Tuple, List
+from typing import Optional, Union, Dict, Tuple, List, Any, Iterator, TextIO, TYPE_CHECKING
 
 import pandas as pd
-from colorama import Fore, init
 from loguru import logger
-from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.exceptions import NotFittedError, ChangedBehaviorWarning
-from tabulate import tabulate
 
 from ._config import DEFAULT_SAMPLE_SIZE, AUTHOR, RANDOM_STATE
-from ._monitor import monitor_time_memory
+from ._drift import format_drift
+from .exporting import EXPORT_TYPES, export_profile
+from ._loading import DtypeChanges
+from ._monitor import monitor_time_memory, ensure_logger
+from ._profile_config import ProfileConfig
 from ._profiling import get_df_profile, get_a_sample
+from ._tuning import plan_profile
+from ._tables import is_renderable, render_frame, render_table, sparkline, svg_bars
 
-init(autoreset=True)
-logger.remove()
-logger.add(sys.stdout, format="{time:YYYY-MM-DD at HH:mm:ss}|{level}|{message}", level="WARNING")
+if TYPE_CHECKING:
+    from ._external import ExactCounts
+
+
+def __getattr__(name: str) -> Any:
+    """Keep ``reporting.ProfileReport`` importable without loading scikit-learn for every report."""
+    if name == 'ProfileReport':
+        from ._estimator import ProfileReport
+        return ProfileReport
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _str_format(f_name: str) -> Tuple[str, str]:
@@ -39,55 +48,167 @@ def _str_format(f_name: str) -> Tuple[str, str]:
     return table_fmt, line_breaker
 
 
-def profile_to_str(df_profile: Dict[str, Union[pd.DataFrame, list]],
-                   var_per_row: int = 6, table_fmt: str = 'psql', line_breaker: str = '\n') -> List[str]:
+def _render_table(table: pd.DataFrame, table_fmt: str) -> str:
+    """Render a table with the built-in renderer, or with tabulate and to_html for the formats it lacks.
+
+    :param table: the table to render
+    :param table_fmt: the string format of dataframe
+    :return: the rendered table
     """
-    Convert all statistics to a list of strings.
+    if is_renderable(table, table_fmt):
+        return render_frame(table, table_fmt)
+    if table_fmt == 'html':
+        return table.to_html()
+    from tabulate import tabulate
+    return tabulate(table, headers='keys', tablefmt=table_fmt)
+
+
+def _with_histograms(table: pd.DataFrame, histograms: Dict[str, Any], table_fmt: str) -> pd.DataFrame:
+    """Add a row that draws the histogram of each variable, as svg in html and as a sparkline otherwise.
+
+    :param table: statistics with one column per variable
+    :param histograms: the histogram of each variable
+    :param table_fmt: the string format of dataframe
+    :return: the table with a 'histogram' row
+    """
+    draw = svg_bars if table_fmt == 'html' else sparkline
+    row = pd.DataFrame([[draw(histograms[name].counts) if name in histograms else '' for name in table.columns]],
+                       index=['histogram'], columns=table.columns)
+    return pd.concat([table, row])
+
+
+def iter_report(df_profile: Dict[str, Union[pd.DataFrame, list]],
+                var_per_row: int = 6, table_fmt: str = 'psql', line_breaker: str = '\n') -> Iterator[str]:
+    """
+    Render the statistics piece by piece, one heading or table at a time.
 
     :param df_profile: a dictionary of statistics
     :param var_per_row: number of columns to show on each row
     :param table_fmt: the string format of dataframe
     :param line_breaker:
-    :return: a list of strings
+    :return: an iterator of strings
     """
     logger.info("Convert statistics into strings...")
-    report_str = []
     padding_size, padding_size2 = 90, 50
 
-    report_str.append(' Beginning of report '.center(padding_size, '='))
-    report_str.append(
-        f"{line_breaker}This following report is created by {AUTHOR} on {date.today():%A, %b %d, %Y}{line_breaker}")
+    yield ' Beginning of report '.center(padding_size, '=')
+    yield f"{line_breaker}This following report is created by {AUTHOR} on {date.today():%A, %b %d, %Y}{line_breaker}"
 
-    report_str.append(' Table Statistics '.center(padding_size2, '='))
-    report_str.append(
-        tabulate(df_profile['table_stats'], headers='keys',
-                 tablefmt=table_fmt) if table_fmt != 'html' else df_profile['table_stats'].to_html())
-    report_str.append(f'{line_breaker}')
+    yield ' Table Statistics '.center(padding_size2, '=')
+    yield _render_table(df_profile['table_stats'], table_fmt)
+    yield f'{line_breaker}'
 
-    report_str.append(' Variable Summary '.center(padding_size2, '='))
-    report_str.append(tabulate(df_profile['var_summary'], headers='keys',
-                               tablefmt=table_fmt) if table_fmt != 'html' else df_profile['var_summary'].to_html())
-    report_str.append(f'{line_breaker}')
+    yield ' Variable Summary '.center(padding_size2, '=')
+    yield _render_table(df_profile['var_summary'], table_fmt)
+    yield f'{line_breaker}'
 
-    report_str.append(' Variable Statistics '.center(padding_size2, '='))
+    yield ' Variable Statistics '.center(padding_size2, '=')
     for key, item in df_profile['var_stats'].items():
-        report_str.append(f'{line_breaker}{key} variables:')
-        for i in range(len(df_profile['var_stats'][f'{key}']) // (var_per_row + 1) + 1):
-            dt = pd.DataFrame(item).T.iloc[:, i * var_per_row:(i + 1) * var_per_row]
-            report_str.append(tabulate(
-                dt, headers='keys', tablefmt=table_fmt) if table_fmt != 'html' else dt.to_html())
-    report_str.append(f'{line_breaker}')
-
+        yield f'{line_breaker}{key} variables:'
+        # transpose once per type; every chunk of var_per_row variables is a slice of the same matrix
+        table = item.T
+        if key == 'Interval' and df_profile.get('histograms'):
+            table = _with_histograms(table, df_profile['histograms'], table_fmt)
+        if is_renderable(table, table_fmt):
+            values = table.to_numpy(dtype=object)
+            for start in range(0, table.shape[1], var_per_row):
+                chunk = slice(start, start + var_per_row)
+                yield render_table(values[:, chunk], table.index, table.columns[chunk], table_fmt)
+        else:
+            for start in range(0, table.shape[1], var_per_row):
+                yield _render_table(table.iloc[:, start:start + var_per_row], table_fmt)
+    yield f'{line_breaker}'
+
+    if 'duplicate_rows' in df_profile:
+        yield ' Duplicate Rows '.center(padding_size2, '=')
+        yield _render_table(df_profile['duplicate_rows'], table_fmt)
+    if 'keys' in df_profile:
+        yield ' Candidate Keys '.center(padding_size2, '=')
+        yield _render_table(df_profile['keys'].set_index('key'), table_fmt)
+    if 'missing_patterns' in df_profile:
+        yield ' Missing Patterns '.center(padding_size2, '=')
+        patterns = df_profile['missing_patterns']
+        yield _render_table(patterns.assign(n_row=patterns['n_row'].map('{:,d}'.format),
+                                            p_row=patterns['p_row'].map('{:.2%}'.format)), table_fmt)
+    if 'missing_pairs' in df_profile:
+        yield ' Missing Together '.center(padding_size2, '=')
+        pairs = df_profile['missing_pairs']
+        yield _render_table(pairs.assign(n_both=pairs['n_both'].map('{:,d}'.format),
+                                         p_both=pairs['p_both'].map('{:.2%}'.format),
+                                         nullity_corr=pairs['nullity_corr'].map('{:.4f}'.format)), table_fmt)
+    if 'nullity_corr' in df_profile:
+        yield ' Nullity Correlation '.center(padding_size2, '=')
+        yield _render_table(df_profile['nullity_corr'].applymap('{:.2f}'.format), table_fmt)
     if 'conf_matrix' in df_profile:
-        report_str.append(' Confusion Matrix '.center(padding_size2, '='))
+        yield ' Confusion Matrix '.center(padding_size2, '=')
         for confusion_matrix in df_profile['conf_matrix']:
-            report_str.append(f"row:{confusion_matrix.index.name} - col:{confusion_matrix.columns.name}")
-            report_str.append(tabulate(confusion_matrix, headers=confusion_matrix.columns,
-                                       showindex=confusion_matrix.index.to_list(),
-                                       tablefmt=table_fmt) if table_fmt != 'html' else confusion_matrix.to_html())
-    report_str.append(' End of report '.center(padding_size, '='))
-    report_str.append(' Author of Dataprofile: Gordon Chen (GordonChen.GoBlue@gmail.com) '.center(padding_size, '='))
-    return report_str
+            yield f"row:{confusion_matrix.index.name} - col:{confusion_matrix.columns.name}"
+            # the names are already in the line above; only html repeats them in the table
+            yield _render_table(confusion_matrix if table_fmt == 'html' else confusion_matrix.rename_axis(None),
+                                table_fmt)
+    if 'correlations' in df_profile:
+        yield ' Correlations '.center(padding_size2, '=')
+        correlations = df_profile['correlations']
+        yield _render_table(correlations.assign(value=correlations['value'].map('{:.4f}'.format),
+                                                n_obs=correlations['n_obs'].map('{:,d}'.format)), table_fmt)
+    if 'rule_violations' in df_profile:
+        yield ' Rule Violations '.center(padding_size2, '=')
+        violations = df_profile['rule_violations']
+        yield _render_table(violations.assign(
+            n_checked=violations['n_checked'].map('{:,d}'.format),
+            n_violation=violations['n_violation'].map('{:,d}'.format),
+            p_violation=violations['p_violation'].map('{:.2%}'.format),
+            examples=violations['examples'].map(lambda values: ', '.join(map(str, values))),
+            rows=violations['rows'].map(lambda rows: ', '.join(map(str, rows)))), table_fmt)
+    if 'failures' in df_profile:
+        yield ' Failed Variables '.center(padding_size2, '=')
+        yield _render_table(df_profile['failures'], table_fmt)
+    if 'dtype_changes' in df_profile:
+        yield ' Downcast Variables '.center(padding_size2, '=')
+        yield _render_table(df_profile['dtype_changes'], table_fmt)
+    if 'drift' in df_profile:
+        drift = df_profile['drift']
+        yield ' Profile Drift '.center(padding_size2, '=')
+        yield f"{drift['drifted'].sum()} of {len(drift)} variables drifted from the baseline profile"
+        if drift['drifted'].any():
+            yield _render_table(format_drift(drift), table_fmt)
+    yield ' End of report '.center(padding_size, '=')
+    yield ' Author of Dataprofile: Gordon Chen (GordonChen.GoBlue@gmail.com) '.center(padding_size, '=')
+
+
+def profile_to_str(df_profile: Dict[str, Union[pd.DataFrame, list]],
+                   var_per_row: int = 6, table_fmt: str = 'psql', line_breaker: str = '\n') -> List[str]:
+    """
+    Convert all statistics to a list of strings.
+
+    :param df_profile: a dictionary of statistics
+    :param var_per_row: number of columns to show on each row
+    :param table_fmt: the string format of dataframe
+    :param line_breaker:
+    :return: a list of strings
+    """
+    return list(iter_report(df_profile, var_per_row, table_fmt, line_breaker))
+
+
+def write_report(df_profile: Dict[str, Union[pd.DataFrame, list]], stream: TextIO,
+                 var_per_row: int = 6, table_fmt: str = 'psql', line_breaker: str = '\n') -> None:
+    """
+    Write the report to a stream as each piece is rendered, so the whole report never sits in memory.
+
+    :param df_profile: a dictionary of statistics
+    :param stream: a text file or sys.stdout
+    :param var_per_row: number of columns to show on each row
+    :param table_fmt: the string format of dataframe
+    :param line_breaker:
+    :return: None
+    """
+    for i, piece in enumerate(iter_report(df_profile, var_per_row, table_fmt, line_breaker)):
+        if i:
+            stream.write(line_breaker)
+        stream.write(piece)
+        if not i:
+            stream.flush()
+    stream.write('\n')
 
 
 def print_report(df_profile, var_per_row) -> None:
@@ -98,10 +219,7 @@ def print_report(df_profile, var_per_row) -> None:
     :param var_per_row:
     :return: None
     """
-    table_fmt = 'psql'
-    line_breaker = '\n'
-    report_str = profile_to_str(df_profile, var_per_row, table_fmt, line_breaker)
-    print(line_breaker.join(report_str))
+    write_report(df_profile, sys.stdout, var_per_row)
     logger.info("Report successfully rendered!")
 
 
@@ -114,10 +232,11 @@ def save_report(df_profile, var_per_row, report_file: Optional[Union[str, Path]]
     :param report_file:
     :return: None
     """
+    from colorama import Fore
+
     table_fmt, line_breaker = _str_format(str(report_file))
-    report_str = profile_to_str(df_profile, var_per_row, table_fmt, line_breaker)
     with open(report_file, 'w', encoding="UTF-8") as f:
-        f.write(line_breaker.join(report_str) + '\n')
+        write_report(df_profile, f, var_per_row, table_fmt, line_breaker)
         logger.info(Fore.GREEN + f"report saved to {report_file}")
     logger.info("Report successfully rendered!")
 
@@ -128,159 +247,52 @@ def render_report(df: pd.DataFrame,
                   var_per_row: int = 6,
                   random_state: int = RANDOM_STATE,
                   report_file: Optional[Union[str, Path]] = None,
-                  num_works: int = -1) -> None:
+                  num_works: int = -1,
+                  dtype_changes: Optional[DtypeChanges] = None,
+                  table_name: Optional[str] = None,
+                  exact_counts: Optional['ExactCounts'] = None,
+                  config: Optional[ProfileConfig] = None,
+                  column_timeout: Optional[float] = None,
+                  column_memory: Optional[int] = None,
+                  checkpoint_file: Optional[Union[str, Path]] = None,
+                  target_seconds: Optional[float] = None) -> None:
     """
     Print to screen or save a profile report to a file for a given pandas dataframe.
 
+    A '.jsonl' or '.parquet' report_file gets the typed statistics instead of a text report.
+
     :param df:
     :param sample_size:
     :param var_per_row:
     :param random_state:
     :param report_file:
     :param num_works:
+    :param dtype_changes: original and compact dtype of the columns downcast on load
+    :param table_name: name of the dataset, stored with every variable of a '.jsonl' or '.parquet' export
+    :param exact_counts: exact counts of the whole dataset from ``count_exact``, when df is a sample of it
+    :param config: the columns to profile, stat groups to skip and type overrides
+    :param column_timeout: seconds each variable may take before falling back to a sample
+    :param column_memory: bytes each variable may allocate before falling back to a sample
+    :param checkpoint_file: file to record finished variables in, to resume an interrupted run
+    :param target_seconds: time to profile the variables in; without a sample_size, the cost model picks the
+        rows to sample to meet it
     :return:
     """
+    ensure_logger()
+    if target_seconds and sample_size <= 0:
+        plan, _ = plan_profile(df, None if num_works < 1 else num_works, target_seconds)
+        sample_size = plan.sample_rows or sample_size
     if sample_size > 0:
         sample_df = get_a_sample(df, sample_size, random_state)
     else:
         sample_df = df
 
-    df_profile = get_df_profile(sample_df, num_works)
-    if report_file:
+    df_profile = get_df_profile(sample_df, num_works, dtype_changes, exact_counts=exact_counts, config=config,
+                                column_timeout=column_timeout, column_memory=column_memory,
+                                checkpoint_file=checkpoint_file)
+    if report_file and Path(report_file).suffix[1:] in EXPORT_TYPES:
+        export_profile(df_profile, report_file, table_name)
+    elif report_file:
         save_report(df_profile, var_per_row, report_file)
     else:
         print_report(df_profile, var_per_row)
-
-
-class ProfileReport(BaseEstimator, TransformerMixin):
-    """print to screen or save a profile report to a file for a given pandas dataframe."""
-
-    def __init__(self,
-                 sample_size: int = DEFAULT_SAMPLE_SIZE,
-                 var_per_row: int = 6,
-                 random_state: int = RANDOM_STATE,
-                 num_works: int = -1) -> None:
-        """Initialize class.
-
-        :param sample_size:
-        :param var_per_row:
-        :param random_state:
-        :param num_works:
-        """
-        self._sample_size = sample_size
-        self._var_per_row = var_per_row
-        self._random_state = random_state
-        self._num_works = num_works
-        self.df_profile = None
-        self._is_new_arg = False
-
-    @property
-    def sample_size(self) -> int:
-        return self._sample_size
-
-    @sample_size.setter
-    def sample_size(self, new_sample_size) -> None:
-        self._sample_size = new_sample_size
-        self._is_new_arg = True
-        print(f"sample size set to {self._sample_size}")
-
-    @property
-    def var_per_row(self) -> int:
-        return self._var_per_row
-
-    @var_per_row.setter
-    def var_per_row(self, new_var_per_row) -> None:
-        self._var_per_row = new_var_per_row
-        self._is_new_arg = True
-        print(f"sample size set to {self._var_per_row}")
-
-    @property
-    def num_works(self) -> int:
-        return self._num_works
-
-    @num_works.setter
-    def num_works(self, new_num_works) -> None:
-        self._num_works = new_num_works
-        self._is_new_arg = True
-        print(f"sample size set to {self._num_works}")
-
-    @property
-    def random_state(self) -> int:
-        return self._random_state
-
-    @random_state.setter
-    def random_state(self, new_random_state) -> None:
-        self._random_state = new_random_state
-        self._is_new_arg = True
-        print(f"sample size set to {self._random_state}")
-
-    def _check_fitted(self) -> None:
-        """
-        Check if the data profile file has been rendered.
-
-        :return:
-        """
-        if not self.df_profile:
-            raise NotFittedError
-
-    def _check_new_args(self) -> None:
-        """
-        Check if the arguments have been updated since last fit.
-
-        :return:
-        """
-        if self._is_new_arg:
-            raise ChangedBehaviorWarning("new args inputted after last fit!")
-
-    def fit(self, df: pd.DataFrame):
-        self._df_to_profile(df)
-        self._is_new_arg = False
-        return self
-
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        self.show_report()
-        return df
-
-    def _df_to_profile(self, df: pd.DataFrame) -> None:
-        """
-        Get the data profile.
-
-        :param df:
-        :return:
-        """
-        if self._sample_size > 0:
-            sample_df = get_a_sample(df, self._sample_size, self._random_state)
-        else:
-            sample_df = df
-
-        self.df_profile = get_df_profile(sample_df, self._num_works)
-
-    def show_report(self) -> None:
-        """
-        Print the data profile to the screen.
-
-        :return:
-        """
-        self._check_fitted()
-        self._check_new_args()
-        print_report(self.df_profile, self._var_per_row)
-
-    def save_report(self, report_file: str) -> None:
-        """
-        Save the data profile to as file.
-
-        :param report_file:
-        :return:
-        """
-        if report_file.split('.')[-1] not in ['md', 'html', 'txt']:
-            raise NotImplementedError("file type doesn't support!")
-        self._check_fitted()
-        self._check_new_args()
-        save_report(self.df_profile, self._var_per_row, report_file)
-        print(f"Report saved to {report_file}")
-
-    def __str__(self):
-        table_fmt = 'psql'
-        line_breaker = '\n'
-        report_str = profile_to_str(self.df_profile, self._var_per_row, table_fmt, line_breaker)
-        return line_breaker.join(report_str)
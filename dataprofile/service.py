@@ -0,0 +1,349 @@
+"""Serve data profiles asynchronously from a shared, bounded pool of workers."""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Optional, Union, Dict, Tuple, Any
+from urllib.parse import urlsplit, parse_qs
+
+import click
+import pandas as pd
+from loguru import logger
+
+from ._config import DEFAULT_SAMPLE_SIZE, RANDOM_STATE
+
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+READ_BLOCK_SIZE = 2 ** 16
+REPORT_TYPES = {'txt': 'text/plain', 'md': 'text/markdown', 'html': 'text/html'}
+
+Source = Union[pd.DataFrame, str, Path, bytes]
+
+
+class ServiceOverloaded(RuntimeError):
+    """Raised when admission control refuses a new profiling request."""
+
+
+def _load_source(source: Source, encoding: str = 'utf8') -> pd.DataFrame:
+    """Turn a profiling source into a pandas DataFrame inside the worker.
+
+    :param source: a DataFrame, the path of a CSV file or the raw bytes of a CSV file
+    :param encoding: encoding of the CSV file
+    :return: the DataFrame to profile
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    if isinstance(source, bytes):
+        return pd.read_csv(io.BytesIO(source), low_memory=False, encoding=encoding)
+    return pd.read_csv(Path(source), low_memory=False, encoding=encoding)
+
+
+def _profile_job(source: Source, sample_size: int, random_state: int, report_type: Optional[str],
+                 var_per_row: int, encoding: str) -> Union[Dict[str, Any], str]:
+    """Profile one source in a worker process.
+
+    :param source: a DataFrame, the path of a CSV file or the raw bytes of a CSV file
+    :param sample_size: Number of rows to sample, -1 for the whole dataset
+    :param random_state: Random seed for the row sampler
+    :param report_type: 'txt', 'md' or 'html' to return a rendered report, None to return the raw profile
+    :param var_per_row: number of columns to show on each row of a rendered report
+    :param encoding: encoding of the CSV file
+    :return: the data profile or its rendered report
+    """
+    from ._profiling import get_df_profile, get_a_sample
+    from .reporting import profile_to_str, _str_format
+
+    df = _load_source(source, encoding)
+    if sample_size > 0:
+        df = get_a_sample(df, sample_size, random_state)
+    # the service owns the parallelism, so each request profiles its columns serially in one worker
+    df_profile = get_df_profile(df, num_works=1)
+    if report_type is None:
+        return df_profile
+    table_fmt, line_breaker = _str_format(f'report.{report_type}')
+    return line_breaker.join(profile_to_str(df_profile, var_per_row, table_fmt, line_breaker)) + '\n'
+
+
+class ProfileService:
+    """Run profiling requests on a shared process pool with admission control and timeouts."""
+
+    def __init__(self, max_workers: int = -1, max_pending: int = -1, timeout: Optional[float] = None) -> None:
+        """Initialize the service.
+
+        :param max_workers: number of worker processes, -1 for all cpu cores
+        :param max_pending: max number of admitted (queued or running) requests, -1 for twice the workers
+        :param timeout: default time limit in seconds for each request, None for no limit
+        """
+        self.max_workers = multiprocessing.cpu_count() if max_workers < 1 else max_workers
+        self.max_pending = 2 * self.max_workers if max_pending < 1 else max_pending
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._n_pending = 0
+
+    @property
+    def n_pending(self) -> int:
+        """Number of requests currently queued or running on the pool."""
+        return self._n_pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the shared pool on first use.
+
+        :return: the shared process pool
+        """
+        if self._executor is None:
+            # forked workers would inherit the server's client sockets and keep connections from closing
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context(method))
+        return self._executor
+
+    def _release(self, _future: Any) -> None:
+        """Free an admission slot once the pool is really done with a request."""
+        self._n_pending -= 1
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, future: Any) -> None:
+        """Hand a finished request back to the event loop that admitted it.
+
+        :param loop: the event loop that submitted the request
+        :param future: the finished request
+        """
+        try:
+            loop.call_soon_threadsafe(self._release, future)
+        except RuntimeError:
+            # the loop is already closed, nobody is left to race with
+            self._release(future)
+
+    async def profile(self, source: Source, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                      random_state: int = RANDOM_STATE, report_type: Optional[str] = None,
+                      var_per_row: int = 6, encoding: str = 'utf8',
+                      timeout: Optional[float] = None) -> Union[Dict[str, Any], str]:
+        """Profile a source without blocking the event loop.
+
+        Cancelling the awaiting task, or running out of time, withdraws a request that is still queued;
+        a request that already started keeps its slot until its worker finishes.
+
+        :param source: a DataFrame, the path of a CSV file or the raw bytes of a CSV file
+        :param sample_size: Number of rows to sample, -1 for the whole dataset
+        :param random_state: Random seed for the row sampler
+        :param report_type: 'txt', 'md' or 'html' to return a rendered report, None to return the raw profile
+        :param var_per_row: number of columns to show on each row of a rendered report
+        :param encoding: encoding of the CSV file
+        :param timeout: time limit in seconds, defaults to the service timeout
+        :return: the data profile or its rendered report
+        """
+        if report_type is not None and report_type not in REPORT_TYPES:
+            raise NotImplementedError("file type doesn't support!")
+        if self._n_pending >= self.max_pending:
+            raise ServiceOverloaded(f"{self._n_pending} requests pending, limit is {self.max_pending}")
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(_profile_job, source, sample_size, random_state, report_type,
+                                             var_per_row, encoding)
+        self._n_pending += 1
+        future.add_done_callback(partial(self._on_done, loop))
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def close(self) -> None:
+        """Shut down the shared pool."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_default_service: Optional[ProfileService] = None
+
+
+def get_service() -> ProfileService:
+    """Return the process-wide service shared by :func:`profile_async`.
+
+    :return: the shared service
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = ProfileService()
+    return _default_service
+
+
+async def profile_async(source: Source, sample_size: int = DEFAULT_SAMPLE_SIZE, random_state: int = RANDOM_STATE,
+                        report_type: Optional[str] = None, var_per_row: int = 6, encoding: str = 'utf8',
+                        timeout: Optional[float] = None) -> Union[Dict[str, Any], str]:
+    """Profile a DataFrame or CSV source on the shared pool.
+
+    :param source: a DataFrame, the path of a CSV file or the raw bytes of a CSV file
+    :param sample_size: Number of rows to sample, -1 for the whole dataset
+    :param random_state: Random seed for the row sampler
+    :param report_type: 'txt', 'md' or 'html' to return a rendered report, None to return the raw profile
+    :param var_per_row: number of columns to show on each row of a rendered report
+    :param encoding: encoding of the CSV file
+    :param timeout: time limit in seconds
+    :return: the data profile or its rendered report
+    """
+    return await get_service().profile(source, sample_size, random_state, report_type, var_per_row, encoding,
+                                       timeout)
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    """Read the request line and headers of an HTTP request.
+
+    :param reader: the client stream
+    :return: method, target and lower-cased headers
+    """
+    request_line = (await reader.readline()).decode('latin-1').strip()
+    method, target, _ = request_line.split(' ', 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        key, _, value = line.partition(':')
+        headers[key.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+async def _spool_body(reader: asyncio.StreamReader, length: int) -> str:
+    """Stream an uploaded body to a temporary file block by block.
+
+    :param reader: the client stream
+    :param length: number of bytes announced by the client
+    :return: path of the temporary file
+    """
+    fd, path = tempfile.mkstemp(suffix='.csv', prefix='dataprofile_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while length > 0:
+                block = await reader.read(min(READ_BLOCK_SIZE, length))
+                if not block:
+                    raise asyncio.IncompleteReadError(block, length)
+                f.write(block)
+                length -= len(block)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _response(writer: asyncio.StreamWriter, status: str, body: str, content_type: str = 'text/plain') -> None:
+    """Write a complete HTTP response.
+
+    :param writer: the client stream
+    :param status: status code and reason
+    :param body: response body
+    :param content_type: media type of the body
+    """
+    payload = body.encode('utf8')
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}; charset=utf-8\r\n"
+                 f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode('latin-1') + payload)
+
+
+async def _handle(service: ProfileService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Answer one HTTP request.
+
+    ``POST /profile?type=txt&sample_size=1000`` with a CSV body returns the rendered report,
+    ``GET /health`` returns the number of pending requests.
+
+    :param service: the service running the profiles
+    :param reader: the client stream
+    :param writer: the client stream
+    """
+    path = None
+    try:
+        method, target, headers = await _read_head(reader)
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method == 'GET' and url.path == '/health':
+            _response(writer, '200 OK', f"ok, {service.n_pending} pending\n")
+        elif method != 'POST' or url.path != '/profile':
+            _response(writer, '404 Not Found', "only POST /profile and GET /health are served\n")
+        elif 'content-length' not in headers:
+            _response(writer, '411 Length Required', "Content-Length is required\n")
+        elif service.n_pending >= service.max_pending:
+            # refuse before reading the upload, so overload doesn't cost disk or bandwidth
+            _response(writer, '503 Service Unavailable', "too many pending requests\n")
+        else:
+            report_type = query.get('type', 'txt')
+            path = await _spool_body(reader, int(headers['content-length']))
+            report = await service.profile(path, sample_size=int(query.get('sample_size', DEFAULT_SAMPLE_SIZE)),
+                                           report_type=report_type,
+                                           var_per_row=int(query.get('var_per_row', 6)),
+                                           encoding=query.get('encoding', 'utf8'),
+                                           timeout=float(query['timeout']) if 'timeout' in query else None)
+            _response(writer, '200 OK', report, REPORT_TYPES[report_type])
+    except ServiceOverloaded as e:
+        _response(writer, '503 Service Unavailable', f"{e}\n")
+    except asyncio.TimeoutError:
+        _response(writer, '504 Gateway Timeout', "profiling timed out\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        logger.warning("client disconnected before the upload finished")
+    except Exception as e:
+        logger.error(f"{e}! Profiling stopped!")
+        _response(writer, '400 Bad Request', f"{e}\n")
+    finally:
+        if path is not None:
+            os.remove(path)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+async def start_server(service: ProfileService, host: str = SERVICE_HOST, port: int = SERVICE_PORT) \
+        -> asyncio.AbstractServer:
+    """Start serving profiling requests on the running event loop.
+
+    :param service: the service running the profiles
+    :param host: interface to listen on
+    :param port: port to listen on, 0 for any free port
+    :return: the listening server
+    """
+    server = await asyncio.start_server(lambda r, w: _handle(service, r, w), host, port)
+    logger.info(f"Serving data profiles on {', '.join(str(s.getsockname()) for s in server.sockets)}")
+    return server
+
+
+async def _serve_forever(service: ProfileService, host: str, port: int) -> None:
+    """Serve until the task is cancelled.
+
+    :param service: the service running the profiles
+    :param host: interface to listen on
+    :param port: port to listen on
+    """
+    server = await start_server(service, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+@click.command()
+@click.option('--host', default=SERVICE_HOST, show_default=True, help='interface to listen on')
+@click.option('--port', default=SERVICE_PORT, show_default=True, help='port to listen on')
+@click.option('--workers', default=-1, show_default=True, help='number of worker processes, -1 for all cores')
+@click.option('--max_pending', default=-1, show_default=True,
+              help='max number of queued or running requests, -1 for twice the workers')
+@click.option('--timeout', default=None, type=float, help='time limit in seconds for each request')
+def serve(host: str = SERVICE_HOST, port: int = SERVICE_PORT, workers: int = -1, max_pending: int = -1,
+          timeout: Optional[float] = None) -> None:
+    """Run a local HTTP service that profiles uploaded CSV files.
+
+    :param host:
+    :param port:
+    :param workers:
+    :param max_pending:
+    :param timeout:
+    :return:
+    """
+    service = ProfileService(workers, max_pending, timeout)
+    try:
+        asyncio.run(_serve_forever(service, host, port))
+    except KeyboardInterrupt:
+        logger.info("Service stopped.")
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    serve()
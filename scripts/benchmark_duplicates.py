@@ -0,0 +1,40 @@
+"""Compare counting duplicate rows with row hashes against DataFrame.duplicated on a wide frame of text."""
+
+import time
+
+import click
+import numpy as np
+import pandas as pd
+
+from dataprofile._duplicates import find_duplicates
+
+
+@click.command()
+@click.option('--n_rows', default=1000000, show_default=True, help='number of rows of the generated frame')
+@click.option('--n_cols', default=40, show_default=True, help='number of columns of each kind')
+def main(n_rows: int, n_cols: int) -> None:
+    """Count the duplicate rows of the same frame both ways and print the times."""
+    rng = np.random.RandomState(0)
+    columns = {'few labels': lambda: pd.Series(rng.randint(0, 50, n_rows)).astype(str).radd('value '),
+               'distinct text': lambda: pd.Series(rng.randint(0, 10 ** 9, n_rows)).astype(str).radd('id '),
+               'numbers': lambda: pd.Series(rng.normal(size=n_rows).round(2))}
+    for kind, column in columns.items():
+        df = pd.DataFrame({f'c{i}': column() for i in range(n_cols)})
+        _compare(kind, pd.concat([df, df.sample(n_rows // 10, random_state=0)], ignore_index=True))
+
+
+def _compare(kind: str, df: pd.DataFrame) -> None:
+    """Time both ways of counting the duplicate rows of a frame."""
+    start = time.perf_counter()
+    expected = int(df.duplicated().sum())
+    pandas_time = time.perf_counter() - start
+    start = time.perf_counter()
+    duplicates = find_duplicates(df)
+    hash_time = time.perf_counter() - start
+    assert duplicates.n_row - duplicates.n_distinct == expected
+    print(f"{kind:>13}: {expected:,d} duplicated rows: "
+          f"duplicated() {pandas_time:.2f} sec, row hashes {hash_time:.2f} sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Measure the load throughput of each CSV reader."""
+
+import tempfile
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+import pandas as pd
+
+from dataprofile._loading import READERS, load_csv
+
+
+def _write_csv(path: Path, n_rows: int) -> None:
+    """Write a CSV file with numeric, text and sparse columns."""
+    rng = np.random.RandomState(0)
+    pd.DataFrame({'id': np.arange(n_rows),
+                  'amount': rng.normal(100, 20, n_rows).round(2),
+                  'count': rng.poisson(3, n_rows),
+                  'label': rng.choice(['red', 'green', 'blue'], n_rows),
+                  'comment': pd.Series(rng.randint(0, 10 ** 6, n_rows)).astype(str).radd('note '),
+                  'sparse': pd.Series(rng.rand(n_rows)).where(rng.rand(n_rows) > 0.9)}).to_csv(path, index=False)
+
+
+@click.command()
+@click.option('--n_rows', default=2000000, show_default=True, help='number of rows of the generated file')
+@click.option('--num_works', default=-1, show_default=True, help='threads of the parallel reader, -1 for all CPUs')
+def main(n_rows: int, num_works: int) -> None:
+    """Load the same file with every reader and print MB/s."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, 'benchmark.csv')
+        _write_csv(path, n_rows)
+        mb = path.stat().st_size / 10 ** 6
+        for reader in READERS:
+            start = time.perf_counter()
+            load_csv(path, reader=reader, num_works=num_works)
+            elapsed = time.perf_counter() - start
+            print(f"{reader:>8}: {mb:.1f}MB in {elapsed:.2f} sec, {mb / elapsed:.1f}MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Count how many times the statistics of each variable scan it for missing and distinct values."""
+
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+
+import click
+import numpy as np
+import pandas as pd
+
+from dataprofile._profiling import _cal_var_stats
+
+sample_data = Path(Path(__file__).absolute().parent.parent, 'data', 'titanic', 'train.csv')
+
+# whole-column scans for missing or distinct values
+_SCANS = [(pd.Series, 'count'), (pd.Series, 'nunique'), (pd.Series, 'isna'), (pd.Series, 'isnull'),
+          (pd.Series, 'notna'), (pd.Series, 'notnull'), (pd.Series, 'dropna'), (pd.Series, 'value_counts'),
+          (pd.Series, 'unique'), (pd, 'factorize'), (pd, 'unique'), (np, 'sort'), (np, 'unique')]
+
+
+def _count_scans(counter: Counter) -> None:
+    """Wrap every scan so that calls count, except the scans nested in another one.
+
+    numpy calls on arrays of at most one item, like pandas sorting the blocks of a frame, aren't scans.
+    """
+    depth = [0]
+
+    def counting(name, func):
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            if not depth[0] and (func.__module__ != 'numpy' or np.size(args[0]) > 1):
+                counter[name] += 1
+            depth[0] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                depth[0] -= 1
+        return wrapped
+
+    for owner, name in _SCANS:
+        setattr(owner, name, counting(name, getattr(owner, name)))
+
+
+@click.command()
+@click.option('--n_rows', default=100000, show_default=True, help='number of rows of the synthetic columns')
+def main(n_rows: int) -> None:
+    """Profile one column of each type and print its scans."""
+    rng = np.random.RandomState(0)
+    titanic = pd.read_csv(sample_data)
+    columns = {'numeric': pd.Series(rng.normal(size=n_rows)).where(rng.rand(n_rows) > 0.1),
+               'binary': pd.Series(rng.choice(['yes', 'no', None], n_rows)),
+               'categorical': pd.Series(rng.choice(list('abcdefgh'), n_rows)),
+               'dates': pd.Series(pd.date_range('2020-01-01', periods=365).astype(str)[rng.randint(0, 365, n_rows)]),
+               'titanic Age': titanic['Age'], 'titanic Sex': titanic['Sex'], 'titanic Cabin': titanic['Cabin']}
+    counter = Counter()
+    _count_scans(counter)
+    for name, series in columns.items():
+        counter.clear()
+        type_, _ = _cal_var_stats(series.rename(name))
+        scans = ', '.join(f'{scan} x{n}' for scan, n in sorted(counter.items()))
+        print(f"{name:>14} ({type_}): {sum(counter.values())} scans: {scans}")
+
+
+if __name__ == "__main__":
+    main()
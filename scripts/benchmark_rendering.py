@@ -0,0 +1,60 @@
+"""Measure how report rendering time grows with the number of variables."""
+
+import time
+from pathlib import Path
+
+import click
+import pandas as pd
+from tabulate import tabulate
+
+from dataprofile._profiling import get_df_profile
+from dataprofile.reporting import profile_to_str
+
+sample_data = Path(Path(__file__).absolute().parent.parent, 'data', 'titanic', 'train.csv')
+
+
+def _widen_profile(df_profile: dict, n_vars: int) -> dict:
+    """Repeat the variables of a profile until every type has about n_vars / n_types of them."""
+    wide = dict(df_profile)
+    per_type = max(n_vars // len(df_profile['var_stats']), 1)
+    wide['var_stats'] = {}
+    for key, item in df_profile['var_stats'].items():
+        copies = [item.rename(index=lambda name, i=i: f'{name}_{i}') for i in range(per_type // len(item) + 1)]
+        wide['var_stats'][key] = pd.concat(copies).iloc[:per_type]
+    return wide
+
+
+def _legacy_var_stats(df_profile: dict, var_per_row: int, table_fmt: str) -> list:
+    """The former rendering loop, which transposed the whole frame for every chunk."""
+    pieces = []
+    for key, item in df_profile['var_stats'].items():
+        for i in range(len(item) // var_per_row + 1):
+            dt = pd.DataFrame(item).T.iloc[:, i * var_per_row:(i + 1) * var_per_row]
+            pieces.append(tabulate(dt, headers='keys', tablefmt=table_fmt) if table_fmt != 'html' else dt.to_html())
+    return pieces
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--table_fmt', default='psql', show_default=True, type=click.Choice(['psql', 'pipe', 'html']))
+@click.option('--var_per_row', default=6, show_default=True, help='number of variables per table')
+@click.option('--legacy/--no-legacy', default=False, show_default=True, help='also time the former rendering loop')
+def main(table_fmt: str, var_per_row: int, legacy: bool) -> None:
+    """Benchmark profile_to_str on profiles of increasing width."""
+    df_profile = get_df_profile(pd.read_csv(sample_data), num_works=1)
+    for n_vars in [500, 1000, 2000, 4000, 8000]:
+        wide = _widen_profile(df_profile, n_vars)
+        elapsed = _timed(profile_to_str, wide, var_per_row, table_fmt)
+        line = f"{n_vars:>5} variables: {elapsed:.2f} sec, {elapsed / n_vars * 1e3:.3f} ms/variable"
+        if legacy:
+            line += f" (former loop: {_timed(_legacy_var_stats, wide, var_per_row, table_fmt):.2f} sec)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure the throughput of the profiling service with a local load generator."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import click
+
+from dataprofile.service import ProfileService, start_server
+
+sample_data = Path(Path(__file__).absolute().parent.parent, 'data', 'titanic', 'train.csv')
+
+
+async def _post(port: int, body: bytes) -> int:
+    """Upload one file and return the HTTP status code."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"POST /profile?type=txt HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    await reader.read()
+    writer.close()
+    return status
+
+
+async def _run(workers: int, concurrency: int, n_requests: int) -> None:
+    """Fire n_requests uploads, at most concurrency at a time, and report requests/sec."""
+    service = ProfileService(max_workers=workers, max_pending=concurrency)
+    server = await start_server(service, port=0)
+    port = server.sockets[0].getsockname()[1]
+    body = sample_data.read_bytes()
+    await _post(port, body)  # warm up the workers
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one() -> int:
+        async with slots:
+            return await _post(port, body)
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(one() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    service.close()
+    n_ok = sum(status == 200 for status in statuses)
+    print(f"workers={workers} concurrency={concurrency}: {n_ok}/{n_requests} ok in {elapsed:.2f} sec, "
+          f"{n_ok / elapsed:.1f} requests/sec")
+
+
+@click.command()
+@click.option('--workers', default=4, show_default=True, help='number of worker processes')
+@click.option('--concurrency', default=8, show_default=True, help='number of concurrent clients')
+@click.option('--n_requests', default=100, show_default=True, help='total number of uploads')
+def main(workers: int, concurrency: int, n_requests: int) -> None:
+    """Benchmark the local profiling service."""
+    asyncio.run(_run(workers, concurrency, n_requests))
+
+
+if __name__ == "__main__":
+    main()
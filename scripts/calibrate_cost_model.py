@@ -0,0 +1,71 @@
+"""Calibrate the cost model that plans profiling runs, or refine it on the runs recorded since."""
+
+import multiprocessing
+import pickle
+import time
+
+import click
+import numpy as np
+import pandas as pd
+
+from dataprofile._profiling import _cal_var_stats
+from dataprofile._tuning import KINDS, CostModel, column_mb, load_runs
+
+
+def _columns(n_rows: int) -> dict:
+    """Generate a column of each kind of dtype."""
+    rng = np.random.RandomState(0)
+    return {'numeric': pd.Series(rng.normal(size=n_rows)).where(rng.rand(n_rows) > 0.1),
+            'boolean': pd.Series(rng.rand(n_rows) > 0.5),
+            'datetime': pd.Series(pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.randint(0, 10 ** 8, n_rows), 's')),
+            'object': pd.Series(rng.randint(0, n_rows // 10, n_rows)).astype(str).radd('label ')}
+
+
+def _seconds(func, repeat: int = 3) -> float:
+    """Best time of a few calls of a function."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@click.command()
+@click.option('--n_rows', default=200000, show_default=True, help='rows of the largest generated columns')
+@click.option('--refine', is_flag=True, default=False, help='fit the model again on the recorded runs instead')
+def main(n_rows: int, refine: bool) -> None:
+    """Measure the throughput of each kind of column and the cost of a pool, and save the model."""
+    if refine:
+        runs = load_runs()
+        model = CostModel.load().refit(runs)
+        print(f"refitted on {len(runs)} runs: {model}")
+        model.save()
+        return
+
+    seconds_per_mb, column_seconds = {}, []
+    small, large = _columns(n_rows // 10), _columns(n_rows)
+    for kind in KINDS:
+        # two sizes separate the fixed cost of a column from its cost per MB
+        t_small = _seconds(lambda: _cal_var_stats(small[kind].rename(kind)))
+        t_large = _seconds(lambda: _cal_var_stats(large[kind].rename(kind)))
+        mb_small, mb_large = column_mb(small[kind]), column_mb(large[kind])
+        seconds_per_mb[kind] = max((t_large - t_small) / (mb_large - mb_small), 0.)
+        column_seconds.append(max(t_small - seconds_per_mb[kind] * mb_small, 0.))
+        print(f"{kind:>9}: {1 / seconds_per_mb[kind] if seconds_per_mb[kind] else np.inf:.1f}MB/s")
+
+    n_works = max(2, multiprocessing.cpu_count())
+
+    def start_pool():
+        with multiprocessing.Pool(n_works) as pool:
+            pool.map(abs, range(n_works))
+    worker_startup = _seconds(start_pool) / n_works
+    column = large['object']
+    transfer = column_mb(column) / _seconds(lambda: pickle.loads(pickle.dumps(column, pickle.HIGHEST_PROTOCOL)))
+    model = CostModel(seconds_per_mb, float(np.median(column_seconds)), worker_startup, transfer)
+    print(model)
+    model.save()
+
+
+if __name__ == "__main__":
+    main()
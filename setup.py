@@ -21,12 +21,15 @@ setuptools.setup(
     url="https://github.com/SwordKnight6216/dataprofile",
     packages=setuptools.find_packages(),
     install_requires=required,
+    extras_require={'sklearn': ['scikit-learn'], 'parquet': ['pyarrow'], 'zstd': ['zstandard']},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: GNU AGPLv3",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
     entry_points={'console_scripts': ['dataprofile_single=dataprofile.cli_report:render_single_file_report',
-                                      'dataprofile_all=dataprofile.batch_cli_reports:render_reports_for_all']}
+                                      'dataprofile_all=dataprofile.batch_cli_reports:render_reports_for_all',
+                                      'dataprofile_watch=dataprofile.batch_cli_reports:watch_reports',
+                                      'dataprofile_serve=dataprofile.service:serve']}
 )
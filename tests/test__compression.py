@@ -0,0 +1,41 @@
+import bz2
+import gzip
+import lzma
+import os
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from dataprofile._compression import ThreadedReader, file_sizes, is_csv, open_csv, strip_compression
+from dataprofile._loading import load_csv
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+@pytest.mark.parametrize("suffix, compress", [('.gz', gzip.compress), ('.bz2', bz2.compress), ('.xz', lzma.compress)])
+def test_load_compressed_csv(tmp_path, suffix, compress):
+    with open(TEST_FILE, 'rb') as f:
+        text = f.read()
+    file = tmp_path / f'train.csv{suffix}'
+    file.write_bytes(compress(text))
+    assert file_sizes(file)[0] == file.stat().st_size
+    assert abs(file_sizes(file)[1] - len(text)) < 0.01 * len(text)
+    assert_frame_equal(load_csv(file, reader='parallel'), pd.read_csv(TEST_FILE))
+    with open_csv(file) as source:
+        assert sum(len(chunk) for chunk in pd.read_csv(source, chunksize=100)) == 891
+
+
+def test_threaded_reader_stops_early(tmp_path):
+    file = tmp_path / 'big.gz'
+    file.write_bytes(gzip.compress(b'0123456789' * 10 ** 6))
+    reader = ThreadedReader(gzip.open(file), block_size=1000, n_blocks=2)
+    assert reader.read(5) == b'01234'
+    reader.close()
+    assert not reader.thread.is_alive()
+
+
+def test_csv_names():
+    assert is_csv('train.csv') and is_csv('train.CSV.zst') and not is_csv('train.txt.gz')
+    assert strip_compression('data/train.csv.bz2') == 'data/train.csv'
+    assert file_sizes(TEST_FILE) == (61194, None)
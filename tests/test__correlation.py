@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataprofile._correlation import cramers_v, get_correlations, numeric_correlations
+from dataprofile._profile_config import ProfileConfig
+from dataprofile._profiling import get_df_profile
+
+
+@pytest.fixture()
+def numeric_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(500, 12)), columns=[f'x{i}' for i in range(12)])
+    df['x5'] = 2 * df['x3'] + rng.normal(size=500) * 0.1
+    df['x7'] = -df['x3'] + rng.normal(size=500)
+    df.iloc[:, 8:] = df.iloc[:, 8:].mask(rng.random((500, 4)) < 0.1)
+    return df
+
+
+@pytest.mark.parametrize("block_size", [3, 512])
+def test_pearson_matches_pandas(numeric_df, block_size):
+    pairs = numeric_correlations(numeric_df, 'pearson', top_n=10, block_size=block_size)
+    expected = numeric_df.corr()
+    assert len(pairs) == 10
+    assert (pairs['var_a'].iloc[0], pairs['var_b'].iloc[0]) == ('x3', 'x5')
+    for _, pair in pairs.iterrows():
+        assert pair['value'] == pytest.approx(expected.loc[pair['var_a'], pair['var_b']])
+        assert pair['n_obs'] == numeric_df[[pair['var_a'], pair['var_b']]].dropna().shape[0]
+
+
+def test_spearman_matches_pandas_without_missing(numeric_df):
+    complete = numeric_df.iloc[:, :8]
+    pairs = numeric_correlations(complete, 'spearman', top_n=5, block_size=3)
+    expected = complete.corr('spearman')
+    for _, pair in pairs.iterrows():
+        assert pair['value'] == pytest.approx(expected.loc[pair['var_a'], pair['var_b']])
+
+
+def test_cramers_v_matches_crosstab(test_df):
+    df = test_df[['Survived', 'Sex', 'Embarked', 'Pclass']]
+    pairs = cramers_v(df, top_n=10, block_size=4)
+    assert len(pairs) == 6
+    for _, pair in pairs.iterrows():
+        table = pd.crosstab(df[pair['var_a']], df[pair['var_b']]).to_numpy()
+        n = table.sum()
+        expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / n
+        chi2 = ((table - expected) ** 2 / expected).sum()
+        assert pair['value'] == pytest.approx(np.sqrt(chi2 / n / (min(table.shape) - 1)))
+        assert pair['n_obs'] == n
+
+
+def test_get_correlations_samples_rows(numeric_df):
+    pairs = get_correlations(numeric_df, list(numeric_df.columns), [], top_n=3, sample_rows=100)
+    assert list(pairs['method']) == ['pearson'] * 3 + ['spearman'] * 3
+    assert (pairs['n_obs'] <= 100).all()
+
+
+def test_profile_correlations(test_df):
+    df_profile = get_df_profile(test_df, num_works=1)
+    correlations = df_profile['correlations']
+    assert set(correlations['method']) == {'pearson', 'spearman', 'cramers_v'}
+    assert 'Ticket' not in set(correlations['var_a']) | set(correlations['var_b'])
+    assert 'correlations' not in get_df_profile(test_df, num_works=1, top_correlations=0)
+
+
+def test_correlations_of_forced_and_nullable_variables(test_df):
+    # Ticket is text configured as Interval, its numbers correlate and the rest count as missing
+    df = test_df.assign(Parch=test_df['Parch'].astype('Int64').mask(test_df['Parch'] > 4))
+    pairs = get_correlations(df, ['Ticket', 'Parch', 'SibSp'], [], top_n=3)
+    ticket = pd.to_numeric(test_df['Ticket'], errors='coerce')
+    pair = pairs[(pairs['method'] == 'pearson') & (pairs['var_a'] + pairs['var_b']).str.contains('Ticket')
+                 & (pairs['var_a'] + pairs['var_b']).str.contains('SibSp')]
+    assert pair['value'].iloc[0] == pytest.approx(ticket.corr(test_df['SibSp']))
+    assert pair['n_obs'].iloc[0] == ticket.count()
+
+    config = ProfileConfig(type_overrides={'Ticket': 'Interval'})
+    correlations = get_df_profile(test_df, num_works=1, config=config)['correlations']
+    assert 'Ticket' in set(correlations['var_a']) | set(correlations['var_b'])
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from dataprofile._drift import compare_profiles, format_drift, quantile_drift
+from dataprofile._profiling import get_df_profile
+from dataprofile.reporting import profile_to_str
+
+
+@pytest.fixture()
+def df_profile(test_df):
+    return get_df_profile(test_df, num_works=1)
+
+
+def test_compare_profiles_identical(df_profile):
+    drift = compare_profiles(df_profile, df_profile)
+    assert not drift['drifted'].any()
+    assert (drift['status'] == 'common').all()
+    assert np.allclose(drift['psi'].dropna(), 0) and np.allclose(drift['ks'].dropna(), 0)
+
+
+def test_compare_profiles_detects_drift(df_profile, test_df):
+    current = test_df.drop(columns='Cabin').assign(Age=test_df['Age'] + 10, extra=1.5)
+    current.loc[:300, 'Embarked'] = 'Q'
+    drift = compare_profiles(df_profile, get_df_profile(current, num_works=1))
+    assert drift.loc['Cabin', 'status'] == 'dropped' and drift.loc['extra', 'status'] == 'new'
+    assert drift.loc['Age', 'psi'] > 0.2 and drift.loc['Age', 'ks'] > 0.1
+    assert drift.loc['Embarked', 'top_k_shift'] > 0.1
+    assert set(drift.index[drift['drifted']]) == {'Age', 'Cabin', 'Embarked', 'extra'}
+    assert list(format_drift(drift).index) == ['Age', 'Cabin', 'Embarked', 'extra']
+
+
+def test_quantile_drift_approximates_ks():
+    rng = np.random.default_rng(0)
+    baseline = rng.normal(size=100000)
+    levels = [0, 5, 25, 50, 75, 95, 100]
+    for shift, exact_ks in [(0.3, 0.118), (1, 0.383)]:
+        current = rng.normal(loc=shift, size=100000)
+        psi, ks = quantile_drift(np.percentile(baseline, levels)[None], np.percentile(current, levels)[None])
+        assert ks[0] == pytest.approx(exact_ks, abs=0.02)
+        assert psi[0] > 0
+
+
+def test_drift_section_in_report(df_profile, test_df):
+    current = get_df_profile(test_df.assign(Fare=test_df['Fare'] * 3), num_works=1)
+    current['drift'] = compare_profiles(df_profile, current)
+    report = '\n'.join(profile_to_str(current))
+    assert '1 of 13 variables drifted' in report
+    assert '| Fare ' in report
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataprofile._duplicates import HashIndex, check_keys, find_duplicates, key_candidates, row_hashes
+from dataprofile._profiling import get_df_profile
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+def test_row_hashes_ignore_dtype():
+    df = pd.DataFrame({'a': [1, 2, 2], 'b': ['x', None, None], 'c': [None] * 3})
+    widened = df.astype({'a': 'float64', 'b': 'category'})
+    assert (row_hashes(df) == row_hashes(widened)).all()
+    assert row_hashes(df)[1] == row_hashes(df)[2] != row_hashes(df)[0]
+
+
+def test_row_hashes_keep_values_apart():
+    # int64 past 2 ** 53 would collide as float64, and hash_array reads objects as text, folding 1 into '1'
+    df = pd.DataFrame({'id': 1500000000000000000 + np.arange(1000), 'v': 1})
+    assert df.duplicated().sum() == 0
+    assert get_df_profile(df, 1)['table_stats'].loc['n_duplicated_row', 'count'] == '0'
+    mixed = pd.DataFrame({'a': np.array([1, '1'] * 600, dtype=object)})
+    assert find_duplicates(mixed, 0).n_distinct == len(mixed) - mixed.duplicated().sum() == 2
+    assert find_duplicates(pd.DataFrame({'a': [1, 1.0, 2.5, np.nan, None]}, dtype=object), 0).n_distinct == 3
+
+
+def test_row_hashes_keep_zero_apart_from_missing():
+    # the key of 0 hashes to 0, the hash of missing values
+    df = pd.DataFrame({'a': [0, np.nan, 1, 2], 'b': ['x', 'x', 'y', 'z']})
+    assert find_duplicates(df, 0).n_distinct == 4
+    assert get_df_profile(df, 1)['table_stats'].loc['n_duplicated_row', 'count'] == '0'
+    for values in ([0, -0.0, None], [0, None, 0]):
+        df = pd.DataFrame({'a': pd.Series(values, dtype=object), 'b': 'x'})
+        assert find_duplicates(df, 0).n_distinct == len(df) - df.duplicated().sum()
+
+
+def test_find_duplicates():
+    df = pd.read_csv(TEST_FILE)
+    df = pd.concat([df, df.head(3), df.head(1)], ignore_index=True)
+    duplicates = find_duplicates(df, top_n=2)
+    assert duplicates.n_row - duplicates.n_distinct == df.duplicated().sum() == 4
+    assert duplicates.groups.to_dict('list') == {'n_copies': [3, 2], 'first_row': [0, 1]}
+
+
+def test_hash_index_spills():
+    rng = np.random.RandomState(0)
+    hashes = rng.randint(0, 5000, 20000).astype(np.uint64) * np.uint64(2 ** 50)
+    with HashIndex(memory_budget=16 * 3000) as index:
+        for chunk in np.array_split(hashes, 7):
+            index.add(chunk)
+        assert len(index.runs) > 1
+        counts = index.count(top_n=3)
+    assert counts.n_distinct == len(np.unique(hashes))
+    values, first, copies = np.unique(hashes, return_index=True, return_counts=True)
+    top = np.lexsort((first, -copies))[:3]
+    assert counts.groups['n_copies'].tolist() == copies[top].tolist()
+    assert counts.groups['first_row'].tolist() == first[top].tolist()
+
+
+def test_check_keys():
+    df = pd.DataFrame({'order': np.repeat(np.arange(50), 2), 'line': np.tile([1, 2], 50),
+                       'id': np.arange(100), 'note': ['a'] * 100})
+    profile = get_df_profile(df, num_works=1)
+    candidates = key_candidates(profile['raw_stats'], len(df), min_p_unique=0.02)
+    assert list(candidates.index) == ['id', 'order', 'line']
+    keys = check_keys(df, candidates, len(df)).set_index('key')
+    assert keys['is_unique'].to_dict() == {'id': True, 'order, line': True, 'order': False, 'line': False}
+    assert keys.loc['order', 'n_duplicated'] == 50
+    # on a sample only the single columns can be decided
+    assert list(check_keys(None, candidates, len(df))['key']) == ['id', 'order', 'line']
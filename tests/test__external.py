@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+from dataprofile._external import count_exact, n_partitions
+from dataprofile._profiling import get_df_profile
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+@pytest.fixture()
+def titanic_dup(tmp_path):
+    df = pd.read_csv(TEST_FILE)
+    file = tmp_path / 'titanic_dup.csv'
+    pd.concat([df, df.head(50)]).to_csv(file, index=False)
+    return file
+
+
+def test_n_partitions():
+    assert n_partitions(10, 100) == 1
+    assert n_partitions(1000, 100) == 40
+
+
+def test_count_exact(titanic_dup):
+    df = pd.read_csv(titanic_dup, dtype=str)
+    # a tiny budget and chunks spread every column over many partitions
+    counts, sample = count_exact(titanic_dup, sample_rows=100, memory_budget=10 ** 4, chunk_rows=97)
+    assert counts.n_row == len(df)
+    assert counts.n_duplicated_row == df.duplicated().sum() == 50
+    assert counts.duplicates.groups['n_copies'].tolist() == [2] * 5
+    assert counts.n_missing_cell == df.isnull().sum().sum()
+    for col in df:
+        assert counts.columns[col].n_unique == df[col].nunique()
+        assert counts.columns[col].n_missing == df[col].isnull().sum()
+        top = counts.columns[col].top
+        assert top.tolist() == df[col].value_counts().head(len(top)).tolist()
+    assert counts.columns['Embarked'].top.to_dict() == df['Embarked'].value_counts().to_dict()
+    assert sample.shape == (100, df.shape[1])
+    assert pd.api.types.is_integer_dtype(sample['Survived'])
+
+
+def test_get_df_profile_with_exact_counts(titanic_dup):
+    df = pd.read_csv(titanic_dup)
+    counts, sample = count_exact(titanic_dup, sample_rows=50, memory_budget=10 ** 4)
+    df_profile = get_df_profile(sample, num_works=1, exact_counts=counts)
+    table_stats = df_profile['table_stats']['count'].to_dict()
+    assert table_stats['n_row'] == f"{len(df):,d}"
+    assert table_stats['n_duplicated_row'] == '50'
+    raw_stats = pd.concat(df_profile['raw_stats'].values(), sort=False)
+    assert raw_stats.loc['Embarked', 'type'] == 'Nominal'
+    assert raw_stats.loc['Embarked', 'n_unique'] == 3
+    assert raw_stats.loc['Embarked', 'mode'] == 'S'
+    assert raw_stats.loc['Embarked', 'mode_freq'] == (df['Embarked'] == 'S').sum()
+    assert raw_stats.loc['Sex', 'n_value1'] == (df['Sex'] == 'male').sum()
+    assert raw_stats.loc['Age', 'n_missing'] == df['Age'].isnull().sum()
+    assert raw_stats.loc['Age', 'n_unique'] == df['Age'].nunique()
+
+
+def test_exact_counts_of_missing_cells_outside_the_sample(tmp_path):
+    # one value plus a missing cell the sample doesn't hold: a binary variable with 'nan' as its second value
+    file = tmp_path / 'flag.csv'
+    pd.DataFrame({'flag': ['y'] * 4999 + [None], 'n': range(5000)}).to_csv(file, index=False)
+    counts, sample = count_exact(file, sample_rows=100)
+    assert sample['flag'].notna().all()
+    raw_stats = pd.concat(get_df_profile(sample, num_works=1, exact_counts=counts)['raw_stats'].values(), sort=False)
+    assert raw_stats.loc['flag', ['value1', 'n_value1', 'value2', 'n_value2']].tolist() == ['y', 4999, 'nan', 1]
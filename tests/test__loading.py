@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from dataprofile._loading import infer_category_columns, infer_compact_dtypes, load_csv, load_compact_csv, \
+    read_csv_parallel
+from dataprofile._profile_config import ProfileConfig
+from dataprofile._profiling import get_df_profile
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+def test_infer_category_columns():
+    assert infer_category_columns(TEST_FILE) == ['Sex', 'Embarked']
+
+
+def test_load_csv_as_category():
+    df = load_csv(TEST_FILE, as_category=True)
+    assert pd.api.types.is_categorical_dtype(df['Sex'])
+    assert df['Name'].dtype == object
+    assert df['Embarked'].astype(object).equals(load_csv(TEST_FILE)['Embarked'])
+
+
+def test_infer_compact_dtypes():
+    chunks = [pd.DataFrame({'small': [1, 2], 'signed': [-1, 300], 'exact': [0.5, None], 'inexact': [0.1, 1.0],
+                            'label': ['a', 'a']}),
+              pd.DataFrame({'small': [3, 255], 'signed': [5, 6], 'exact': [1.25, 2.0], 'inexact': [2.0, 3.0],
+                            'label': ['a', None]})]
+    changes, _ = infer_compact_dtypes(chunks)
+    assert changes == {'small': ('int64', 'uint8'),
+                       'signed': ('int64', 'int16'),
+                       'exact': ('float64', 'float32'),
+                       'label': ('object', 'category')}
+    # integer chunks next to float ones narrow to float32 only while float32 holds them exactly
+    chunks = [pd.DataFrame({'id': [123456789, 5], 'count': [2 ** 24, 1]}),
+              pd.DataFrame({'id': [np.nan, np.nan], 'count': [0.5, np.nan]})]
+    assert infer_compact_dtypes(chunks)[0] == {'count': ('float64', 'float32')}
+
+
+def test_load_compact_csv_keeps_profile(test_df):
+    df, changes = load_compact_csv(TEST_FILE, chunk_rows=100)
+    df['no_values'] = None
+    assert df['Pclass'].dtype == 'uint8'
+    compact_profile = get_df_profile(df, num_works=1, dtype_changes=changes)
+    profile = get_df_profile(test_df, num_works=1)
+    for key in ['table_stats', 'var_summary']:
+        assert_frame_equal(compact_profile[key], profile[key])
+    for key, item in profile['var_stats'].items():
+        assert_frame_equal(compact_profile['var_stats'][key], item)
+    assert compact_profile['dtype_changes'].loc['Pclass', 'original_dtype'] == 'int64'
+
+
+@pytest.mark.parametrize("reader", ['parallel', 'pyarrow'])
+def test_readers_match_pandas(reader):
+    config = ProfileConfig(exclude=['Name', 'Tick.*'])
+    df = load_csv(TEST_FILE, reader=reader, config=config)
+    assert_frame_equal(df, pd.read_csv(TEST_FILE).drop(columns=['Name', 'Ticket']))
+
+
+def test_read_csv_parallel_mixed_and_quoted(tmp_path):
+    mixed = tmp_path / 'mixed.csv'
+    mixed.write_text('a,b,c\n' + ''.join(f'{i},{i % 2 == 0},\n' for i in range(300)) + 'x,1,\n'
+                     + ''.join(f'{i},True,\n' for i in range(300)))
+    assert_frame_equal(read_csv_parallel(mixed, chunk_bytes=1000, num_works=2), pd.read_csv(mixed))
+    assert_frame_equal(read_csv_parallel(mixed, chunk_bytes=1000, dtype={'b': 'category'}),
+                       pd.read_csv(mixed, dtype={'b': 'category'}))
+    flags = tmp_path / 'flags.csv'
+    flags.write_text('a,c\n' + 'True,1\nFalse,2\n' * 5000 + ',3\nTrue,4\n' * 5000)
+    assert_frame_equal(read_csv_parallel(flags, chunk_bytes=10000), pd.read_csv(flags))
+    flags.write_text('a,c\n' + 'True,1\nFalse,2\n' * 5000 + ',3\nx,4\n' * 5000)
+    assert_frame_equal(read_csv_parallel(flags, chunk_bytes=10000), pd.read_csv(flags))
+    unsigned = tmp_path / 'unsigned.csv'
+    unsigned.write_text('a,c\n' + ''.join(f'{i},{i}\n' for i in range(3000)) + '18446744073709551615,0\n')
+    assert_frame_equal(read_csv_parallel(unsigned, chunk_bytes=1000), pd.read_csv(unsigned))
+    unsigned.write_text('a,c\n-1,0\n' + ''.join(f'{i},{i}\n' for i in range(3000)) + '18446744073709551615,0\n')
+    assert_frame_equal(read_csv_parallel(unsigned, chunk_bytes=1000), pd.read_csv(unsigned))
+    wide = tmp_path / 'wide.csv'
+    header = ','.join(f'column_{i}' for i in range(31))
+    wide.write_text(header + '\n' + ''.join(','.join([str(row), 'True'] * 15 + ['x']) + '\n' for row in range(10)))
+    assert_frame_equal(read_csv_parallel(wide, num_works=8), pd.read_csv(wide))
+    wide.write_text(header + '\n')
+    assert_frame_equal(read_csv_parallel(wide, num_works=8), pd.read_csv(wide))
+    quoted = tmp_path / 'quoted.csv'
+    quoted.write_text('a,b\n' + ''.join(f'{i},"line\nbreak {i}"\n' for i in range(300)))
+    assert_frame_equal(read_csv_parallel(quoted, chunk_bytes=1000), pd.read_csv(quoted))
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataprofile._missingness import co_missing, count_empty_rows, describe_missingness, missing_patterns, \
+    null_bitmaps, popcount
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+@pytest.fixture()
+def test_df():
+    df = pd.read_csv(TEST_FILE)
+    df.loc[df['Age'].isna(), 'Fare'] = np.nan
+    df.loc[:4, :] = np.nan
+    return df
+
+
+def test_popcount():
+    words = np.random.RandomState(0).randint(0, 2 ** 63, (3, 5), dtype=np.uint64)
+    expected = [sum(bin(int(word)).count('1') for word in row) for row in words]
+    assert popcount(words).tolist() == expected
+
+
+def test_null_bitmaps(test_df):
+    bitmaps = null_bitmaps(test_df)
+    missing = test_df.isnull()
+    assert bitmaps.n_missing.tolist() == missing.sum().tolist()
+    assert count_empty_rows(bitmaps) == missing.all(axis=1).sum() == 5
+    # a block of one byte per column still counts every pair
+    both = co_missing(bitmaps, block_cells=1)
+    expected = missing.astype(int).T @ missing.astype(int)
+    np.testing.assert_array_equal(both, expected.to_numpy())
+
+
+def test_missing_patterns(test_df):
+    patterns = missing_patterns(null_bitmaps(test_df), top_n=3)
+    expected = test_df[['Age', 'Fare', 'Cabin', 'Embarked']].isnull().value_counts().head(3)
+    assert patterns['n_row'].tolist() == expected.tolist()
+    assert patterns['missing_columns'].tolist() == ['Cabin', '(none)', 'Age, Fare, Cabin']
+    assert patterns['n_missing_col'].tolist() == [1, 0, 3]
+
+
+def test_describe_missingness(test_df):
+    missingness = describe_missingness(null_bitmaps(test_df), top_n=3)
+    corr = missingness['nullity_corr']
+    assert list(corr.columns) == list(test_df.columns)
+    np.testing.assert_allclose(corr.to_numpy(), test_df.isnull().corr().to_numpy())
+    pairs = missingness['missing_pairs']
+    assert len(pairs) == 3 and (pairs['nullity_corr'] == 1).all()
+
+    # columns never or always missing are left out of the pairs
+    missingness = describe_missingness(null_bitmaps(test_df.iloc[5:].assign(Empty=np.nan)), max_matrix_columns=3)
+    assert 'nullity_corr' not in missingness
+    assert tuple(missingness['missing_pairs'].loc[0, ['var_a', 'var_b', 'n_both']]) == ('Age', 'Fare', 177)
+    assert set(missingness['missing_pairs'][['var_a', 'var_b']].stack()) == {'Age', 'Fare', 'Cabin', 'Embarked'}
+    assert describe_missingness(null_bitmaps(test_df.dropna())) == {}
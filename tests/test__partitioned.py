@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataprofile._partitioned import count_partitions, is_partitioned
+from dataprofile._profiling import get_df_profile
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+@pytest.fixture()
+def titanic_dup():
+    df = pd.read_csv(TEST_FILE)
+    return pd.concat([df, df.head(50)], ignore_index=True)
+
+
+def _infer_ints(part):
+    # each partition infers its own dtypes, like read_csv: a float column is int64 where no value is missing
+    ints = [col for col in part.select_dtypes('float') if part[col].notna().all() and (part[col] % 1 == 0).all()]
+    return part.astype({col: 'int64' for col in ints})
+
+
+def _partitions(df, n_rows):
+    return (_infer_ints(df.iloc[i:i + n_rows]) for i in range(0, len(df), n_rows))
+
+
+def test_is_partitioned(titanic_dup):
+    assert is_partitioned(iter([titanic_dup]))
+    assert not is_partitioned(titanic_dup)
+    assert not is_partitioned('test')
+
+
+def test_count_partitions(titanic_dup):
+    counts, sample = count_partitions(_partitions(titanic_dup, 97), num_works=2, sample_rows=100)
+    assert counts.n_row == len(titanic_dup)
+    assert counts.n_duplicated_row == titanic_dup.duplicated().sum() == 50
+    assert counts.n_missing_cell == titanic_dup.isnull().sum().sum()
+    assert len(sample) == 100 and list(sample.columns) == list(titanic_dup.columns)
+    for col in titanic_dup:
+        assert counts.columns[col].n_unique == titanic_dup[col].nunique()
+        assert counts.columns[col].n_missing == titanic_dup[col].isnull().sum()
+        top = titanic_dup[col].value_counts()
+        assert counts.columns[col].top.iloc[0] == top.iloc[0]
+    aggregates = counts.columns['Fare'].aggregates
+    assert aggregates['mean'] == pytest.approx(titanic_dup['Fare'].mean())
+    assert aggregates['std'] == pytest.approx(titanic_dup['Fare'].std())
+    assert aggregates['n_zeros'] == (titanic_dup['Fare'] == 0).sum()
+    assert counts.columns['Name'].aggregates is None
+
+
+def test_count_partitions_large_ids():
+    # IDs past 2 ** 53 are distinct as int64, and in a chunk widened to float64 by a missing value
+    ids = pd.DataFrame({'id': 1500000000000000000 + np.arange(1000), 'v': 1})
+    parts = [ids.iloc[:400], ids.iloc[400:], pd.DataFrame({'id': [np.nan, 1500000000000000000.], 'v': 1})]
+    counts, _ = count_partitions(iter(parts), num_works=1)
+    assert counts.columns['id'].n_unique == 1000
+    assert counts.n_duplicated_row == 1
+
+
+def test_count_partitions_reproducible(titanic_dup):
+    _, sample = count_partitions(_partitions(titanic_dup, 200), num_works=1, sample_rows=50)
+    _, again = count_partitions(_partitions(titanic_dup, 200), num_works=1, sample_rows=50)
+    pd.testing.assert_frame_equal(sample, again)
+
+
+def test_get_df_profile_partitioned(titanic_dup):
+    profile = get_df_profile(_partitions(titanic_dup, 300), num_works=1)
+    table_stats = profile['table_stats']['count'].to_dict()
+    assert table_stats['n_row'] == f"{len(titanic_dup):,d}"
+    assert table_stats['n_duplicated_row'] == '50'
+    assert profile['raw_stats']['Interval'].loc['Fare', 'mean'] == pytest.approx(titanic_dup['Fare'].mean())
+
+
+def test_count_partitions_dask(titanic_dup):
+    dd = pytest.importorskip('dask.dataframe')
+    frame = dd.from_pandas(titanic_dup, npartitions=4)
+    counts, sample = count_partitions(frame, sample_rows=100, scheduler='processes')
+    assert counts.n_row == len(titanic_dup)
+    assert counts.n_duplicated_row == 50
+    assert counts.columns['Cabin'].n_unique == titanic_dup['Cabin'].nunique()
+    assert np.isclose(counts.columns['Age'].aggregates['variance'], titanic_dup['Age'].var())
+    assert len(sample) == 100
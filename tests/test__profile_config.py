@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from dataprofile._profile_config import ProfileConfig
+from dataprofile._profiling import get_df_profile, _cal_var_stats
+
+
+def test_select():
+    config = ProfileConfig(include=['Pclass', 'S.*', 'Age(years)'], exclude=['SibSp'])
+    assert config.select(['PassengerId', 'Pclass', 'Sex', 'SibSp', 'Age(years)']) == ['Pclass', 'Sex', 'Age(years)']
+    assert ProfileConfig(exclude=['.*Id']).select(['PassengerId', 'Name']) == ['Name']
+
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        ProfileConfig(type_skips={'Interval': ['median']})
+    with pytest.raises(ValueError):
+        ProfileConfig(type_overrides={'Age': 'Float'})
+    with pytest.raises(ValueError):
+        ProfileConfig(type_rules={'Float': ['iqr']})
+
+
+def test_skipped_groups_are_not_computed(test_df):
+    config = ProfileConfig(type_skips={'Interval': ['moments', 'histogram']},
+                           column_skips={'Name': ['top_k'], 'Fare': ['quantiles']})
+    _, age = _cal_var_stats(test_df['Age'], config=config)
+    assert '50%' in age and 'mean' not in age and 'histogram' not in age
+    _, fare = _cal_var_stats(test_df['Fare'], config=config)
+    assert '50%' not in fare and 'iqr' not in fare and 'min' in fare
+    type_, name = _cal_var_stats(test_df['Name'].head(100).append(test_df['Name'].head(1)), config=config)
+    assert type_ == 'Nominal' and 'mode' not in name
+
+
+def test_datetime_detection_skipped():
+    series = pd.Series(['2020-01-01', '2020-01-02', '2020-01-03', '2020-01-03'], name='day')
+    assert _cal_var_stats(series)[0] == 'Datetime'
+    type_, stats = _cal_var_stats(series, config=ProfileConfig(column_skips={'day': ['datetime']}))
+    assert type_ == 'Nominal' and stats['mode'] == '2020-01-03'
+
+
+def test_type_overrides(test_df):
+    config = ProfileConfig(type_overrides={'Pclass': 'Nominal', 'Ticket': 'Interval'})
+    type_, stats = _cal_var_stats(test_df['Pclass'], config=config)
+    assert type_ == 'Nominal' and stats['mode'] == 3
+    type_, stats = _cal_var_stats(test_df['Ticket'], config=config)
+    assert type_ == 'Interval' and stats['count'] == 891 and stats['n_missing'] == 230
+
+
+def test_get_df_profile_with_config(test_df):
+    config = ProfileConfig(exclude=['Name', 'Ticket'], type_skips={'Binary': ['conf_matrix'], 'Interval': ['histogram']})
+    df_profile = get_df_profile(test_df, num_works=1, top_correlations=0, config=config)
+    assert df_profile['table_stats'].loc['n_col', 'count'] == '11'
+    assert 'conf_matrix' not in df_profile
+    assert not df_profile['histograms']
+    avoided = df_profile['avoided_work']
+    assert avoided.loc['excluded columns'].tolist() == [2, 2 * 891]
+    assert avoided.loc['conf_matrix', 'n_skipped'] == 1
+    assert avoided.loc['histogram', 'n_skipped'] == 6
@@ -1,8 +1,10 @@
 import pandas as pd
 import pytest
+from pandas.testing import assert_frame_equal, assert_series_equal
 
 from dataprofile._profiling import _get_actual_dtype, _format_value, _cal_var_stats
 from dataprofile._profiling import get_a_sample, get_df_profile, get_table_stats, get_var_summary, get_variable_stats
+from dataprofile._profiling import get_confusion_matrix
 
 
 @pytest.mark.parametrize("test_input, expected",
@@ -96,3 +98,53 @@ def test_get_df_profile(test_df):
                           (pd.Series(['True', 'False', 'True', 'False', '18']), 'Nominal')])
 def test__cal_var_stats(test_input, expected):
     assert expected == _cal_var_stats(test_input)[0]
+
+
+def test__cal_var_stats_category_dtype(test_df):
+    for col in ['Sex', 'Embarked', 'Cabin']:
+        assert_series_equal(_cal_var_stats(test_df[col].astype('category'))[1], _cal_var_stats(test_df[col])[1])
+
+
+def test__cal_var_stats_parses_dates_once_per_value():
+    test_series = pd.Series(['2018-09-16', None, '2018-08-30', '2018-09-16', '2018-10-01'])
+    var_type, stats = _cal_var_stats(test_series)
+    assert var_type == 'Datetime'
+    assert stats['n_Sunday'] == 2
+
+
+def test_get_confusion_matrix(test_df):
+    var_stats = get_variable_stats(test_df)
+    confusion_matrix = get_confusion_matrix(test_df, var_stats)[0]
+    a, b = confusion_matrix.index.name, confusion_matrix.columns.name
+    assert_frame_equal(confusion_matrix, pd.crosstab(test_df[a].astype(str), test_df[b].astype(str)))
+
+
+def test_collect_variable_stats_falls_back_and_resumes(test_df, monkeypatch, tmp_path):
+    import time
+    from dataprofile import _profiling
+
+    def slow_numerical_stats(series, *args):
+        if series.name == 'Fare' and len(series) > 500:
+            time.sleep(60)
+        return numerical_stats(series, *args)
+
+    numerical_stats = _profiling.numerical_stats
+    monkeypatch.setattr(_profiling, 'numerical_stats', slow_numerical_stats)
+    monkeypatch.setattr(_profiling, 'FALLBACK_SAMPLE_ROWS', 100)
+    checkpoint = tmp_path / 'checkpoint.pkl'
+    var_stats, failures = _profiling.collect_variable_stats(test_df, 2, column_timeout=3, checkpoint_file=checkpoint)
+    assert failures.to_dict('index') == {'Fare': {'reason': 'timeout', 'fallback': 'sampled 100 rows'}}
+    fare = [stats for stats in var_stats['Interval'] if stats.name == 'Fare'][0]
+    assert fare['count'] == 100
+
+    # a resumed run reads every variable back instead of computing it
+    monkeypatch.setattr(_profiling, '_cal_var_stats_of', None)
+    resumed, resumed_failures = _profiling.collect_variable_stats(test_df, 1, checkpoint_file=checkpoint)
+    assert {key: sorted(stats.name for stats in item) for key, item in resumed.items()} == \
+           {key: sorted(stats.name for stats in item) for key, item in var_stats.items()}
+    assert resumed_failures.equals(failures)
+
+    # the same shape and dtypes with other values is another dataset
+    changed = test_df.assign(Age=test_df['Age'].to_numpy()[::-1])
+    assert _profiling._checkpoint_key(changed, None, None) != _profiling._checkpoint_key(test_df, None, None)
+    assert _profiling._checkpoint_key(test_df.copy(), None, None) == _profiling._checkpoint_key(test_df, None, None)
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from dataprofile._profile_config import ProfileConfig
+from dataprofile._profiling import get_df_profile
+from dataprofile._rules import compile_rule, evaluate_rules
+from dataprofile._var_statistics import numerical_stats
+
+
+def test_compile_rule():
+    assert compile_rule('iqr').params == {'k': 1.5}
+    assert compile_rule({'check': 'range', 'max': 80}).label == 'range [-inf, 80]'
+    with pytest.raises(ValueError, match='unknown check'):
+        compile_rule('outlier')
+    with pytest.raises(ValueError, match='unknown parameters'):
+        compile_rule({'check': 'iqr', 'threshold': 3})
+    with pytest.raises(ValueError, match='needs the parameters'):
+        compile_rule('regex')
+
+
+def test_evaluate_rules(test_df):
+    age = test_df['Age']
+    rules = [compile_rule(spec) for spec in ['iqr', 'zscore', {'check': 'range', 'min': 1, 'max': 70}, 'not_null']]
+    stats = numerical_stats(age)
+    stats['type'] = 'Interval'
+    iqr, zscore, range_, not_null = evaluate_rules(age, rules, stats)
+    q1, q3 = age.quantile([.25, .75])
+    outliers = age[(age < q1 - 1.5 * (q3 - q1)) | (age > q3 + 1.5 * (q3 - q1))]
+    assert (iqr.n_checked, iqr.n_violation) == (age.count(), len(outliers))
+    assert iqr.rows == tuple(outliers.index[:5]) and iqr.examples == tuple(outliers[:5])
+    assert zscore.n_violation == ((age - age.mean()).abs() > 3 * age.std()).sum()
+    assert range_.n_violation == ((age < 1) | (age > 70)).sum()
+    assert (not_null.n_checked, not_null.n_violation) == (len(age), age.isna().sum())
+
+    regex, allowed = evaluate_rules(test_df['Embarked'], [compile_rule({'check': 'regex', 'pattern': '[SC]'}),
+                                                          compile_rule({'check': 'allowed', 'values': 'SC'})])
+    assert regex[1:3] == allowed[1:3] == (889, (test_df['Embarked'] == 'Q').sum())
+
+    dates = pd.Series(pd.to_datetime(['2020-01-01', '2021-06-01', None]))
+    result, = evaluate_rules(dates, [compile_rule({'check': 'range', 'min': '2021-01-01'})])
+    assert result[1:] == (2, 1, (dates[0],), (0,))
+    result, = evaluate_rules(dates.dt.strftime('%Y-%m-%d'), [compile_rule({'check': 'range', 'min': '2021-01-01'})])
+    assert result[1:4] == (2, 1, ('2020-01-01',))
+    stats = pd.Series({'type': 'Datetime'})
+    result, = evaluate_rules(dates.astype(str), [compile_rule({'check': 'range', 'max': '2020-12-31'})], stats)
+    assert result[1:3] == (2, 1)
+    failed, = evaluate_rules(test_df['Age'], [compile_rule({'check': 'range', 'min': 'never'})])
+    assert failed == ('range [never, inf] (failed: ValueError)', 0, 0, (), ())
+
+
+def test_rule_violations(test_df):
+    config = ProfileConfig(type_rules={'Interval': ['iqr']},
+                           column_rules={'Ticket': [{'check': 'regex', 'pattern': r'\d+'}], 'Cabin': ['not_null']})
+    df_profile = get_df_profile(test_df, 1, config=config)
+    violations = df_profile['rule_violations'].set_index(['variable', 'rule'])
+    assert set(violations.index.get_level_values('variable')) == \
+        {'PassengerId', 'Pclass', 'Age', 'SibSp', 'Parch', 'Fare', 'Ticket', 'Cabin'}
+    assert violations.loc[('Cabin', 'not_null'), 'n_violation'] == test_df['Cabin'].isna().sum()
+    assert violations.loc[('Ticket', r'regex \d+'), 'p_violation'] == \
+        pytest.approx((~test_df['Ticket'].str.fullmatch(r'\d+')).mean())
+    assert violations.loc[('Age', 'iqr k=1.5'), 'n_violation'] == 11
+    assert 'rule_violations' not in df_profile['raw_stats']['Interval'].columns
+    assert 'rule_violations' not in get_df_profile(test_df, 1)
+
+    test_df = test_df.assign(Boarded=pd.date_range('1912-04-01', periods=len(test_df), freq='h').astype(str))
+    config = ProfileConfig(column_rules={'Boarded': [{'check': 'range', 'max': '1912-04-10'}],
+                                         'Age': [{'check': 'range', 'min': 'never'}, {'check': 'range', 'max': 70}]})
+    violations = get_df_profile(test_df, 1, config=config)['rule_violations'].set_index(['variable', 'rule'])
+    assert violations.loc[('Boarded', 'range [-inf, 1912-04-10]'), 'n_violation'] == len(test_df) - 9 * 24 - 1
+    assert violations.loc[('Age', 'range [-inf, 70]'), 'n_violation'] == (test_df['Age'] > 70).sum()
+    assert violations.loc[('Age', 'range [never, inf] (failed: ValueError)'), 'n_checked'] == 0
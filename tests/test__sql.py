@@ -0,0 +1,42 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from dataprofile._profile_config import ProfileConfig
+from dataprofile._profiling import get_df_profile
+from dataprofile._sql import count_sql, profile_sql
+
+
+@pytest.fixture()
+def connection(test_df):
+    connection = sqlite3.connect(':memory:')
+    test_df.to_sql('titanic', connection, index=False)
+    yield connection
+    connection.close()
+
+
+def test_count_sql_pushes_down_aggregates(connection, test_df):
+    counts, sample = count_sql(connection, 'titanic', sample_rows=100, batch_rows=30,
+                               config=ProfileConfig(exclude=['Ticket']))
+    assert sample.shape == (100, 12) and 'Ticket' not in sample
+    # unique text and empty columns are never fetched
+    assert sample['Name'].isna().all() and sample['no_values'].isna().all()
+    assert counts.n_row == 891 and counts.n_missing_cell == test_df.drop(columns='Ticket').isnull().sum().sum()
+    fare = counts.columns['Fare'].aggregates
+    assert fare['min'] == test_df['Fare'].min() and fare['n_zeros'] == 15
+    assert fare['mean'] == pytest.approx(test_df['Fare'].mean()) and fare['std'] == pytest.approx(test_df['Fare'].std())
+    assert counts.columns['Embarked'].top.to_dict() == {'S': 644, 'C': 168, 'Q': 77}
+
+
+def test_profile_sql_matches_in_memory_profile(connection, test_df):
+    sql_profile = profile_sql(connection, 'titanic', num_works=1, top_correlations=0)
+    profile = get_df_profile(test_df, num_works=1, top_correlations=0)
+    for key in ['table_stats', 'var_summary']:
+        assert_frame_equal(sql_profile[key], profile[key])
+    assert_frame_equal(sql_profile['var_stats']['Interval'], profile['var_stats']['Interval'])
+
+    sampled = profile_sql(connection, 'titanic', sample_rows=200, num_works=1, top_correlations=0)
+    assert_frame_equal(sampled['var_summary'], profile['var_summary'])
+    assert sampled['var_stats']['Interval'].loc['Fare', 'mean'] == profile['var_stats']['Interval'].loc['Fare', 'mean']
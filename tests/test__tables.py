@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from tabulate import tabulate
+
+from dataprofile._profiling import get_df_profile
+from dataprofile._tables import is_renderable, render_frame, sparkline, svg_bars
+
+
+@pytest.fixture()
+def df_profile(test_df):
+    return get_df_profile(test_df, num_works=1)
+
+
+def _profile_tables(df_profile):
+    return [df_profile['table_stats'], df_profile['var_summary']] + \
+           [item.T for item in df_profile['var_stats'].values()] + df_profile['conf_matrix']
+
+
+@pytest.mark.parametrize("table_fmt", ['psql', 'pipe'])
+def test_render_frame_matches_tabulate(df_profile, table_fmt):
+    for table in _profile_tables(df_profile):
+        table = table.rename_axis(None)
+        assert render_frame(table, table_fmt) == tabulate(table, headers='keys', tablefmt=table_fmt)
+
+
+def test_render_frame_matches_to_html(df_profile):
+    for table in _profile_tables(df_profile):
+        assert is_renderable(table, 'html')
+        assert render_frame(table, 'html') == table.to_html()
+
+
+def test_render_frame_aligns_numbers():
+    table = pd.DataFrame({'n': ['1', '22.5', 'nan'], 's': ['a', '1,757', None]}, index=['x', 'y', 'z'])
+    assert render_frame(table, 'psql') == tabulate(table, headers='keys', tablefmt='psql')
+    table = pd.DataFrame({'n': ['1,000.5', '', '2'], 'i': pd.Series([np.int64(3), 1.5, None], dtype=object),
+                          's': ['1,757', '', '12']})
+    for table_fmt in ('psql', 'pipe'):
+        assert render_frame(table, table_fmt) == tabulate(table, headers='keys', tablefmt=table_fmt)
+    assert not is_renderable(table.astype({'i': float}), 'html')
+    assert not is_renderable(table, 'grid')
+
+
+def test_sparkline_and_svg():
+    assert sparkline([0, 1, 2, 8]) == ' ▁▂█'
+    assert sparkline([0, 0]) == '  '
+    svg = svg_bars([1, 2])
+    assert svg.startswith('<svg') and svg.count('<rect') == 2
+    table = pd.DataFrame({'x': [svg, '<b>']}, index=['histogram', 'text'])
+    html = render_frame(table, 'html')
+    assert f'<td>{svg}</td>' in html and '<td>&lt;b&gt;</td>' in html
@@ -0,0 +1,64 @@
+import math
+
+import pandas as pd
+import pytest
+
+from dataprofile._tuning import CostModel, Workload, load_runs, plan_profile, record_run
+
+MODEL = CostModel({'numeric': 0.04, 'boolean': 0.03, 'datetime': 0.03, 'object': 0.01}, column_seconds=0.002,
+                  worker_startup_seconds=0.05, transfer_mb_per_second=200.)
+
+
+def test_workload():
+    df = pd.DataFrame({'a': [1.5, 2.], 'b': [True, False], 'c': pd.to_datetime(['2020-01-01', None]), 'd': ['x', 'y']})
+    workload = Workload.of(df)
+    assert workload.kinds == ['numeric', 'boolean', 'datetime', 'object']
+    assert workload.mbs[0] == 16 / 10 ** 6
+    assert workload.mb_by_kind()['object'] == workload.mbs[3] > 0
+
+
+def test_plan_workers():
+    small = Workload(1000, ['numeric'] * 10, [0.008] * 10)
+    assert MODEL.plan(small, max_works=16)[:3] == ('serial', 1, 1)
+    large = Workload(10 ** 7, ['numeric'] * 64, [80.] * 64)
+    plan = MODEL.plan(large, max_works=16)
+    # the fewest workers within 5% of the fastest plan
+    assert plan.backend == 'pool' and 8 < plan.num_works < 16
+    assert plan.seconds <= MODEL.estimate(large, 16) * 1.05 < MODEL.estimate(large, plan.num_works - 1)
+    assert plan.batch_size == math.ceil(64 / (plan.num_works * 4))
+
+
+def test_plan_sample_rows():
+    workload = Workload(10 ** 6, ['object'] * 4, [100.] * 4)
+    plan = MODEL.plan(workload, max_works=1, target_seconds=2.)
+    assert plan.sample_rows == pytest.approx(10 ** 6 * (2 - 0.008) / 4, rel=1e-6)
+    assert plan.seconds == pytest.approx(2.)
+    assert MODEL.plan(workload, max_works=1, target_seconds=10.).sample_rows is None
+
+
+def test_refit():
+    runs = []
+    for i in range(1, 9):
+        workload = Workload(1000, ['numeric', 'object', 'boolean'], [i, i % 3 + 1., 10. / i])
+        plan = MODEL.plan(workload, max_works=1)
+        runs.append({'n_col': 3, 'mb_by_kind': workload.mb_by_kind(), 'num_works': 1, 'seconds': plan.seconds})
+    model = CostModel().refit(runs)
+    for kind in ['numeric', 'object', 'boolean']:
+        assert model.seconds_per_mb[kind] == pytest.approx(MODEL.seconds_per_mb[kind])
+    assert model.column_seconds == pytest.approx(MODEL.column_seconds)
+
+
+def test_record_run(tmp_path):
+    df = pd.DataFrame({'a': range(10)})
+    plan, workload = plan_profile(df, model=MODEL)
+    record_run(workload, plan, 0.5, tmp_path / 'missing' / 'runs.jsonl')
+    assert not (tmp_path / 'missing').exists()
+    record_run(workload, plan, 0.5, tmp_path / 'runs.jsonl')
+    runs = load_runs(tmp_path / 'runs.jsonl')
+    assert len(runs) == 1 and runs[0]['seconds'] == 0.5 and runs[0]['backend'] == 'serial'
+
+
+def test_save_load(tmp_path):
+    MODEL.save(tmp_path / 'model.json')
+    assert CostModel.load(tmp_path / 'model.json').to_dict() == MODEL.to_dict()
+    assert CostModel.load(tmp_path / 'none.json').to_dict() == CostModel().to_dict()
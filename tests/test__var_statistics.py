@@ -9,7 +9,12 @@ from dataprofile._var_statistics import base_stats
 from dataprofile._var_statistics import binary_stats
 from dataprofile._var_statistics import categorical_stats
 from dataprofile._var_statistics import datetime_stats
+from dataprofile._var_statistics import factorize
+from dataprofile._var_statistics import merge_histograms
+from dataprofile._var_statistics import merge_text
 from dataprofile._var_statistics import numerical_stats
+from dataprofile._var_statistics import summarize_text
+from dataprofile._var_statistics import text_stats
 
 
 @pytest.fixture()
@@ -36,8 +41,8 @@ def test_binary_stats():
     expected_result = pd.Series({'count': 7,
                                  'n_missing': 2,
                                  'p_missing': '28.57%',
-                                 'n_unique': 3,
-                                 'p_unique': '60.00%',
+                                 'n_unique': 2,
+                                 'p_unique': '40.00%',
                                  'data_type': 'Binary',
                                  'value1': 'True',
                                  'n_value1': 3,
@@ -49,7 +54,7 @@ def test_binary_stats():
 
 
 def test_numerical_stats(test_df):
-    output = numerical_stats(test_df['Age'])
+    output = numerical_stats(test_df['Age']).drop(['histogram', 'quantile_histogram'])
     expected_result = pd.Series({'count': 891,
                                  'n_unique': 88,
                                  'p_missing': '19.87%',
@@ -79,6 +84,28 @@ def test_numerical_stats(test_df):
     assert_series_equal(output.sort_index(), expected_result.sort_index())
 
 
+def test_numerical_stats_histograms(test_df):
+    ages = test_df['Age'].dropna()
+    output = numerical_stats(test_df['Age'])
+    histogram, quantile_histogram = output['histogram'], output['quantile_histogram']
+    assert histogram.edges[0] == ages.min() and histogram.edges[-1] == ages.max()
+    np.testing.assert_array_equal(histogram.counts, np.histogram(ages, bins=len(histogram.counts))[0])
+    np.testing.assert_allclose(quantile_histogram.edges, ages.quantile(np.linspace(0, 1, 11)))
+    assert histogram.counts.sum() == quantile_histogram.counts.sum() == len(ages)
+
+
+def test_merge_histograms(test_df):
+    halves = [numerical_stats(test_df['Fare'][:400]), numerical_stats(test_df['Fare'][400:])]
+    merged = merge_histograms([half['histogram'] for half in halves])
+    assert merged.counts.sum() == pytest.approx(len(test_df))
+    assert (merged.edges[0], merged.edges[-1]) == (test_df['Fare'].min(), test_df['Fare'].max())
+    whole = numerical_stats(test_df['Fare'])['histogram']
+    same = merge_histograms([whole, whole])
+    np.testing.assert_array_equal(same.counts, 2 * whole.counts)
+    from_quantiles = merge_histograms([half['quantile_histogram'] for half in halves], bins=len(whole.counts))
+    assert np.abs(from_quantiles.counts - whole.counts).sum() < 0.2 * len(test_df)
+
+
 def test_datetime_stats():
     test_series = pd.to_datetime(pd.Series(['9/16/2018',
                                             '8/30/2018',
@@ -110,10 +137,42 @@ def test_datetime_stats():
                                  'n_Thursday': 2,
                                  'n_Friday': 0,
                                  'n_Saturday': 0,
-                                 'n_Sunday': 3})
+                                 'n_Sunday': 3,
+                                 'n_January': 0,
+                                 'n_February': 0,
+                                 'n_March': 0,
+                                 'n_April': 0,
+                                 'n_May': 0,
+                                 'n_June': 0,
+                                 'n_July': 2,
+                                 'n_August': 2,
+                                 'n_September': 1,
+                                 'n_October': 1,
+                                 'n_November': 0,
+                                 'n_December': 0,
+                                 'n_2018': 6})
     assert_series_equal(output.sort_index(), expected_result.sort_index())
 
 
+def test_datetime_stats_calendar_histograms():
+    test_series = pd.Series(pd.to_datetime(['1969-12-31 23:30', '2020-02-29 08:15', None, '2020-03-01 08:00']))
+    output = datetime_stats(test_series)
+    assert (output['n_Wednesday'], output['n_Saturday'], output['n_Sunday']) == (1, 1, 1)
+    assert (output['n_1969'], output['n_2020']) == (1, 2) and 'n_1970' not in output
+    assert (output['n_23h'], output['n_08h'], output['n_00h']) == (1, 2, 0)
+    assert output['max'] == pd.Timestamp('2020-03-01 08:00')
+
+    output = datetime_stats(pd.Series(pd.to_datetime(['1800-01-01', '2080-06-01', '2080-01-01'])))
+    assert output.filter(regex=r'^n_\d{4}$').to_dict() == {'n_1800': 1, 'n_2080': 2}
+
+
+def test_datetime_stats_tz_aware():
+    test_series = pd.Series(pd.to_datetime(['2020-01-01 00:30', '2020-01-02 12:00'])).dt.tz_localize('US/Eastern')
+    output = datetime_stats(test_series)
+    assert output['min'] == pd.Timestamp('2020-01-01 00:30', tz='US/Eastern')
+    assert (output['n_00h'], output['n_12h'], output['n_Wednesday']) == (1, 1, 1)
+
+
 def test_constant_stats():
     test_series = pd.Series([1, 1, np.nan, 1, None, 1, 1, 1, 1])
     output = base_stats(test_series)
@@ -137,7 +196,7 @@ def test_unique_stats(test_df):
 
 
 def test_categorical_stats(test_df):
-    output = categorical_stats(test_df['Embarked'])
+    output = categorical_stats(test_df['Embarked'], skip=frozenset({'text'}))
     expected_result = pd.Series({'count': 891,
                                  'n_unique': 3,
                                  'p_missing': '0.22%',
@@ -152,3 +211,47 @@ def test_categorical_stats(test_df):
                                  '3rd_freq': 77})
     expected_result.name = 'Embarked'
     assert_series_equal(output.sort_index(), expected_result.sort_index())
+
+
+def test_text_stats(test_df):
+    output = categorical_stats(test_df['Ticket'])
+    assert (output['len_min'], output['len_50%'], output['len_max']) == (3, 6, 18)
+    assert (output['pattern1'], output['pattern1_freq']) == ('999999', 415)
+    assert output['p_digit'] == '79.93%'
+    values = test_df['Ticket'].to_numpy()
+    merged = merge_text([summarize_text(values[:300]), summarize_text(values[300:])])
+    assert text_stats(merged) == text_stats(summarize_text(values))
+    summary = summarize_text(np.array(['', ' \t', 'AB-12', 'é' * 2000], dtype=object))
+    assert (summary.n_empty, summary.n_blank, summary.n_digit, summary.n_alpha, summary.n_space) == (1, 1, 2, 2002, 2)
+    assert list(summary.patterns) == ['', ' \t', 'AA-99', 'AAAAAAAAAAAA…']
+
+
+@pytest.mark.parametrize("dtype", [object, 'category'])
+def test_categorical_stats_factorized(test_df, dtype):
+    series = test_df['Embarked'].astype(dtype)
+    output = categorical_stats(series, factorize(series))
+    assert_series_equal(output.sort_index(), categorical_stats(test_df['Embarked']).sort_index())
+
+
+def test_binary_stats_factorized():
+    test_series = pd.Series([None, 'F', np.nan, 'T', 'F', 'T', 'T'])
+    output = binary_stats(test_series, factorize(test_series))
+    assert output['n_unique'] == 2
+    assert (output['value1'], output['n_value1'], output['value2'], output['n_value2']) == ('T', 3, 'F', 2)
+
+
+def test_binary_stats_factorized_single_value():
+    test_series = pd.Series(['a', None, 'a', 'a'])
+    output = binary_stats(test_series, factorize(test_series))
+    assert (output['value1'], output['n_value1'], output['value2'], output['n_value2']) == ('a', 3, 'None', 1)
+    test_series = pd.Series([1.5, np.nan, np.nan])
+    output = binary_stats(test_series, factorize(test_series))
+    assert (output['value1'], output['n_value1'], output['value2'], output['n_value2']) == ('nan', 2, '1.5', 1)
+
+
+def test_factorize_drops_unused_categories():
+    test_series = pd.Series(['a', 'b', None, 'b'], dtype='category').iloc[1:]
+    output = factorize(test_series)
+    assert list(output.uniques) == ['b']
+    assert list(output.codes) == [0, -1, 0]
+    assert list(output.counts) == [2]
@@ -0,0 +1,121 @@
+import os
+import pickle
+
+import pytest
+
+from dataprofile import _watch
+from dataprofile._partitioned import finalize_counts
+from dataprofile._watch import load_index, profile_file, scan, scan_once
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+@pytest.fixture()
+def lines():
+    with open(TEST_FILE, 'rb') as f:
+        return f.read().splitlines(keepends=True)
+
+
+@pytest.fixture()
+def landing(tmp_path, lines, monkeypatch):
+    # small chunks, so a file is summarized in several pieces
+    monkeypatch.setattr(_watch, 'LOAD_CHUNK_BYTES', 8192)
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'train.csv').write_bytes(b''.join(lines[:501]))
+    return tmp_path
+
+
+def _full_counts(file, tmp_path):
+    # the counts of the file profiled from scratch
+    size, mtime_ns = os.stat(file).st_size, os.stat(file).st_mtime_ns
+    (tmp_path / 'fresh').mkdir(exist_ok=True)
+    return profile_file(str(file), size, mtime_ns, None, tmp_path / 'fresh')[2][0]
+
+
+def _cached_counts(landing, file):
+    state = load_index(landing)[str(file)]
+    with open(landing / '.dataprofile' / 'states' / state.state_file, 'rb') as f:
+        return finalize_counts(pickle.load(f))
+
+
+def test_scan_once(landing):
+    summary = scan_once(landing, '.jsonl')
+    assert summary['new'] == 1
+    assert (landing / 'sub' / 'train.jsonl').exists()
+    assert list(scan(landing)) == [str(landing / 'sub' / 'train.csv')]
+    assert scan_once(landing, '.jsonl')['unchanged'] == 1
+
+
+def test_append(landing, lines):
+    file = landing / 'sub' / 'train.csv'
+    scan_once(landing, '.jsonl')
+    n_parts = load_index(landing)[str(file)].n_parts
+    with open(file, 'ab') as f:
+        f.write(b''.join(lines[501:] + lines[1:51]))
+    assert scan_once(landing, '.jsonl')['appended'] == 1
+
+    state = load_index(landing)[str(file)]
+    assert state.size == file.stat().st_size and state.n_parts > n_parts
+    expected = _full_counts(file, landing)
+    counts = _cached_counts(landing, file)
+    assert counts.n_row == expected.n_row == len(lines) + 49
+    assert counts.n_duplicated_row == expected.n_duplicated_row == 50
+    assert counts.n_missing_cell == expected.n_missing_cell
+    assert {col: c.n_unique for col, c in counts.columns.items()} == \
+        {col: c.n_unique for col, c in expected.columns.items()}
+
+
+def test_rewrite_and_remove(landing, lines):
+    file = landing / 'sub' / 'train.csv'
+    scan_once(landing, '.jsonl')
+    file.write_bytes(b''.join(lines[:1] + lines[301:701]))
+    assert scan_once(landing, '.jsonl')['rewritten'] == 1
+    assert _cached_counts(landing, file).n_row == 400
+
+    file.unlink()
+    assert scan_once(landing, '.jsonl')['removed'] == 1
+    assert load_index(landing) == {}
+    assert not list((landing / '.dataprofile' / 'states').iterdir())
+
+
+def test_interrupted_scan(landing, lines, monkeypatch):
+    file = landing / 'sub' / 'train.csv'
+    scan_once(landing, '.jsonl')
+    with open(file, 'ab') as f:
+        f.write(b''.join(lines[501:551]))
+
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    # stopped after the appended rows are counted, before the index is saved
+    monkeypatch.setattr('dataprofile._profiling.get_df_profile', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        scan_once(landing, '.jsonl')
+    monkeypatch.undo()
+    monkeypatch.setattr(_watch, 'LOAD_CHUNK_BYTES', 8192)
+    assert scan_once(landing, '.jsonl')['appended'] == 1
+    assert _cached_counts(landing, file).n_row == 550
+    assert len(list((landing / '.dataprofile' / 'states').iterdir())) == 1
+
+
+def test_last_line_settles(tmp_path, monkeypatch):
+    file = tmp_path / 'open.csv'
+    file.write_bytes(b'x,y\n1,2\n3,4\n5,6')
+    assert scan_once(tmp_path, '.jsonl')['new'] == 1
+    assert load_index(tmp_path)[str(file)].size == 12 and _cached_counts(tmp_path, file).n_row == 2
+    assert scan_once(tmp_path, '.jsonl')['unchanged'] == 1
+
+    monkeypatch.setattr(_watch, 'WATCH_SETTLE_SECONDS', -1)
+    assert scan_once(tmp_path, '.jsonl')['appended'] == 1
+    assert load_index(tmp_path)[str(file)].size == 15 and _cached_counts(tmp_path, file).n_row == 3
+    assert scan_once(tmp_path, '.jsonl')['unchanged'] == 1
+
+
+def test_bad_file_doesnt_stop_the_scan(landing):
+    (landing / 'empty.csv').write_text('a,b\n')
+    summary = scan_once(landing, '.jsonl')
+    assert (summary['new'], summary['failed']) == (1, 1)
+    assert (landing / 'sub' / 'train.jsonl').exists()
+    assert set(load_index(landing)) == {str(landing / 'empty.csv'), str(landing / 'sub' / 'train.csv')}
+    summary = scan_once(landing, '.jsonl')
+    assert (summary['unchanged'], summary['failed']) == (2, 0)
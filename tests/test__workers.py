@@ -0,0 +1,27 @@
+import time
+
+import numpy as np
+
+from dataprofile._workers import run_supervised
+
+
+def _task(kind):
+    if kind == 'sleep':
+        time.sleep(60)
+    elif kind == 'allocate':
+        return np.ones(2 ** 31, dtype=np.uint8).sum()
+    elif kind == 'raise':
+        raise ValueError('bad column')
+    return kind
+
+
+def test_run_supervised_isolates_failures():
+    tasks = [(kind, (kind,)) for kind in ['a', 'sleep', 'allocate', 'raise', 'b', 'c']]
+    start = time.monotonic()
+    outcomes = {key: (status, result)
+                for key, status, result in run_supervised(_task, tasks, 2, timeout=2, memory_limit=2 ** 28)}
+    assert time.monotonic() - start < 30
+    assert outcomes['a'] == ('ok', 'a') and outcomes['b'] == ('ok', 'b') and outcomes['c'] == ('ok', 'c')
+    assert outcomes['sleep'] == ('timeout', None)
+    assert outcomes['allocate'] == ('memory', None)
+    assert outcomes['raise'][0] == "error: ValueError('bad column')"
@@ -0,0 +1,27 @@
+import gzip
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("module", ['dataprofile.cli_report', 'dataprofile.batch_cli_reports'])
+def test_cli_import_is_lazy(module, tmp_path):
+    code = (f"import sys, {module}; "
+            f"print(sorted(m for m in ('pandas', 'sklearn', 'tabulate', 'tqdm') if m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            env={'HOME': str(tmp_path), 'PYTHONPATH': os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}).stdout
+    assert output.strip() == '[]'
+    assert not (tmp_path / 'log').exists()
+
+
+def test_find_files_lists_compressed_csv(tmp_path):
+    from dataprofile.batch_cli_reports import find_files
+
+    (tmp_path / 'plain.csv').write_text('a\n1\n')
+    (tmp_path / 'packed.csv.gz').write_bytes(gzip.compress(b'a\n' + b'1\n' * 1000))
+    (tmp_path / 'notes.txt.gz').write_bytes(gzip.compress(b'a'))
+    sizes = {os.path.basename(path): size for size, _, path in find_files(str(tmp_path))}
+    assert set(sizes) == {'plain.csv', 'packed.csv.gz'}
+    assert sizes['plain.csv'] == '4.00 B' and sizes['packed.csv.gz'].endswith(' (~1.96 KB decompressed)')
@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+import pytest
+
+from dataprofile._profiling import get_df_profile
+from dataprofile.exporting import export_profile, iter_records, profile_to_frame
+
+
+@pytest.fixture()
+def df_profile(test_df):
+    return get_df_profile(test_df, num_works=1)
+
+
+def test_iter_records_are_typed(df_profile, test_df):
+    records = {record['variable']: record for record in iter_records(df_profile, table='titanic')}
+    assert set(records) == set(test_df.columns)
+    age = records['Age']
+    assert age['table'] == 'titanic' and age['type'] == 'Interval'
+    assert age['n_missing'] == test_df['Age'].isnull().sum()
+    assert age['p_missing'] == pytest.approx(test_df['Age'].isnull().mean())
+    assert age['mean'] == pytest.approx(test_df['Age'].mean())
+    assert records['no_values']['n_unique'] == 0 and records['no_values']['p_unique'] is None
+    ticket = records['Ticket']
+    tickets = test_df['Ticket'].str
+    assert ticket['p_digit'] == pytest.approx(tickets.count(r'\d').sum() / tickets.len().sum())
+    assert ticket['p_alpha'] + ticket['p_digit'] + ticket['p_space'] <= 1
+
+    long = profile_to_frame(df_profile).set_index(['variable', 'stat'])
+    for stat in ['p_digit', 'p_alpha', 'p_space']:
+        assert long.loc[('Ticket', stat), 'value'] == pytest.approx(ticket[stat])
+        assert pd.isna(long.loc[('Ticket', stat), 'value_str'])
+
+
+def test_iter_records_datetime():
+    df = pd.DataFrame({'date': pd.to_datetime(['2020-01-01', '2020-01-03', None, '2020-01-01', '2020-02-01'])})
+    record = next(iter_records(get_df_profile(df, num_works=1)))
+    assert record['type'] == 'Datetime'
+    assert record['min'] == '2020-01-01T00:00:00' and record['range'] == 31 * 24 * 3600
+    json.dumps(record)
+
+
+def test_export_jsonl(df_profile, tmp_path):
+    export_file = tmp_path / 'profile.jsonl'
+    export_profile(df_profile, export_file, table='titanic')
+    lines = export_file.read_text(encoding='UTF-8').splitlines()
+    assert [json.loads(line) for line in lines] == list(iter_records(df_profile, table='titanic'))
+
+
+def test_export_parquet(df_profile, tmp_path):
+    pytest.importorskip('pyarrow')
+    export_file = tmp_path / 'profile.parquet'
+    export_profile(df_profile, export_file)
+    stats = pd.read_parquet(export_file)
+    assert list(stats.columns) == ['variable', 'type', 'data_type', 'stat', 'value', 'value_str']
+    pd.testing.assert_frame_equal(stats, profile_to_frame(df_profile))
+    fare_mean = stats.query("variable == 'Fare' and stat == 'mean'")['value'].item()
+    assert fare_mean == pytest.approx(32.2042, abs=1e-4)
+
+
+def test_export_unknown_type(df_profile, tmp_path):
+    with pytest.raises(NotImplementedError):
+        export_profile(df_profile, tmp_path / 'profile.csv')
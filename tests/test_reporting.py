@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from dataprofile._profiling import get_df_profile
+from dataprofile.reporting import iter_report, profile_to_str, save_report, write_report, _str_format
+
+
+@pytest.fixture()
+def df_profile(test_df):
+    return get_df_profile(test_df, num_works=1)
+
+
+@pytest.mark.parametrize("report_type", ['txt', 'md', 'html'])
+def test_save_report_streams_same_text(df_profile, report_type, tmp_path):
+    report_file = tmp_path / f'report.{report_type}'
+    save_report(df_profile, 6, report_file)
+    table_fmt, line_breaker = _str_format(str(report_file))
+    expected = line_breaker.join(profile_to_str(df_profile, 6, table_fmt, line_breaker)) + '\n'
+    assert report_file.read_text(encoding='UTF-8') == expected
+
+
+def test_iter_report_is_lazy(df_profile):
+    pieces = iter_report(df_profile)
+    assert 'Beginning of report' in next(pieces)
+    stream = io.StringIO()
+    write_report(df_profile, stream)
+    assert stream.getvalue().endswith('=\n')
+
+
+def test_iter_report_shows_every_variable(df_profile):
+    # one variable per table used to render only about half of them
+    report = '\n'.join(iter_report(df_profile, var_per_row=1))
+    for item in df_profile['var_stats'].values():
+        for name in item.index:
+            assert f' {name} ' in report
+
+
+@pytest.mark.parametrize("table_fmt, chart", [('psql', '█'), ('html', '<svg')])
+def test_iter_report_draws_histograms(df_profile, table_fmt, chart):
+    report = '\n'.join(iter_report(df_profile, table_fmt=table_fmt))
+    assert report.count(chart) >= len(df_profile['histograms'])
+    assert set(df_profile['histograms']) == set(df_profile['var_stats']['Interval'].index)
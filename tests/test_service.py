@@ -0,0 +1,62 @@
+import asyncio
+import os
+
+import pytest
+
+from dataprofile.service import ProfileService, ServiceOverloaded, start_server
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), '../data/titanic/train.csv')
+
+
+@pytest.fixture()
+def service():
+    service = ProfileService(max_workers=1, max_pending=1)
+    yield service
+    service.close()
+
+
+def test_profile_dataframe(service, test_df):
+    df_profile = asyncio.run(service.profile(test_df))
+    assert 'table_stats' in df_profile
+    assert df_profile['table_stats'].loc['n_row', 'count'] == '891'
+    assert service.n_pending == 0
+
+
+def test_profile_path_as_report(service):
+    report = asyncio.run(service.profile(TEST_FILE, report_type='md'))
+    assert 'Table Statistics' in report
+
+
+def test_profile_overloaded(service, test_df):
+    async def two_requests():
+        first = asyncio.ensure_future(service.profile(test_df))
+        await asyncio.sleep(0)
+        with pytest.raises(ServiceOverloaded):
+            await service.profile(test_df)
+        return await first
+
+    assert 'var_stats' in asyncio.run(two_requests())
+
+
+def test_profile_timeout(service, test_df):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service.profile(test_df, timeout=1e-6))
+
+
+def test_server_round_trip(service):
+    async def post_file():
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        with open(TEST_FILE, 'rb') as f:
+            body = f.read()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"POST /profile?type=txt HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response.decode()
+
+    response = asyncio.run(post_file())
+    assert response.startswith('HTTP/1.1 200 OK')
+    assert 'Variable Summary' in response